@@ -0,0 +1,177 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import avocado_json
+
+
+# Default location, next to the response cache
+DEFAULT_ARCHIVE_DIR = Path.home() / ".avocado" / "archive"
+
+
+class ResponseArchive:
+    """Append-only archive of raw WorldCat responses in compressed, sharded JSONL
+    
+    Each line is {"kind", "key", "time", "response"} with the response body as the
+    server sent it. Lines are compressed in blocks of block_records, each block a
+    separate gzip member, so a shard is a plain .jsonl.gz file and any block can
+    be read on its own. index.sqlite maps every OCLC number and request key to
+    the block holding it, so a response can be found by its request or by an
+    OCLC number it returned; new shards start once a shard reaches shard_bytes.
+    """
+    
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR, block_records=64, shard_bytes=256 << 20):
+        self.directory = Path(directory)
+        self.block_records = block_records
+        self.shard_bytes = shard_bytes
+        self.pending = []        # (kind, key, oclc_numbers, line) not yet compressed
+        self.pending_keys = {}   # (kind, key) -> position in pending
+        self.shard = None
+        self.shard_number = 0
+        self.shard_stamp = f"{int(time.time())}-{os.getpid()}"
+        self.cached_block = (None, None)
+        self.written = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.directory / "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                oclc TEXT,
+                shard TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                time REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_key ON entries (kind, key)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_oclc ON entries (oclc)")
+        self.conn.commit()
+    
+    def put(self, kind, key, content, oclc_numbers=()):
+        """Archive a raw response body under its request key and the OCLC numbers it holds"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        # Raw newlines can only be whitespace between JSON tokens
+        body = bytes(content).strip().replace(b"\r", b" ").replace(b"\n", b" ")
+        header = json.dumps({"kind": kind, "key": str(key), "time": round(time.time(), 3)},
+                            ensure_ascii=False)
+        line = header[:-1].encode("utf-8") + b', "response": ' + body + b"}\n"
+        
+        with self.lock:
+            self.pending_keys[(kind, str(key))] = len(self.pending)
+            self.pending.append((kind, str(key), [str(n) for n in oclc_numbers if n], line))
+            self.written += 1
+            if len(self.pending) >= self.block_records:
+                self._flush()
+    
+    def get(self, kind, key):
+        """Latest archived response for a request key, decoded, or None"""
+        with self.lock:
+            position = self.pending_keys.get((kind, str(key)))
+            if position is not None:
+                self.hits += 1
+                return self._response(self.pending[position][3])
+            row = self.conn.execute(
+                "SELECT shard, offset, length, line FROM entries WHERE kind = ? AND key = ? "
+                "ORDER BY rowid DESC LIMIT 1", (kind, str(key))).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            line = self._read_block(*row[:3])[row[3]]
+        return self._response(line)
+    
+    def contains(self, kind, key):
+        """Whether a response for a request key is archived, without counting a hit or miss"""
+        with self.lock:
+            if (kind, str(key)) in self.pending_keys:
+                return True
+            return self.conn.execute("SELECT 1 FROM entries WHERE kind = ? AND key = ? LIMIT 1",
+                                     (kind, str(key))).fetchone() is not None
+    
+    def get_by_oclc(self, kind, oclc_number):
+        """Latest archived response of a kind that holds an OCLC number, decoded, or None"""
+        oclc_number = str(oclc_number)
+        with self.lock:
+            for pending_kind, _, oclc_numbers, line in reversed(self.pending):
+                if pending_kind == kind and oclc_number in oclc_numbers:
+                    self.hits += 1
+                    return self._response(line)
+            row = self.conn.execute(
+                "SELECT shard, offset, length, line FROM entries WHERE oclc = ? AND kind = ? "
+                "ORDER BY rowid DESC LIMIT 1", (oclc_number, kind)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            line = self._read_block(*row[:3])[row[3]]
+        return self._response(line)
+    
+    def _response(self, line):
+        return avocado_json.loads(line)["response"]
+    
+    def _read_block(self, shard, offset, length):
+        """Decompressed lines of one block, remembering the last block read"""
+        if self.cached_block[0] == (shard, offset):
+            return self.cached_block[1]
+        with open(self.directory / shard, "rb") as f:
+            f.seek(offset)
+            lines = gzip.decompress(f.read(length)).splitlines()
+        self.cached_block = ((shard, offset), lines)
+        return lines
+    
+    def _flush(self):
+        """Compress pending lines as one block and index them"""
+        if not self.pending:
+            return
+        if self.shard is None or self.shard.tell() >= self.shard_bytes:
+            self._next_shard()
+        
+        block = gzip.compress(b"".join(line for _, _, _, line in self.pending), compresslevel=6)
+        offset = self.shard.tell()
+        self.shard.write(block)
+        self.shard.flush()
+        
+        shard_name = Path(self.shard.name).name
+        now = time.time()
+        rows = []
+        for number, (kind, key, oclc_numbers, _) in enumerate(self.pending):
+            for oclc in oclc_numbers or [None]:
+                rows.append((kind, key, oclc, shard_name, offset, len(block), number, now))
+        self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+        
+        self.pending = []
+        self.pending_keys = {}
+    
+    def _next_shard(self):
+        if self.shard is not None:
+            self.shard.close()
+        self.shard_number += 1
+        path = self.directory / f"responses-{self.shard_stamp}-{self.shard_number:04d}.jsonl.gz"
+        self.shard = open(path, "ab")
+    
+    def flush(self):
+        """Write out responses still waiting for a full block"""
+        with self.lock:
+            self._flush()
+    
+    def close(self):
+        """Flush and close the shard and index"""
+        with self.lock:
+            self._flush()
+            if self.shard is not None:
+                self.shard.close()
+                self.shard = None
+            self.conn.close()
@@ -0,0 +1,298 @@
+import asyncio
+from collections import deque
+
+from avocado_engine import ThrottledError, parse_retry_after
+from avocado_match import match_score
+
+try:
+    import aiohttp
+except ImportError:  # Optional: only needed for the asyncio engine
+    aiohttp = None
+
+
+class AsyncOCLCEngine:
+    """Asyncio engine that keeps many WorldCat requests in flight on one event loop"""
+    
+    def __init__(self, app, concurrency=100):
+        if aiohttp is None:
+            raise RuntimeError("The asyncio engine requires aiohttp (pip install aiohttp)")
+        
+        self.app = app
+        self.concurrency = max(1, concurrency)
+        self.session = None
+        self.slot_released = None
+    
+    async def open(self):
+        """Create the HTTP session on the running loop"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            timeout = aiohttp.ClientTimeout(total=30)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self.slot_released = asyncio.Condition()
+    
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def _throttle(self):
+        """Wait for a token from the shared rate limiter without blocking the loop"""
+        wait = self.app.rate_limiter.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    async def _acquire(self):
+        """Wait for a request slot from the adaptive controller, then for a rate token"""
+        async with self.slot_released:
+            while True:
+                wait = self.app.rate_control.try_acquire()
+                if wait == 0:
+                    break
+                try:
+                    await asyncio.wait_for(self.slot_released.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        try:
+            await self._throttle()
+        except asyncio.CancelledError:
+            # Give the slot back when a raced query is cancelled before it is sent
+            await self._release(None, None)
+            raise
+    
+    async def _release(self, status, retry_after):
+        """Report the response to the adaptive controller and wake a waiting request"""
+        self.app.rate_control.release(status, retry_after)
+        async with self.slot_released:
+            self.slot_released.notify()
+    
+    async def fetch_oclc_token(self):
+        """Get OCLC token"""
+        await self.open()
+        return bool(await self._token())
+    
+    async def _token(self, stale=None):
+        """Current access token; refreshes run on a worker thread so the loop keeps going"""
+        app = self.app
+        token = app.token_manager.usable(app.wskey, app.wssecret, stale)
+        if token:
+            return token
+        return await asyncio.get_running_loop().run_in_executor(None, app.current_token, stale)
+    
+    async def _get_json(self, url, kind, key, params=None):
+        """GET a WorldCat API URL under adaptive rate control
+        
+        Throttled and failed responses are retried with backoff and a 401 gets one
+        token refresh. Raises ThrottledError once the retries run out. The raw body
+        goes to the response archive under key when archiving is on.
+        """
+        control = self.app.rate_control
+        token = await self._token()
+        refreshed = False
+        attempt = 0
+        
+        while True:
+            await self._acquire()
+            status = retry_after = None
+            try:
+                async with self.session.get(url, headers=self.app.api_headers(token),
+                                            params=params) as response:
+                    status = response.status
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if status == 200:
+                        content = await response.read()
+                        data = self.app.decode_response(kind, content)
+                        self.app.archive_put(kind, key, content, data)
+                        return data
+            finally:
+                await self._release(status, retry_after)
+            
+            if status == 401 and not refreshed:
+                refreshed = True
+                token = await self._token(stale=token)
+                if not token:
+                    return None
+            elif status in control.RETRY_STATUSES:
+                attempt += 1
+                if attempt > control.max_retries:
+                    raise ThrottledError(f"OCLC kept returning HTTP {status} after {attempt} attempts; "
+                                         f"resume the run later")
+                await asyncio.sleep(control.backoff(attempt, retry_after))
+            else:
+                return None
+    
+    async def search_oclc(self, title, author):
+        """Search for OCLC number, trying each strategy in turn"""
+        return self.app.record_oclc_number(await self.search_oclc_record(title, author))
+    
+    async def search_oclc_record(self, title, author):
+        """Search for the best matching bib record, keeping the whole search result"""
+        return (await self.search_oclc_match(title, author))[0]
+    
+    async def search_oclc_match(self, title, author):
+        """Search for the best matching bib record, returning (search_record, match)"""
+        app = self.app
+        try:
+            strategies = app.build_search_strategies(title, author)
+            if app.search_mode == "race":
+                return await self.race_strategies(app.order_strategies(strategies), title, author)
+            
+            ranked = []
+            if app.search_mode == "ranked":
+                # One broad query, ranked locally
+                data = await self._search_data(strategies[-1][1], app.rank_candidate_limit)
+                ranked = app.rank_search_results(data, title, author)
+                confident = bool(ranked) and ranked[0][0] >= app.rank_threshold
+                app.strategy_stats.record("ranked", confident)
+                if confident:
+                    return ranked[0][1], app.match_info("ranked", ranked[0][0])
+                strategies = strategies[:-1]
+            
+            for name, query in app.order_strategies(strategies):
+                result = await self._search_with_query(query)
+                app.strategy_stats.record(name, bool(result))
+                if result:
+                    return result, app.match_info(name, match_score(result, title, author))
+            
+            # Nothing stricter matched: keep the best broad candidate, as the keyword strategy would
+            if ranked:
+                return ranked[0][1], app.match_info("ranked", ranked[0][0])
+            return None, None
+        except ThrottledError:
+            raise
+        except Exception:
+            return None, None
+    
+    async def race_strategies(self, strategies, title, author):
+        """Send every strategy's query at once and keep the highest-priority hit, cancelling the rest"""
+        tasks = [(name, asyncio.ensure_future(self._search_with_query(query)))
+                 for name, query in strategies]
+        try:
+            # A hit is final once every higher-priority strategy has missed
+            for name, task in tasks:
+                result = await task
+                self.app.strategy_stats.record(name, bool(result))
+                if result:
+                    return result, self.app.match_info(name, match_score(result, title, author))
+            return None, None
+        finally:
+            for _, task in tasks:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+    
+    async def _search_with_query(self, query):
+        """Perform search with specific query"""
+        try:
+            data = await self._search_data(query)
+            return self.app.extract_best_match(data) if data else None
+        except ThrottledError:
+            raise
+        except Exception:
+            return None
+    
+    async def _search_data(self, query, limit=10):
+        """Search response for a query, from the cache when possible"""
+        key = self.app.search_cache_key(query, limit)
+        if self.app.offline:
+            return self.app.archive_get("search", key)
+        data = self.app.cache_get("search", key)
+        if data is None:
+            data = await self._get_json(self.app.SEARCH_URL, "search", key,
+                                        self.app.search_params(query, limit))
+            if data is None:
+                return None
+            self.app.cache_put("search", key, data)
+        return data
+    
+    async def fetch_metadata_json(self, oclc_number):
+        """Get metadata JSON for OCLC number"""
+        try:
+            if self.app.offline:
+                return self.app.archive_get("bib", oclc_number)
+            data = self.app.cache_get("bib", oclc_number)
+            if data is not None:
+                return data
+            
+            data = await self._get_json(f"{self.app.SEARCH_URL}/{oclc_number}", "bib", oclc_number)
+            if data is None:
+                return None
+            self.app.cache_put("bib", oclc_number, data)
+            return data
+        except ThrottledError:
+            raise
+        except Exception:
+            return None
+    
+    async def lookup_book(self, book):
+        """Resolve the OCLC number for one book row"""
+        existing_oclc = book.get("OCLC #", "").strip()
+        title = book.get("Title", "").strip()
+        author = book.get("Author", "").strip()
+        
+        if existing_oclc:
+            return "existing", existing_oclc, None, None
+        if title and author:
+            search_record, match = await self.search_oclc_match(title, author)
+            oclc_number = self.app.record_oclc_number(search_record)
+            return ("found" if oclc_number else "not_found"), oclc_number, search_record, match
+        return "insufficient", None, None, None
+    
+    async def download_metadata(self, item):
+        """Download metadata for one OCLC number unless the search result already has it"""
+        oclc_num, search_record = item
+        if search_record is not None:
+            return search_record, None
+        try:
+            return await self.fetch_metadata_json(oclc_num), None
+        except ThrottledError:
+            raise
+        except Exception as e:
+            return None, str(e)
+    
+    async def parse_metadata(self, item):
+        """Download and parse one record, returning (record, error); None without metadata"""
+        metadata, error = await self.download_metadata(item)
+        if error or not metadata:
+            return None, error
+        try:
+            return self.app.parse_complete_record(metadata, item[0], {}), None
+        except Exception as e:
+            return None, str(e)
+    
+    async def run_ordered(self, func, items, should_stop=None):
+        """Yield (item, result) pairs in input order while many rows run concurrently"""
+        await self.open()
+        pending = deque()
+        window = self.concurrency * 2
+        
+        try:
+            for item in items:
+                if should_stop and should_stop():
+                    return
+                pending.append((item, asyncio.ensure_future(func(item))))
+                
+                if len(pending) >= window:
+                    done_item, task = pending.popleft()
+                    yield done_item, await task
+            
+            while pending:
+                if should_stop and should_stop():
+                    return
+                done_item, task = pending.popleft()
+                yield done_item, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
+def iterate_on_loop(loop, async_iterator):
+    """Drive an async iterator from synchronous code on the given loop"""
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(async_iterator.aclose())
@@ -0,0 +1,257 @@
+"""Batch runs: several input CSVs processed as one run
+
+The rows of every file are streamed, file after file, through one pipeline,
+so they share the worker pool, rate budget, token and response cache, and
+books that appear in more than one file are looked up once. The next file's
+rows enter the pool while the last ones of the previous file are still in
+flight, and a batch runs about as fast as one file of the same size. Each
+input gets its own output as soon as its last row is out, and a report sums
+up the batch.
+"""
+import csv
+import os
+import time
+from pathlib import Path
+
+from avocado_core import COMPLETE_FIELDNAMES
+from avocado_delta import RowFingerprints, row_fingerprint
+from avocado_engine import run_pipeline
+from avocado_journal import RunJournal
+from avocado_workflow import PipelineLookups, Workflow
+
+
+# Columns every input file must have
+REQUIRED_COLUMNS = {'OCLC #', 'Author', 'Title'}
+
+
+def batch_inputs(paths):
+    """CSV files named directly or found in the given directories, each once
+    
+    Files in a directory whose names contain "_avocado_" are earlier outputs
+    and are left out.
+    """
+    files = []
+    seen = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            candidates = sorted(p for p in path.glob("*.csv") if p.is_file() and "_avocado_" not in p.stem)
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            if candidate.resolve() not in seen:
+                seen.add(candidate.resolve())
+                files.append(candidate)
+    return files
+
+
+class FileOutput:
+    """Output and row fingerprints of one input file, written as its rows leave the pipeline"""
+    
+    def __init__(self, workflow, number, path, name):
+        self.number = number
+        self.path = path
+        self.name = name
+        self.output_file = workflow.output_path("professional", name)
+        self.writer = workflow.open_output(self.output_file, COMPLETE_FIELDNAMES)
+        self.fingerprints = RowFingerprints(self.output_file)
+        self.rows = 0
+        self.records = 0
+        self.complete = 0
+        self.closed = False
+        self.last_flush = time.monotonic()
+    
+    def add(self, fingerprint, record):
+        """Write one row's record, if it has one, and its fingerprint"""
+        # Positions let the file serve as the baseline of a later incremental run
+        self.fingerprints.add(fingerprint, None if record is None else self.records)
+        self.rows += 1
+        if record is None:
+            return
+        self.writer.write(record)
+        self.records += 1
+        self.complete += bool(record.get("Title") and record.get("Publisher"))
+        if time.monotonic() - self.last_flush > 1:
+            self.writer.flush()
+            self.last_flush = time.monotonic()
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+            self.fingerprints.close()
+
+
+class BatchWorkflow(Workflow):
+    """Complete workflow over several input files, with one output per file and a batch report"""
+    
+    def __init__(self, app_instance, input_files, resume=False, progress_update=None, progress_value=None,
+                 workflow_complete=None, workflow_error=None):
+        super().__init__(app_instance, resume, progress_update, progress_value, workflow_complete,
+                         workflow_error)
+        self.input_files = [Path(path) for path in input_files]
+    
+    def open_journal(self):
+        """Open the batch journal, which belongs to this exact set of input files"""
+        self.journal = RunJournal(Path(self.app.output_dir) / "avocado_batch_journal.jsonl")
+        if self.resume:
+            if self.journal.load(*self.input_files):
+                self.progress_update(f"Resuming previous batch: {len(self.journal.searched)} rows searched, "
+                                     f"{len(self.journal.records)} records complete")
+                return
+            self.progress_update("No interrupted batch found for these files, starting from the beginning")
+        self.journal.start(*self.input_files)
+    
+    def read_inputs(self):
+        """Check every input file, returning [(path, output name, row count)] and [(path, reason)] skipped"""
+        files = []
+        skipped = []
+        names = set()
+        for path in self.input_files:
+            try:
+                with open(path, 'r', encoding='utf-8-sig') as f:
+                    columns = csv.DictReader(f).fieldnames or []
+                if not REQUIRED_COLUMNS.issubset(columns):
+                    raise ValueError(f"CSV must contain columns: {', '.join(REQUIRED_COLUMNS)}")
+                count = self.count_books(path)
+            except Exception as e:
+                skipped.append((path, str(e)))
+                self.progress_update(f"Skipping {path.name}: {str(e)}")
+                continue
+            
+            # Files with the same name from different folders get numbered outputs
+            name = path.stem
+            number = 1
+            while name in names:
+                number += 1
+                name = f"{path.stem}_{number}"
+            names.add(name)
+            
+            files.append((path, name, count))
+        return files, skipped
+    
+    def iter_batch_rows(self, files):
+        """Yield (file number, journal row, book) for the rows of every file in turn
+        
+        Journal rows are numbered across the batch, in file order.
+        """
+        index = 0
+        for number, (path, _, _) in enumerate(files):
+            for book in self.iter_books(path):
+                yield number, index, book
+                index += 1
+    
+    def run_complete_workflow(self):
+        """Execute the complete workflow for every input file through one pipeline"""
+        try:
+            self.progress_update("AVOCADO Professional - Batch Workflow Started")
+            self.progress_update("=" * 60)
+            
+            if not self.authenticate():
+                return
+            
+            if self.should_stop:
+                return
+            
+            # Phase 2: Check every CSV file; rows are read as the pipeline takes them
+            self.progress_update(f"Phase 2: Reading {len(self.input_files)} CSV files...")
+            files, skipped = self.read_inputs()
+            total_books = sum(count for _, _, count in files)
+            if not total_books:
+                self.workflow_error("No valid books found in the batch")
+                return
+            self.progress_update(f"Found {total_books} books to process in {len(files)} files")
+            if self.app.workflow_mode != "pipeline":
+                self.progress_update("Batches use pipeline mode")
+            
+            self.progress_value(15)
+            self.open_journal()
+            
+            if self.should_stop:
+                return
+            
+            lookups = PipelineLookups(self.PIPELINE_LOOKUP_MEMORY)
+            report = self.run_batch_pipeline(files, total_books, lookups)
+            if report is None:
+                return
+            
+            self.progress_value(90)
+            report_file = self.save_report(report, skipped)
+            self.finish_workflow(str(report_file), sum(line["OCLC found"] for line in report),
+                                 lookups.found_oclc, lookups.metadata_complete, lookups.stats())
+        
+        except Exception as e:
+            self.workflow_error(f"Workflow error: {str(e)}")
+    
+    def run_batch_pipeline(self, files, total_books, lookups):
+        """Stream the rows of every file through one pipeline, returning the report lines
+        
+        Returns None when stopped.
+        """
+        self.progress_update("Pipeline: searching, downloading and saving rows of every file as they complete...")
+        self.report_pipeline_settings()
+        
+        search_stage, download_stage = self.pipeline_stages(lookups)
+        rows = run_pipeline(self.iter_batch_rows(files), [lambda row: search_stage(row[1:]), download_stage],
+                            self.app.max_workers, should_stop=lambda: self.should_stop)
+        
+        report = []
+        output = None
+        try:
+            for (number, i, book), result in rows:
+                # A row of a later file means the files before it, with or without rows, are done
+                while output is None or output.number < number:
+                    output = self.next_file_output(output, files, report)
+                
+                # Taken before the row's OCLC number is filled in, as later runs will see it
+                fingerprint = row_fingerprint(book)
+                output.add(fingerprint, self.finish_pipeline_row(i, book, result, total_books, lookups))
+            
+            if self.should_stop:
+                return None
+            
+            while output is None or output.number < len(files) - 1:
+                output = self.next_file_output(output, files, report)
+            report.append(self.finish_file_output(output))
+        finally:
+            if output is not None:
+                output.close()
+        return report
+    
+    def next_file_output(self, output, files, report):
+        """Finish output, if any, and open the output of the next file"""
+        if output is not None:
+            report.append(self.finish_file_output(output))
+        path, name, _ = files[len(report)]
+        return FileOutput(self, len(report), path, name)
+    
+    def finish_file_output(self, output):
+        """Close one file's output and return its report line"""
+        output.close()
+        output_file = output.output_file
+        if not output.records:
+            # Like a single-file run, a file without OCLC numbers gets basic results
+            os.remove(output_file)
+            os.remove(output.fingerprints.path)
+            output_file = self.output_path("basic", output.name)
+            with self.open_output(output_file, empty_fieldnames=self.input_columns(output.path)) as writer:
+                writer.write_all(dict(book, **{"OCLC #": ""}) for book in self.iter_books(output.path))
+        
+        self.progress_update(f"{output.path.name}: {output.rows} rows, {output.records} with OCLC, "
+                             f"{output.complete} complete -> {output_file.name}")
+        return {"File": str(output.path), "Rows": output.rows, "OCLC found": output.records,
+                "Complete metadata": output.complete, "Output": output_file.name}
+    
+    def save_report(self, report, skipped):
+        """Write the batch report: one line per input file and a total"""
+        report_file = Path(self.app.output_dir) / f"avocado_batch_report_{int(time.time())}.csv"
+        fieldnames = ["File", "Rows", "OCLC found", "Complete metadata", "Output"]
+        with open(report_file, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(report)
+            for path, reason in skipped:
+                writer.writerow({"File": str(path), "Output": f"skipped: {reason}"})
+            writer.writerow({"File": "Total", "Rows": sum(line["Rows"] for line in report),
+                             "OCLC found": sum(line["OCLC found"] for line in report),
+                             "Complete metadata": sum(line["Complete metadata"] for line in report)})
+        return report_file
@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import avocado_json
+
+
+# Default location, shared by every run and output directory
+DEFAULT_CACHE_PATH = Path.home() / ".avocado" / "response_cache.sqlite"
+
+# Cache modes
+CACHE_USE = "use"          # read and write
+CACHE_REFRESH = "refresh"  # ignore stored entries but store fresh responses
+CACHE_BYPASS = "bypass"    # neither read nor write
+
+
+class ResponseCache:
+    """Persistent SQLite cache for WorldCat search and bib responses"""
+    
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=30, max_entries=200000, mode=CACHE_USE):
+        self.path = Path(path)
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.writes_since_prune = 0
+        self.lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+    
+    @staticmethod
+    def normalize_key(key):
+        """Normalize query strings so trivially different spellings share an entry"""
+        return " ".join(str(key).split()).lower()
+    
+    def get(self, kind, key):
+        """Return the cached payload, or None on a miss"""
+        return self.get_any((kind,), key)[1]
+    
+    def get_any(self, kinds, key):
+        """Return (kind, payload) for the first of kinds cached under key, or (None, None)"""
+        if self.mode != CACHE_USE:
+            return None, None
+        
+        key = self.normalize_key(key)
+        now = time.time()
+        with self.lock:
+            for kind in kinds:
+                row = self.conn.execute(
+                    "SELECT payload, created FROM responses WHERE kind = ? AND key = ?",
+                    (kind, key)).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    break
+            else:
+                self.misses += 1
+                return None, None
+            
+            # Touch the entry for LRU eviction
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE kind = ? AND key = ?",
+                              (now, kind, key))
+            self.conn.commit()
+            self.hits += 1
+        
+        return kind, avocado_json.loads(row[0])
+    
+    def put(self, kind, key, payload):
+        """Store a response payload"""
+        if self.mode == CACHE_BYPASS:
+            return
+        
+        key = self.normalize_key(key)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (kind, key, payload, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (kind, key, avocado_json.dumps(payload), now, now))
+            self.conn.commit()
+            
+            self.writes_since_prune += 1
+            if self.writes_since_prune >= 500:
+                self._prune()
+    
+    def _prune(self):
+        """Drop expired entries and evict least recently used ones over the size cap"""
+        self.writes_since_prune = 0
+        self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        
+        count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM responses WHERE rowid IN "
+                "(SELECT rowid FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,))
+        self.conn.commit()
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+    
+    def close(self):
+        """Prune and close the database"""
+        with self.lock:
+            self._prune()
+            self.conn.close()
@@ -0,0 +1,293 @@
+"""AVOCADO command line - runs the complete workflow without PyQt5 or a display
+    
+    python avocado_cli.py books.csv --output-dir results --workers 4
+    python avocado_cli.py incoming/ --output-dir results   # every CSV in a folder as one batch
+    python avocado_cli.py --lookup "Doña Bárbara" "Rómulo Gallegos"
+    python avocado_cli.py books.csv --archive              # keep every raw response
+    python avocado_cli.py books.csv --from-archive         # re-extract later, offline
+    python avocado_cli.py books.csv --baseline results/books_avocado_professional_1700000000.csv
+    python avocado_cli.py --serve 127.0.0.1:8765           # local job service, see avocado_service
+
+Credentials come from OCLC_WSKEY / OCLC_WSSECRET in the environment or the .env file.
+"""
+import argparse
+import os
+import sys
+
+from avocado_cache import CACHE_USE, CACHE_REFRESH, CACHE_BYPASS
+from avocado_core import OCLCClient
+from avocado_engine import ThrottledError
+
+
+def build_parser():
+    """Command line options; anything left unset falls back to .env and the app defaults"""
+    parser = argparse.ArgumentParser(
+        prog="avocado",
+        description="Find OCLC numbers and download WorldCat metadata for a CSV book list")
+    parser.add_argument("input_files", nargs="*", metavar="input_file",
+                        help="CSV file with OCLC #, Author and Title columns; several files or a directory "
+                             "run as one batch with an output per file and a batch report")
+    parser.add_argument("--lookup", nargs=2, metavar=("TITLE", "AUTHOR"),
+                        help="look up one book and print its OCLC number, match strategy and score")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="HOST:PORT",
+                        help="run the local job service with an HTTP API (default 127.0.0.1:8765)")
+    parser.add_argument("--service-dir", help="job store directory for --serve")
+    parser.add_argument("--jobs", type=int, help="jobs --serve runs at once (default 2)")
+    parser.add_argument("-o", "--output-dir", help="directory for the output file")
+    parser.add_argument("--format", choices=("csv", "jsonl", "parquet", "sqlite"),
+                        help="output format (parquet needs pyarrow)")
+    parser.add_argument("--workers", type=int, help="concurrent lookups")
+    parser.add_argument("--rate", type=float, help="requests per second across all workers (0 for no limit)")
+    parser.add_argument("--max-rate", type=float, help="ceiling for the adaptive request rate")
+    parser.add_argument("--no-adaptive", action="store_true",
+                        help="keep rate and concurrency fixed when OCLC throttles requests")
+    parser.add_argument("--engine", choices=("threads", "async"), help="HTTP engine")
+    parser.add_argument("--concurrency", type=int, help="requests in flight for the async engine")
+    parser.add_argument("--mode", choices=("phased", "pipeline"),
+                        help="phased (default) reads the whole input into memory before searching; pipeline "
+                             "streams rows from disk and saves each as it completes (batches always stream; "
+                             "--baseline always reads the whole input)")
+    parser.add_argument("--search-mode", choices=("strategies", "ranked", "race"),
+                        help="query strategies in turn, one broad query ranked locally, or all strategies "
+                             "at once (default for --lookup)")
+    parser.add_argument("--rank-threshold", type=float,
+                        help="score below which ranked search falls back to stricter queries")
+    parser.add_argument("--strategy-order", choices=("fixed", "adaptive"),
+                        help="try search strategies in the fixed order or by observed hit rate")
+    parser.add_argument("--cache", choices=(CACHE_USE, CACHE_REFRESH, CACHE_BYPASS), help="response cache mode")
+    parser.add_argument("--cache-path", help="response cache database")
+    parser.add_argument("--project", action="store_true",
+                        help="keep only the response fields the output uses")
+    parser.add_argument("--json-backend", choices=("auto", "orjson", "json"),
+                        help="JSON decoder (auto: orjson when installed)")
+    parser.add_argument("--archive", action="store_true",
+                        help="write every raw response to the compressed response archive")
+    parser.add_argument("--archive-dir", help="response archive directory")
+    parser.add_argument("--from-archive", action="store_true",
+                        help="rebuild the output from archived responses without any network requests")
+    parser.add_argument("--processes", type=int,
+                        help="processes for --from-archive (0: one per CPU core, 1: no process pool)")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="always download full records instead of reusing search results")
+    parser.add_argument("--baseline", metavar="OUTPUT",
+                        help="previous output for this list; only new or changed rows are looked up")
+    parser.add_argument("--resume", action="store_true", help="resume an interrupted run on the same file")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the output file path")
+    return parser
+
+
+def configure(client, args):
+    """Apply command line options and environment credentials to the client"""
+    client.wskey = os.environ.get("OCLC_WSKEY", client.wskey)
+    client.wssecret = os.environ.get("OCLC_WSSECRET", client.wssecret)
+    client.input_file = args.input_files[0] if args.input_files else ""
+    
+    if args.output_dir:
+        client.output_dir = args.output_dir
+    if args.format:
+        client.output_format = args.format
+    if args.workers is not None:
+        client.max_workers = max(1, args.workers)
+    if args.rate is not None:
+        client.requests_per_second = args.rate
+    if args.max_rate is not None:
+        client.max_requests_per_second = args.max_rate
+    if args.no_adaptive:
+        client.adaptive_rate = False
+    if args.engine:
+        client.http_engine = args.engine
+    if args.concurrency is not None:
+        client.async_concurrency = max(1, args.concurrency)
+    if args.mode:
+        client.workflow_mode = args.mode
+    if args.search_mode:
+        client.search_mode = args.search_mode
+    if args.rank_threshold is not None:
+        client.rank_threshold = args.rank_threshold
+    if args.strategy_order:
+        client.strategy_order = args.strategy_order
+    if args.cache:
+        client.cache_mode = args.cache
+    if args.cache_path:
+        client.cache_path = args.cache_path
+    if args.project:
+        client.project_responses = True
+    if args.json_backend:
+        client.json_backend = args.json_backend
+    if args.archive:
+        client.archive_responses = True
+    if args.archive_dir:
+        client.archive_dir = args.archive_dir
+    if args.from_archive:
+        client.offline = True
+    if args.processes is not None:
+        client.parse_processes = max(0, args.processes)
+    if args.no_reuse:
+        client.reuse_search_records = False
+    if args.baseline:
+        client.baseline_file = args.baseline
+
+
+def lookup(client, title, author):
+    """Look up one book, racing the search strategies unless another search mode was chosen"""
+    if not client.offline and not client.fetch_oclc_token():
+        print("Error: Failed to authenticate with OCLC API", file=sys.stderr)
+        return 1
+    
+    try:
+        search_record, match = client.search_oclc_match(title, author)
+    except ThrottledError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    
+    oclc_number = client.record_oclc_number(search_record)
+    if not oclc_number:
+        print("No OCLC found", file=sys.stderr)
+        return 1
+    print(f"{oclc_number}\t{match['strategy']}\t{match['score']:.2f}")
+    return 0
+
+
+def serve_jobs(client, args, log):
+    """Run the job service on one prepared client until interrupted"""
+    # Only the service needs the HTTP server and job store
+    from avocado_service import DEFAULT_SERVICE_DIR, JOB_WORKERS, serve
+    
+    host, _, port = args.serve.rpartition(":")
+    try:
+        port = int(port)
+    except ValueError:
+        print(f"Error: --serve takes HOST:PORT, not {args.serve}", file=sys.stderr)
+        return 2
+    
+    try:
+        client.prepare_run()
+    except Exception as e:
+        client.response_cache = None
+        log(f"Response cache unavailable: {str(e)}")
+    # Authenticate up front so the first job finds a warm token
+    if not client.offline and not client.fetch_oclc_token():
+        print("Error: Failed to authenticate with OCLC API", file=sys.stderr)
+        return 1
+    
+    try:
+        serve(client, host or "127.0.0.1", port, args.service_dir or DEFAULT_SERVICE_DIR, log,
+              args.jobs or JOB_WORKERS)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: could not start the job service: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        client.save_strategy_stats()
+        client.close_response_archive()
+        client.close_session()
+        if client.response_cache:
+            client.response_cache.close()
+    return 0
+
+
+def main(argv=None):
+    """Run the complete workflow and print the output file path, or the report path of a batch"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.input_files and not args.lookup and not args.serve:
+        parser.error("an input file, --lookup or --serve is required")
+    batch = len(args.input_files) > 1 or (args.input_files and os.path.isdir(args.input_files[0]))
+    if batch and args.baseline:
+        parser.error("--baseline takes a single input file")
+    
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+    
+    client = OCLCClient()
+    configure(client, args)
+    
+    if not client.offline and (not client.wskey or not client.wssecret):
+        print("Error: set OCLC_WSKEY and OCLC_WSSECRET in the environment or .env", file=sys.stderr)
+        return 2
+    
+    if args.lookup:
+        if not args.search_mode:
+            client.search_mode = "race"
+        try:
+            client.prepare_run()
+        except Exception as e:
+            client.response_cache = None
+            log(f"Response cache unavailable: {str(e)}")
+        try:
+            return lookup(client, *args.lookup)
+        finally:
+            client.save_strategy_stats()
+            client.close_response_archive()
+            client.close_session()
+            if client.response_cache:
+                client.response_cache.close()
+    
+    if args.serve:
+        return serve_jobs(client, args, log)
+    
+    for path in args.input_files:
+        if not os.path.exists(path):
+            print(f"Error: {path} does not exist", file=sys.stderr)
+            return 2
+    # The workflow modules are imported only for runs, keeping --lookup startup short
+    if batch:
+        from avocado_batch import BatchWorkflow, batch_inputs
+        input_files = batch_inputs(args.input_files)
+        if not input_files:
+            print("Error: no CSV files to process", file=sys.stderr)
+            return 2
+    if client.baseline_file and not os.path.exists(client.baseline_file):
+        print(f"Error: {client.baseline_file} does not exist", file=sys.stderr)
+        return 2
+    
+    try:
+        os.makedirs(client.output_dir, exist_ok=True)
+    except Exception as e:
+        print(f"Error: could not create output directory: {str(e)}", file=sys.stderr)
+        return 2
+    
+    try:
+        client.prepare_run()
+    except Exception as e:
+        client.response_cache = None
+        log(f"Response cache unavailable: {str(e)}")
+    
+    if client.offline and not client.response_archive:
+        print(f"Error: could not open the response archive in {client.archive_dir}", file=sys.stderr)
+        return 2
+    
+    result = {}
+    callbacks = dict(progress_update=log,
+                     workflow_complete=lambda output_file, *counts: result.update(output=output_file),
+                     workflow_error=lambda message: result.update(error=message))
+    if batch:
+        workflow = BatchWorkflow(client, input_files, args.resume, **callbacks)
+    else:
+        from avocado_workflow import Workflow
+        workflow = Workflow(client, args.resume, **callbacks)
+    try:
+        workflow.run()
+    except KeyboardInterrupt:
+        workflow.stop()
+        print("Interrupted - run again with --resume to continue", file=sys.stderr)
+        return 130
+    finally:
+        client.close_session()
+        if client.response_cache:
+            client.response_cache.close()
+    
+    if "error" in result:
+        print(f"Error: {result['error']}", file=sys.stderr)
+        return 1
+    if "output" not in result:
+        return 1
+    
+    print(result["output"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,773 @@
+import copy
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from avocado_archive import ResponseArchive, DEFAULT_ARCHIVE_DIR
+from avocado_cache import ResponseCache, DEFAULT_CACHE_PATH, CACHE_USE, CACHE_BYPASS
+import avocado_json
+from avocado_extract import BIB_COLUMNS, column_roots, compile_columns
+from avocado_engine import TokenBucket, AdaptiveRateController, ThrottledError, parse_retry_after
+from avocado_match import StrategyStats, DEFAULT_STRATEGY_STATS_PATH, rank_candidates, match_score
+from avocado_token import TokenManager, DEFAULT_TOKEN_PATH
+
+
+# Field order for consistent output
+COMPLETE_FIELDNAMES = [
+    "OCLC #", "Title", "Creator", "Contributor", "Publisher",
+    "Date", "Language", "Subjects", "Type", "Format",
+    "ISBN", "ISSN", "Edition", "URL"
+]
+
+
+def _flag(value):
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _at_least(minimum):
+    return lambda value: max(minimum, int(value))
+
+
+# .env keys -> (client attribute, conversion of the text value)
+ENV_SETTINGS = {
+    'OCLC_WSKEY': ('wskey', str),
+    'OCLC_WSSECRET': ('wssecret', str),
+    'OUTPUT_DIR': ('output_dir', str),
+    'OUTPUT_FORMAT': ('output_format', str),
+    'MAX_WORKERS': ('max_workers', _at_least(1)),
+    'REQUESTS_PER_SECOND': ('requests_per_second', float),
+    'MAX_REQUESTS_PER_SECOND': ('max_requests_per_second', float),
+    'ADAPTIVE_RATE': ('adaptive_rate', _flag),
+    'HTTP_ENGINE': ('http_engine', str),
+    'ASYNC_CONCURRENCY': ('async_concurrency', _at_least(1)),
+    'CACHE_MODE': ('cache_mode', str),
+    'CACHE_PATH': ('cache_path', str),
+    'CACHE_TTL_DAYS': ('cache_ttl_days', int),
+    'CACHE_MAX_ENTRIES': ('cache_max_entries', int),
+    'ARCHIVE_RESPONSES': ('archive_responses', _flag),
+    'ARCHIVE_DIR': ('archive_dir', str),
+    'PARSE_PROCESSES': ('parse_processes', _at_least(0)),
+    'REUSE_SEARCH_RECORDS': ('reuse_search_records', _flag),
+    'WORKFLOW_MODE': ('workflow_mode', str),
+    'JSON_BACKEND': ('json_backend', str),
+    'PROJECT_RESPONSES': ('project_responses', _flag),
+    'SEARCH_MODE': ('search_mode', str),
+    'RANK_CANDIDATES': ('rank_candidate_limit', lambda value: max(1, min(50, int(value)))),
+    'RANK_THRESHOLD': ('rank_threshold', float),
+    'STRATEGY_ORDER': ('strategy_order', str),
+    'STRATEGY_STATS_PATH': ('strategy_stats_path', str),
+    'TOKEN_CACHE_PATH': ('token_cache_path', str),
+}
+
+
+class OCLCClient:
+    """WorldCat client and record parser shared by the desktop app and the command line"""
+    # OCLC endpoints
+    TOKEN_URL = "https://oauth.oclc.org/token"
+    SEARCH_URL = "https://americas.discovery.api.oclc.org/worldcat/search/v2/bibs"
+    
+    # Fields a search result must carry to skip the per-record download
+    BRIEF_RECORD_KEYS = ("title", "contributor", "publishers", "date", "language", "format")
+    
+    # Top-level bib fields kept when responses are projected: those the column rules,
+    # brief-record reuse and OCLC number lookup read
+    BIB_FIELDS = frozenset(column_roots(BIB_COLUMNS) + list(BRIEF_RECORD_KEYS) + ["identifier"])
+    
+    # Search strategies, from most to least specific
+    SEARCH_STRATEGIES = ("title_author_phrase", "title_author", "phrase", "keyword")
+    
+    def __init__(self):
+        # State variables
+        self.wskey = ""
+        self.wssecret = ""
+        self.input_file = ""
+        self.baseline_file = ""
+        self.output_dir = str(Path.home() / "Downloads")
+        self.output_format = "csv"
+        self.access_token = None
+        self.max_workers = 1
+        self.requests_per_second = 3.0
+        self.max_requests_per_second = 10.0
+        self.adaptive_rate = True
+        self.http_engine = "threads"
+        self.async_concurrency = 100
+        self.cache_mode = CACHE_USE
+        self.cache_path = str(DEFAULT_CACHE_PATH)
+        self.cache_ttl_days = 30
+        self.cache_max_entries = 200000
+        self.response_cache = None
+        self.archive_responses = False
+        self.archive_dir = str(DEFAULT_ARCHIVE_DIR)
+        self.response_archive = None
+        self.offline = False
+        self.parse_processes = 0
+        self.reuse_search_records = True
+        self.workflow_mode = "phased"
+        self.json_backend = "auto"
+        self.project_responses = False
+        self.search_mode = "strategies"
+        self.rank_candidate_limit = 50
+        self.rank_threshold = 0.75
+        self.strategy_order = "fixed"
+        self.strategy_stats_path = str(DEFAULT_STRATEGY_STATS_PATH)
+        self.strategy_stats = StrategyStats()
+        self.token_cache_path = str(DEFAULT_TOKEN_PATH)
+        self.session = None
+        self.session_pool_size = 0
+        self.session_lock = threading.Lock()
+        self.race_pool = None
+        self.race_pool_size = 0
+        self.shared_from = None
+        
+        # Load credentials
+        self.load_credentials()
+        self.reset_rate_control()
+        self.token_manager = TokenManager(self.request_token, self.token_cache_path or None)
+        
+        # Column rules are compiled once rather than interpreted per record
+        self.extract_columns = compile_columns(BIB_COLUMNS, self.clean_text)
+    
+    def load_credentials(self):
+        """Load credentials from .env - CLEAN VERSION"""
+        env_files = ['.env', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')]
+        
+        for env_file in env_files:
+            if os.path.exists(env_file):
+                try:
+                    with open(env_file, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            line = line.strip()
+                            if line and not line.startswith('#') and '=' in line:
+                                key, value = line.split('=', 1)
+                                key = key.strip()
+                                value = value.strip().strip('"\'')
+                                
+                                if key in ENV_SETTINGS:
+                                    name, convert = ENV_SETTINGS[key]
+                                    setattr(self, name, convert(value))
+                    return
+                except Exception:
+                    pass
+    
+    def save_credentials(self):
+        """Save credentials to .env"""
+        try:
+            env_content = f"""# AVOCADO v2.7 - OCLC Credentials
+# Keep this file secure and do not commit to version control
+
+OCLC_WSKEY={self.wskey}
+OCLC_WSSECRET={self.wssecret}
+
+# Output directory and format (csv / jsonl / parquet, which needs pyarrow / sqlite)
+OUTPUT_DIR={self.output_dir}
+OUTPUT_FORMAT={self.output_format}
+
+# Performance
+MAX_WORKERS={self.max_workers}
+REQUESTS_PER_SECOND={self.requests_per_second}
+MAX_REQUESTS_PER_SECOND={self.max_requests_per_second}
+ADAPTIVE_RATE={self.adaptive_rate}
+HTTP_ENGINE={self.http_engine}
+ASYNC_CONCURRENCY={self.async_concurrency}
+
+# Response cache (use / refresh / bypass)
+CACHE_MODE={self.cache_mode}
+CACHE_PATH={self.cache_path}
+CACHE_TTL_DAYS={self.cache_ttl_days}
+CACHE_MAX_ENTRIES={self.cache_max_entries}
+
+# Raw response archive (compressed JSONL shards indexed by OCLC number), which
+# lets outputs be re-extracted later without any network requests
+ARCHIVE_RESPONSES={self.archive_responses}
+ARCHIVE_DIR={self.archive_dir}
+# Processes that re-extract from the archive (0: one per CPU core, 1: no process pool)
+PARSE_PROCESSES={self.parse_processes}
+
+# Use search results as metadata when they are complete enough
+REUSE_SEARCH_RECORDS={self.reuse_search_records}
+
+# JSON decoder (auto: orjson when installed / json) and whether responses keep only
+# the fields the output uses, which shrinks the cache and speeds up replays
+JSON_BACKEND={self.json_backend}
+PROJECT_RESPONSES={self.project_responses}
+
+# Workflow mode (phased / pipeline, which streams rows from disk)
+WORKFLOW_MODE={self.workflow_mode}
+
+# Search mode (strategies: up to four queries in turn / ranked: one broad query
+# ranked locally, with stricter queries only below the score threshold /
+# race: all four queries at once, for the lowest latency per row)
+SEARCH_MODE={self.search_mode}
+RANK_CANDIDATES={self.rank_candidate_limit}
+RANK_THRESHOLD={self.rank_threshold}
+
+# Strategy order (fixed / adaptive, which tries the strategies that hit most often first)
+# and where hit rates are kept between runs (empty to disable)
+STRATEGY_ORDER={self.strategy_order}
+STRATEGY_STATS_PATH={self.strategy_stats_path}
+
+# Where a still-valid access token is kept between runs (empty to disable)
+TOKEN_CACHE_PATH={self.token_cache_path}
+"""
+            with open('.env', 'w', encoding='utf-8') as f:
+                f.write(env_content)
+            return True
+        except Exception:
+            return False
+    
+    def prepare_run(self):
+        """Reset rate control and search statistics and open the archive and cache before a run"""
+        avocado_json.set_backend(self.json_backend)
+        self.reset_rate_control()
+        self.reset_strategy_stats()
+        self.open_response_archive()
+        self.open_response_cache()
+    
+    def reset_strategy_stats(self):
+        """Fresh per-strategy statistics, seeded with earlier runs' hit rates when adapting"""
+        self.strategy_stats = StrategyStats(self.strategy_stats_path or None)
+        if self.strategy_order == "adaptive":
+            self.strategy_stats.load()
+    
+    def save_strategy_stats(self):
+        """Keep this run's hit rates for later runs"""
+        if self.strategy_stats.attempts:
+            self.strategy_stats.save()
+    
+    def order_strategies(self, strategies):
+        """Strategies in the configured order"""
+        if self.strategy_order == "adaptive":
+            return self.strategy_stats.order(strategies)
+        return strategies
+    
+    def reset_rate_control(self):
+        """Fresh rate limiter and adaptive controller for the current settings"""
+        self.rate_limiter = TokenBucket(self.requests_per_second)
+        self.rate_control = AdaptiveRateController(self.rate_limiter, self.http_concurrency(),
+                                                   self.max_requests_per_second, self.adaptive_rate)
+    
+    def http_concurrency(self):
+        """Most requests the selected engine can have in flight at once"""
+        if self.http_engine == "async" and self.workflow_mode != "pipeline":
+            return self.async_concurrency
+        return self.thread_pool_size()
+    
+    def thread_pool_size(self):
+        """Most requests the thread pool engine can have in flight at once"""
+        # Pipeline mode runs max_workers threads in both the search and download stages,
+        # and racing sends every strategy of a row at once
+        size = self.max_workers * (2 if self.workflow_mode == "pipeline" else 1)
+        if self.search_mode == "race":
+            size *= len(self.SEARCH_STRATEGIES)
+        return size
+    
+    def process_count(self):
+        """Worker processes for re-extraction from the archive"""
+        return self.parse_processes or os.cpu_count() or 1
+    
+    def http_session(self):
+        """Keep-alive session shared by every worker, with a pool sized to the worker count"""
+        pool_size = self.thread_pool_size()
+        
+        with self.session_lock:
+            if self.session is None or self.session_pool_size != pool_size:
+                # The network stack is imported on first use to keep startup fast
+                import requests
+                from requests.adapters import HTTPAdapter
+                from requests.utils import DEFAULT_ACCEPT_ENCODING
+                
+                if self.session is not None:
+                    self.session.close()
+                session = requests.Session()
+                session.headers["Accept-Encoding"] = DEFAULT_ACCEPT_ENCODING
+                
+                # One pool each for the OAuth and WorldCat hosts
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                
+                self.session = session
+                self.session_pool_size = pool_size
+            return self.session
+    
+    def race_executor(self):
+        """Thread pool shared by every raced search, with room for all rows racing at once"""
+        pool_size = self.thread_pool_size()
+        
+        with self.session_lock:
+            if self.race_pool is None or self.race_pool_size != pool_size:
+                if self.race_pool is not None:
+                    self.race_pool.shutdown(wait=False)
+                self.race_pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="avocado-race")
+                self.race_pool_size = pool_size
+            return self.race_pool
+    
+    def job_client(self):
+        """Client for one of several runs at once, sharing this client's warm state
+        
+        The token, pooled connections, race thread pool, rate control, response
+        cache and archive stay this client's; run settings such as input_file and
+        output_dir, and the strategy statistics, belong to the new client.
+        """
+        # Created now, or each run would open its own
+        self.http_session()
+        if self.search_mode == "race":
+            self.race_executor()
+        client = copy.copy(self)
+        client.shared_from = self
+        client.reset_strategy_stats()
+        return client
+    
+    def close_session(self):
+        """Close pooled connections and the race thread pool"""
+        with self.session_lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+            if self.race_pool is not None:
+                self.race_pool.shutdown(wait=False)
+                self.race_pool = None
+    
+    # OCLC API methods - FIXED VERSION
+    def fetch_oclc_token(self, force=False):
+        """Get OCLC token, reusing a still-valid one unless force is set"""
+        return bool(self.current_token(force=force))
+    
+    def current_token(self, stale=None, force=False):
+        """Valid access token, refreshed shortly before expiry or after a 401 on stale"""
+        self.access_token = self.token_manager.get(self.wskey, self.wssecret, stale, force)
+        return self.access_token
+    
+    def request_token(self, wskey, wssecret):
+        """Request a new token from the OAuth endpoint, returning (token, expires_in)"""
+        try:
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            payload = {
+                "grant_type": "client_credentials",
+                "scope": "wcapi:view_bib"
+            }
+            
+            response = self.http_session().post(self.TOKEN_URL, 
+                                                auth=(wskey, wssecret), 
+                                                data=payload, headers=headers, timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("access_token"), float(data.get("expires_in", 1199))
+            return None
+        except Exception:
+            return None
+    
+    def api_get(self, url, params=None):
+        """GET a WorldCat API URL under adaptive rate control
+        
+        Throttled and failed responses are retried with backoff and a 401 gets one
+        token refresh. Raises ThrottledError once the retries run out.
+        """
+        control = self.rate_control
+        token = self.current_token()
+        refreshed = False
+        attempt = 0
+        
+        while True:
+            control.acquire()
+            status = retry_after = None
+            try:
+                response = self.http_session().get(url, headers=self.api_headers(token),
+                                                   params=params, timeout=30)
+                status = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            finally:
+                control.release(status, retry_after)
+            
+            if status == 401 and not refreshed:
+                refreshed = True
+                token = self.current_token(stale=token)
+                if not token:
+                    return response
+            elif status in control.RETRY_STATUSES:
+                attempt += 1
+                if attempt > control.max_retries:
+                    raise ThrottledError(f"OCLC kept returning HTTP {status} after {attempt} attempts; "
+                                         f"resume the run later")
+                time.sleep(control.backoff(attempt, retry_after))
+            else:
+                return response
+    
+    def search_oclc(self, title, author):
+        """Search for OCLC number - CLEAN VERSION"""
+        return self.record_oclc_number(self.search_oclc_record(title, author))
+    
+    def search_oclc_record(self, title, author):
+        """Search for the best matching bib record, keeping the whole search result"""
+        return self.search_oclc_match(title, author)[0]
+    
+    def search_oclc_match(self, title, author):
+        """Search for the best matching bib record
+        
+        Returns (search_record, match), where match names the strategy that found
+        the record and its similarity score to the row, or (None, None).
+        """
+        try:
+            strategies = self.build_search_strategies(title, author)
+            if self.search_mode == "race":
+                return self.race_strategies(self.order_strategies(strategies), title, author)
+            
+            ranked = []
+            if self.search_mode == "ranked":
+                # One broad query, ranked locally
+                data = self._search_data(strategies[-1][1], self.rank_candidate_limit)
+                ranked = self.rank_search_results(data, title, author)
+                confident = bool(ranked) and ranked[0][0] >= self.rank_threshold
+                self.strategy_stats.record("ranked", confident)
+                if confident:
+                    return ranked[0][1], self.match_info("ranked", ranked[0][0])
+                strategies = strategies[:-1]
+            
+            for name, query in self.order_strategies(strategies):
+                result = self._search_with_query(query)
+                self.strategy_stats.record(name, bool(result))
+                if result:
+                    return result, self.match_info(name, match_score(result, title, author))
+            
+            # Nothing stricter matched: keep the best broad candidate, as the keyword strategy would
+            if ranked:
+                return ranked[0][1], self.match_info("ranked", ranked[0][0])
+            return None, None
+        except ThrottledError:
+            raise
+        except Exception:
+            return None, None
+    
+    def race_strategies(self, strategies, title, author):
+        """Send every strategy's query at once and keep the highest-priority hit
+        
+        Requests still go through the shared rate controller. Queries that have
+        not been sent when the winner is known are dropped.
+        """
+        decided = threading.Event()
+        
+        def search(query):
+            if decided.is_set():
+                return None
+            return self._search_with_query(query)
+        
+        pool = self.race_executor()
+        futures = [(name, pool.submit(search, query)) for name, query in strategies]
+        try:
+            # A hit is final once every higher-priority strategy has missed
+            for name, future in futures:
+                result = future.result()
+                self.strategy_stats.record(name, bool(result))
+                if result:
+                    return result, self.match_info(name, match_score(result, title, author))
+            return None, None
+        finally:
+            decided.set()
+            for _, future in futures:
+                future.cancel()
+    
+    def build_search_queries(self, title, author):
+        """Build search queries from most to least specific"""
+        return [query for _, query in self.build_search_strategies(title, author)]
+    
+    def build_search_strategies(self, title, author):
+        """Build (strategy, query) pairs from most to least specific"""
+        # Clean search terms
+        title_clean = self.clean_search_term(title)
+        author_clean = self.clean_search_term(author)
+        
+        return list(zip(self.SEARCH_STRATEGIES, [
+            f'ti:"{title_clean}" AND au:"{author_clean}"',
+            f'ti:{title_clean} AND au:{author_clean}',
+            f'"{title_clean}" AND "{author_clean}"',
+            f'{title_clean} {author_clean}',
+        ]))
+    
+    def rank_search_results(self, data, title, author):
+        """(score, bib) pairs for the candidates with an OCLC number in a search response, best first"""
+        if not data:
+            return []
+        bibs = [bib for bib in data.get("bibRecords", []) if self.record_oclc_number(bib)]
+        return rank_candidates(bibs, title, author)
+    
+    def match_info(self, strategy, score):
+        """Audit entry recording how a row's match was found"""
+        return {"strategy": strategy, "score": score}
+    
+    def api_headers(self, token=None):
+        """Headers for WorldCat Search API requests"""
+        return {
+            "Authorization": f"Bearer {token or self.access_token}",
+            "Accept": "application/json"
+        }
+    
+    def search_params(self, query, limit=10):
+        """Query parameters for a bib search"""
+        return {
+            "q": query,
+            "limit": limit,
+            "offset": 1,  # FIXED: Must start from 1, not 0
+            "orderBy": "bestMatch"  # FIXED: Use bestMatch instead of relevance
+        }
+    
+    def extract_best_match(self, data):
+        """Take the best matching bib record with an OCLC number from a search response"""
+        bibs = data.get("bibRecords", [])
+        
+        if bibs and self.record_oclc_number(bibs[0]):
+            return bibs[0]
+        return None
+    
+    def record_oclc_number(self, bib):
+        """OCLC number of a bib record"""
+        if not bib:
+            return None
+        identifier = bib.get("identifier", {})
+        oclc_number = identifier.get("oclcNumber") if identifier else None
+        return str(oclc_number) if oclc_number else None
+    
+    def reusable_search_record(self, bib):
+        """Return the search result if it can stand in for the full bib record"""
+        if not self.reuse_search_records or not isinstance(bib, dict):
+            return None
+        if all(bib.get(key) for key in self.BRIEF_RECORD_KEYS):
+            return bib
+        return None
+    
+    def _search_with_query(self, query):
+        """Perform search with specific query - FIXED API PARAMETERS"""
+        try:
+            data = self._search_data(query)
+            return self.extract_best_match(data) if data else None
+        except ThrottledError:
+            raise
+        except Exception:
+            return None
+    
+    def _search_data(self, query, limit=10):
+        """Search response for a query, from the cache when possible"""
+        key = self.search_cache_key(query, limit)
+        if self.offline:
+            return self.archive_get("search", key)
+        data = self.cache_get("search", key)
+        if data is None:
+            response = self.api_get(self.SEARCH_URL, self.search_params(query, limit))
+            
+            if response.status_code != 200:
+                return None
+            data = self.decode_response("search", response.content)
+            self.archive_put("search", key, response.content, data)
+            self.cache_put("search", key, data)
+        return data
+    
+    def search_cache_key(self, query, limit=10):
+        """Cache key of a search; the default page size keeps the plain query as key"""
+        return query if limit == 10 else f"{query}|limit={limit}"
+    
+    def fetch_metadata_json(self, oclc_number):
+        """Get metadata JSON for OCLC number"""
+        try:
+            if self.offline:
+                return self.archive_get("bib", oclc_number)
+            data = self.cache_get("bib", oclc_number)
+            if data is not None:
+                return data
+            
+            url = f"{self.SEARCH_URL}/{oclc_number}"
+            response = self.api_get(url)
+            
+            if response.status_code == 200:
+                data = self.decode_response("bib", response.content)
+                self.archive_put("bib", oclc_number, response.content, data)
+                self.cache_put("bib", oclc_number, data)
+                return data
+            return None
+        except ThrottledError:
+            raise
+        except Exception:
+            return None
+    
+    def journal_path(self):
+        """Checkpoint journal kept next to the output for the current input file"""
+        suffix = "reextract_journal" if self.offline else "journal"
+        if self.baseline_file:
+            suffix = f"delta_{suffix}"
+        return Path(self.output_dir) / f"{Path(self.input_file).stem}_avocado_{suffix}.jsonl"
+    
+    def open_response_archive(self):
+        """(Re)open the raw response archive when archiving or re-extracting from it"""
+        self.close_response_archive()
+        if self.archive_responses or self.offline:
+            self.response_archive = ResponseArchive(self.archive_dir)
+    
+    def close_response_archive(self):
+        """Write out and close the raw response archive"""
+        if self.shared_from is not None:
+            return  # Other runs share it; the client it came from closes it
+        if self.response_archive:
+            self.response_archive.close()
+            self.response_archive = None
+    
+    def archive_get(self, kind, key):
+        """Archived response for a request, shaped as a fresh download would be"""
+        if not self.response_archive:
+            return None
+        data = self.response_archive.get(kind, str(key))
+        if data is None and kind == "bib":
+            # No bib lookup was archived (e.g. the search record was reused): take the
+            # record from the latest search that returned this OCLC number
+            search = self.response_archive.get_by_oclc("search", key)
+            bibs = search.get("bibRecords") if isinstance(search, dict) else None
+            data = next((bib for bib in bibs or [] if isinstance(bib, dict)
+                         and self.record_oclc_number(bib) == str(key)), None)
+        return self.project_payload(kind, data)
+    
+    def archive_put(self, kind, key, content, data):
+        """Archive a raw response body, indexed by the OCLC numbers it holds"""
+        if not self.response_archive or self.offline:
+            return
+        if kind == "bib":
+            oclc_numbers = [key]
+        else:
+            bibs = data.get("bibRecords") if isinstance(data, dict) else None
+            oclc_numbers = [self.record_oclc_number(bib) for bib in bibs or []
+                            if isinstance(bib, dict)]
+        self.response_archive.put(kind, str(key), content, oclc_numbers)
+    
+    def archive_cached(self, kind, key, data):
+        """Archive a response served by the cache, unless the archive has it already
+        
+        The cache keeps decoded responses, so the archived body is the cached data
+        encoded again, projected if the cache entry was.
+        """
+        if self.response_archive and not self.offline and not self.response_archive.contains(kind, str(key)):
+            self.archive_put(kind, key, avocado_json.dumps(data).encode("utf-8"), data)
+    
+    def open_response_cache(self):
+        """(Re)open the persistent response cache with the current settings"""
+        if self.response_cache:
+            self.response_cache.close()
+            self.response_cache = None
+        
+        if self.cache_mode != CACHE_BYPASS:
+            self.response_cache = ResponseCache(self.cache_path, self.cache_ttl_days,
+                                                self.cache_max_entries, self.cache_mode)
+    
+    def cache_get(self, kind, key):
+        """Look up a cached response, archiving it when it was never archived"""
+        if not self.response_cache:
+            return None
+        if not self.project_responses:
+            data = self.response_cache.get(kind, str(key))
+        else:
+            # A full entry from a run without projection serves too; keep its projection
+            found, data = self.response_cache.get_any((self.projected_kind(kind), kind), str(key))
+            if found == kind:
+                data = self.project_payload(kind, data)
+                self.cache_put(kind, key, data)
+        
+        # A run answered from the cache still leaves a complete archive for --from-archive
+        if data is not None:
+            self.archive_cached(kind, key, data)
+        return data
+    
+    def cache_put(self, kind, key, payload):
+        """Store a response in the cache"""
+        if self.response_cache:
+            if self.project_responses:
+                kind = self.projected_kind(kind)
+            self.response_cache.put(kind, str(key), payload)
+    
+    def projected_kind(self, kind):
+        """Cache kind for projected payloads, changing whenever the kept fields do"""
+        signature = hashlib.sha1(",".join(sorted(self.BIB_FIELDS)).encode("utf-8")).hexdigest()[:8]
+        return f"{kind}:{signature}"
+    
+    def decode_response(self, kind, content):
+        """Decode a search or bib response body with the configured JSON backend"""
+        return self.project_payload(kind, avocado_json.loads(content))
+    
+    def project_payload(self, kind, data):
+        """Drop the parts of a response the output never reads, when projection is on"""
+        if not self.project_responses or not isinstance(data, dict):
+            return data
+        if kind == "bib":
+            return avocado_json.project(data, self.BIB_FIELDS)
+        
+        projected = avocado_json.project(data, ("numberOfRecords", "bibRecords"))
+        if isinstance(projected.get("bibRecords"), list):
+            projected["bibRecords"] = [avocado_json.project(bib, self.BIB_FIELDS)
+                                       for bib in projected["bibRecords"]]
+        return projected
+    
+    def parse_complete_record(self, json_data, oclc_number, original_book):
+        """Parse complete record - CLEAN VERSION"""
+        record = {
+            "OCLC #": str(oclc_number),
+            "Title": "",
+            "Creator": "",
+            "Contributor": "",
+            "Publisher": "",
+            "Date": "",
+            "Language": "",
+            "Subjects": "",
+            "Type": "",
+            "Format": "",
+            "ISBN": "",
+            "ISSN": "",
+            "Edition": "",
+            "URL": f"https://www.worldcat.org/oclc/{oclc_number}"
+        }
+        
+        try:
+            if not json_data:
+                return self.create_basic_record(original_book, oclc_number)
+            
+            record.update(self.extract_columns(json_data))
+            return record
+        
+        except Exception:
+            return self.create_basic_record(original_book, oclc_number)
+    
+    def create_basic_record(self, original_book, oclc_number=""):
+        """Create basic record"""
+        return {
+            "OCLC #": oclc_number,
+            "Title": original_book.get("Title", ""),
+            "Creator": original_book.get("Author", ""),
+            "Contributor": "",
+            "Publisher": "",
+            "Date": "",
+            "Language": "",
+            "Subjects": "",
+            "Type": "",
+            "Format": "",
+            "ISBN": "",
+            "ISSN": "",
+            "Edition": "",
+            "URL": f"https://www.worldcat.org/oclc/{oclc_number}" if oclc_number else ""
+        }
+    
+    def clean_text(self, text):
+        """Clean text"""
+        if not text:
+            return ""
+        
+        if not isinstance(text, str):
+            text = str(text)
+        
+        # split() collapses the same whitespace as \s+ without a regex pass
+        return " ".join(unicodedata.normalize('NFC', text).split())
+    
+    def clean_search_term(self, term):
+        """Clean search terms"""
+        cleaned = re.sub(r'[^\w\sáéíóúüñÁÉÍÓÚÜÑ]', ' ', term)
+        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+        return cleaned
+
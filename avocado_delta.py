@@ -0,0 +1,90 @@
+"""Incremental runs that reuse a previous output for rows that have not changed
+
+Every complete output gets a _rows.jsonl file next to it with one line per
+input row: the row's fingerprint and the position of its record in the output,
+or null when the row found no OCLC number. Given that output as a baseline, a
+later run only processes rows whose fingerprint it has not seen.
+"""
+import hashlib
+from pathlib import Path
+
+import avocado_json
+from avocado_output import read_records
+
+
+def row_fingerprint(book):
+    """Hash of every column of an input row, ignoring surrounding whitespace"""
+    digest = hashlib.sha1()
+    for key, value in sorted(book.items(), key=lambda item: str(item[0])):
+        digest.update(f"{key}\x1f{str(value or '').strip()}\x1e".encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def fingerprint_path(output_file):
+    """Row fingerprint file kept next to an output file"""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}_rows.jsonl")
+
+
+class RowFingerprints:
+    """Fingerprint file of an output, written one input row at a time"""
+    
+    def __init__(self, output_file):
+        self.path = fingerprint_path(output_file)
+        self.file = open(self.path, "w", encoding="utf-8")
+    
+    def add(self, fingerprint, position):
+        """Record an input row and the position of its record, or None without one"""
+        self.file.write(avocado_json.dumps([fingerprint, position]) + "\n")
+    
+    def close(self):
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Baseline:
+    """Records of a previous output, found again by the rows that produced them
+    
+    Outputs without a fingerprint file, from before incremental runs, can only
+    match rows by their OCLC #; rows that had to be searched are processed again.
+    """
+    
+    def __init__(self, output_file):
+        self.output_file = Path(output_file)
+        self.records = list(read_records(self.output_file))
+        self.positions = {}  # row fingerprint -> record position, or None without a record
+        self.by_oclc = {}
+        
+        path = fingerprint_path(self.output_file)
+        self.has_fingerprints = path.exists()
+        if self.has_fingerprints:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        fingerprint, position = avocado_json.loads(line)
+                    except ValueError:
+                        continue
+                    self.positions[fingerprint] = position
+        else:
+            for position, record in enumerate(self.records):
+                oclc_number = str(record.get("OCLC #") or "").strip()
+                if oclc_number:
+                    self.by_oclc.setdefault(oclc_number, position)
+    
+    def find(self, book, fingerprint):
+        """(True, record or None) for a row the baseline already covers, otherwise (False, None)"""
+        if fingerprint in self.positions:
+            position = self.positions[fingerprint]
+            if position is None:
+                return True, None
+            if position < len(self.records):
+                return True, self.records[position]
+        position = self.by_oclc.get((book.get("OCLC #") or "").strip())
+        if position is not None:
+            return True, self.records[position]
+        return False, None
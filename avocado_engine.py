@@ -0,0 +1,396 @@
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every OCLC worker"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.lock = threading.Lock()
+    
+    def reserve(self, tokens=1):
+        """Take tokens and return how long the caller must wait before using them"""
+        with self.lock:
+            self.requests += tokens
+            if self.rate <= 0:
+                return 0.0
+            
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            # Going into debt keeps callers in arrival order
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self, tokens=1):
+        """Block until tokens are available"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def set_rate(self, rate):
+        """Change the refill rate, keeping tokens earned at the old one"""
+        with self.lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = float(rate)
+            self.capacity = max(1.0, self.rate)
+
+
+class ThrottledError(Exception):
+    """The server kept throttling a request after every retry"""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateController:
+    """AIMD control of request rate and concurrency driven by server responses
+    
+    Each success adds about one request per second to the rate and one slot per
+    window to the concurrency limit, up to the configured maximums. A 429 or 503
+    halves both and pauses every worker until Retry-After has passed.
+    """
+    THROTTLE_STATUSES = (429, 503)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, bucket, max_concurrency, max_rate=None, adaptive=True,
+                 max_retries=6, min_rate=0.2):
+        self.bucket = bucket
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_rate = max(max_rate or 0, bucket.rate)
+        self.adaptive = adaptive
+        self.max_retries = max_retries
+        self.min_rate = min_rate
+        self.limit = float(self.max_concurrency)
+        self.active = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.cond = threading.Condition()
+    
+    def try_acquire(self):
+        """Take a request slot if one is free; otherwise return how long to wait (None: until a release)"""
+        with self.cond:
+            wait = self.blocked_until - time.monotonic()
+            if wait > 0:
+                return wait
+            if self.active < int(self.limit):
+                self.active += 1
+                return 0
+            return None
+    
+    def acquire(self):
+        """Block until a request slot and a rate token are available"""
+        with self.cond:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.active < int(self.limit):
+                    break
+                self.cond.wait(wait if wait > 0 else None)
+            self.active += 1
+        self.bucket.acquire()
+    
+    def release(self, status=None, retry_after=None):
+        """Free a request slot and adjust the rate from the response status"""
+        with self.cond:
+            self.active -= 1
+            now = time.monotonic()
+            
+            if status in self.THROTTLE_STATUSES:
+                self.throttled += 1
+                self.blocked_until = max(self.blocked_until, now + (retry_after or 1.0))
+                
+                # One decrease per burst of throttled responses already in flight
+                if self.adaptive and now - self.last_decrease > 1.0:
+                    self.last_decrease = now
+                    self.limit = max(1.0, self.limit / 2)
+                    if self.bucket.rate > 0:
+                        self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+            elif status is not None and status < 400 and self.adaptive:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                rate = self.bucket.rate
+                if 0 < rate < self.max_rate:
+                    self.bucket.set_rate(min(self.max_rate, rate + 1 / rate))
+            
+            self.cond.notify_all()
+    
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number attempt, honoring Retry-After, with jitter"""
+        self.retries += 1
+        if retry_after is not None:
+            return retry_after * random.uniform(1.0, 1.25)
+        return min(60.0, 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+def run_ordered(func, items, max_workers=1, should_stop=None):
+    """Yield (item, result) pairs in input order, running func on a bounded thread pool"""
+    if max_workers <= 1:
+        for item in items:
+            if should_stop and should_stop():
+                return
+            yield item, func(item)
+        return
+    
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    window = max_workers * 2
+    
+    try:
+        for item in items:
+            if should_stop and should_stop():
+                return
+            pending.append((item, pool.submit(func, item)))
+            
+            # Keep a bounded number of rows in flight
+            if len(pending) >= window:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        
+        while pending:
+            if should_stop and should_stop():
+                return
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def run_ordered_chunks(func, items, processes, chunk_size=200, initializer=None, initargs=(),
+                       should_stop=None):
+    """Yield (item, result) pairs in input order, running func on chunks of items in worker processes
+    
+    func takes a list of items and returns one result per item. It and the
+    initializer run in freshly spawned processes, so both must be module-level
+    functions (or partials of them) and their arguments picklable. Chunks are
+    collected in the order they were submitted, keeping the output deterministic
+    whatever order the processes finish in.
+    """
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(processes, mp_context=context, initializer=initializer,
+                               initargs=initargs)
+    pending = deque()
+    window = processes * 2
+    remaining = iter(items)
+    
+    try:
+        while True:
+            if should_stop and should_stop():
+                return
+            chunk = list(islice(remaining, chunk_size))
+            if not chunk:
+                break
+            pending.append((chunk, pool.submit(func, chunk)))
+            
+            # Keep a bounded number of chunks in flight
+            if len(pending) >= window:
+                done_chunk, future = pending.popleft()
+                yield from zip(done_chunk, future.result())
+        
+        while pending:
+            if should_stop and should_stop():
+                return
+            done_chunk, future = pending.popleft()
+            yield from zip(done_chunk, future.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def unique_by_key(keys, items):
+    """Return the first item for each distinct key, in first-seen order"""
+    seen = {}
+    for key, item in zip(keys, items):
+        if key not in seen:
+            seen[key] = item
+    return list(seen.items())
+
+
+def fan_out(keys, keyed_results):
+    """Yield (row_index, result) in row order from per-key results arriving in first-seen order"""
+    remaining = Counter(keys)
+    resolved = {}
+    next_row = 0
+    
+    for key, result in keyed_results:
+        resolved[key] = result
+        while next_row < len(keys) and keys[next_row] in resolved:
+            row_key = keys[next_row]
+            yield next_row, resolved[row_key]
+            
+            # Forget results once every row sharing the key has them
+            remaining[row_key] -= 1
+            if not remaining[row_key]:
+                del resolved[row_key]
+            next_row += 1
+
+
+class SharedLookups:
+    """Run each keyed lookup once, letting concurrent callers with the same key wait for it"""
+    
+    def __init__(self, max_entries=None):
+        self.results = OrderedDict()
+        self.max_entries = max_entries
+        self.computed = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key, func):
+        """Return the result for key, computing it with func on first use"""
+        with self.lock:
+            future = self.results.get(key)
+            owner = future is None
+            if owner:
+                future = self.results[key] = Future()
+                self.computed += 1
+                self._evict()
+        
+        if owner:
+            try:
+                future.set_result(func())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+    
+    def _evict(self):
+        """Forget the oldest finished results beyond max_entries"""
+        if self.max_entries is None:
+            return
+        while len(self.results) > self.max_entries:
+            key, future = next(iter(self.results.items()))
+            if not future.done():
+                break
+            del self.results[key]
+
+
+class _StageError:
+    """Exception raised by a pipeline stage, carried to the consumer"""
+    
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+def run_pipeline(items, stages, workers=1, queue_size=100, should_stop=None):
+    """Stream items through stage functions connected by bounded queues
+    
+    Each stage runs on its own worker threads and feeds the next one as soon as
+    an item is ready. (item, result) pairs are yielded in input order, and at
+    most a bounded number of items are in flight at any time.
+    """
+    workers = max(1, workers)
+    stop = threading.Event()
+    queues = [queue.Queue(queue_size) for _ in range(len(stages) + 1)]
+    in_flight = threading.Semaphore(queue_size * (len(stages) + 1) + workers * len(stages))
+    
+    def stopped():
+        return stop.is_set() or bool(should_stop and should_stop())
+    
+    def put(target, message):
+        while not stopped():
+            try:
+                target.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def feed():
+        for index, item in enumerate(items):
+            while not in_flight.acquire(timeout=0.1):
+                if stopped():
+                    return
+            if not put(queues[0], (index, item, item)):
+                return
+        for _ in range(workers):
+            put(queues[0], _DONE)
+    
+    def work(stage, source, target):
+        while not stopped():
+            try:
+                message = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            if message is _DONE:
+                put(target, _DONE)
+                return
+            
+            index, item, value = message
+            try:
+                value = stage(value)
+            except Exception as e:
+                value = _StageError(e)
+            if not put(target, (index, item, value)):
+                return
+    
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for number, stage in enumerate(stages):
+        for _ in range(workers):
+            threads.append(threading.Thread(target=work, daemon=True,
+                                            args=(stage, queues[number], queues[number + 1])))
+    for thread in threads:
+        thread.start()
+    
+    finished = 0
+    pending = {}
+    next_index = 0
+    try:
+        while finished < workers:
+            if stopped():
+                return
+            try:
+                message = queues[-1].get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            if message is _DONE:
+                finished += 1
+                continue
+            
+            index, item, value = message
+            pending[index] = (item, value)
+            
+            # Release items in input order
+            while next_index in pending:
+                item, value = pending.pop(next_index)
+                if isinstance(value, _StageError):
+                    raise value.error
+                yield item, value
+                in_flight.release()
+                next_index += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
@@ -0,0 +1,307 @@
+"""Declarative mapping from WorldCat bib JSON to output columns
+
+Each Column lists rules tried in order until one finds a value, which is how
+fallbacks such as the publisher's are expressed. A Rule holds one or more
+dotted paths into the record ("title.mainTitles.0.text"); digits index lists.
+With each="list.path.*5" the paths are read from every element of the first
+five list items instead. compile_columns turns the declarations into the
+source of one straight-line extractor function, compiled once, so records
+are not re-interpreted for every field.
+"""
+
+MISSING = object()
+
+# Scalar JSON types, for paths that must not pick up an object
+SCALAR = (str, int, float)
+
+# What a path accepts: a truthy value (the default), any value it holds, or any value but ""
+TRUTHY = "truthy"
+PRESENT = "present"
+NOT_EMPTY = "not empty"
+
+
+class Rule:
+    """Where a value comes from and how it is shaped
+    
+    paths are alternatives: the first one holding a value wins, unless combine is
+    set, in which case every path's value is joined with it. An empty path is
+    the element itself. A path given as (path, types) only accepts values of
+    those types (None for any type); otherwise any truthy value is taken and
+    converted to text. (path, types, PRESENT) also takes falsy values and
+    (path, types, NOT_EMPTY) everything except "", where the old extract_*
+    methods did the same.
+    """
+    
+    def __init__(self, *paths, each=None, where=None, combine=None, before=None, after=None,
+                 max_length=None):
+        self.paths = paths
+        self.each = each
+        self.where = where
+        self.combine = combine
+        self.before = before
+        self.after = after
+        self.max_length = max_length
+
+
+class Column:
+    """One output column, filled by the first of its rules that finds a value
+    
+    join combines the values of an each= rule; collect gathers the values of
+    every rule instead, de-duplicated and sorted. clean runs the client's
+    text normalization on each value.
+    """
+    
+    def __init__(self, name, *rules, join=" ; ", collect=None, clean=True):
+        self.name = name
+        self.rules = rules
+        self.join = join
+        self.collect = collect
+        self.clean = clean
+
+
+# The 12 columns taken from bib JSON; "OCLC #" and "URL" come from the OCLC number
+BIB_COLUMNS = (
+    Column("Title", Rule(("title.mainTitles.0.text", str), before=" / ")),
+    Column("Creator", Rule("contributor.creators.0.firstName.text",
+                           "contributor.creators.0.secondName.text", combine=" ")),
+    Column("Contributor", Rule("name.text", each="contributor.contributors.*5")),
+    Column("Publisher",
+           Rule("publishers.0.publisherName.text"),
+           Rule("publication.0.publisher"),
+           Rule(("publisher.0", None, NOT_EMPTY), ("publisher", str)),
+           Rule("placeOfPublication.0.publisher"),
+           # Last resort: the part after a colon in the title
+           Rule(("title.mainTitles.0.text", str), after=" : ", max_length=100)),
+    Column("Date", Rule("date.publicationDate"), clean=False),
+    Column("Language", Rule("language.0.languageCode", ("language.0", str)), clean=False),
+    Column("Subjects", Rule("subjectName.text", ("", str, PRESENT), each="subject.*5")),
+    Column("Type", Rule("itemType.text"), clean=False),
+    Column("Format", Rule("format.0.text", ("format.0", str)), clean=False),
+    Column("ISBN",
+           Rule("", each="identifier.isbns.*"),
+           Rule("value", each="identifier.items.*", where=("type", "isbn")),
+           collect="; ", clean=False),
+    Column("ISSN",
+           Rule("", each="identifier.issns.*"),
+           Rule("value", each="identifier.items.*", where=("type", "issn")),
+           collect="; ", clean=False),
+    Column("Edition", Rule("edition.0.text", ("edition.0", SCALAR + (list,)), "edition.text",
+                           ("edition", SCALAR))),
+)
+
+
+class _Source:
+    """Lines of generated Python with unique temporary names"""
+    
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.names = 0
+        self.shared = {}  # path prefix from the record root -> variable holding it
+    
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+    
+    def name(self, prefix):
+        self.names += 1
+        return f"{prefix}{self.names}"
+    
+    def constant(self, value):
+        """Name under which a non-literal value is passed to the generated code"""
+        name = self.name("c")
+        self.constants[name] = value
+        return name
+
+
+def column_roots(columns):
+    """Top-level record keys the column rules read"""
+    roots = []
+    for column in columns:
+        for rule in column.rules:
+            paths = [rule.each] if rule.each else [
+                path[0] if isinstance(path, tuple) else path for path in rule.paths]
+            for path in paths:
+                root = path.split(".")[0]
+                if root and root not in roots:
+                    roots.append(root)
+    return roots
+
+
+def _split_path(path):
+    return [int(step) if step.isdigit() else step for step in path.split(".")] if path else []
+
+
+def _emit_shared(src, columns):
+    """Emit flat reads of the path prefixes that several rules start with, once per record"""
+    counts = {}
+    for column in columns:
+        for rule in column.rules:
+            paths = [rule.each.rpartition(".")[0]] if rule.each else [
+                path[0] if isinstance(path, tuple) else path for path in rule.paths]
+            for path in paths:
+                steps = tuple(_split_path(path))
+                for end in range(1, len(steps) + 1):
+                    counts[steps[:end]] = counts.get(steps[:end], 0) + 1
+    
+    for prefix in sorted((prefix for prefix, count in counts.items() if count > 1), key=len):
+        current = src.shared.get(prefix[:-1], "data")
+        step = prefix[-1]
+        variable = src.name("s")
+        if isinstance(step, int):
+            src.emit(1, f"{variable} = {current}[{step}] "
+                        f"if {current}.__class__ is list and len({current}) > {step} else MISSING")
+        else:
+            src.emit(1, f"{variable} = {current}.get({step!r}, MISSING) "
+                        f"if {current}.__class__ is dict else MISSING")
+        src.shared[prefix] = variable
+
+
+def _emit_read(src, depth, node, path, target):
+    """Emit code setting target to the value at path below node, or leaving it MISSING"""
+    src.emit(depth, f"{target} = MISSING")
+    steps = _split_path(path)
+    current = node
+    if node == "data":
+        # Start from the longest prefix read once at the top of the function
+        for end in range(len(steps), 0, -1):
+            if tuple(steps[:end]) in src.shared:
+                current = src.shared[tuple(steps[:end])]
+                steps = steps[end:]
+                break
+    for step in steps:
+        following = src.name("n")
+        if isinstance(step, int):
+            src.emit(depth, f"if {current}.__class__ is list and len({current}) > {step}:")
+            depth += 1
+            src.emit(depth, f"{following} = {current}[{step}]")
+        else:
+            src.emit(depth, f"if {current}.__class__ is dict:")
+            depth += 1
+            src.emit(depth, f"{following} = {current}.get({step!r}, MISSING)")
+        current = following
+    src.emit(depth, f"{target} = {current}")
+
+
+def _emit_pick(src, depth, node, rule, target):
+    """Emit code setting target to the rule's raw value below node, or MISSING"""
+    if rule.combine is not None:
+        parts = []
+        for path in rule.paths:
+            part = src.name("p")
+            _emit_read(src, depth, node, path, part)
+            parts.append(f'("" if {part} is MISSING else str({part}))')
+        src.emit(depth, f"{target} = {rule.combine!r}.join(({', '.join(parts)},)).strip() or MISSING")
+        return
+    
+    src.emit(depth, f"{target} = MISSING")
+    for number, path in enumerate(rule.paths):
+        path, types, accepts = (path + (TRUTHY,))[:3] if isinstance(path, tuple) else (path, None, TRUTHY)
+        inner = depth
+        if number:
+            src.emit(depth, f"if {target} is MISSING:")
+            inner += 1
+        found = src.name("v")
+        _emit_read(src, inner, node, path, found)
+        check = f"{found} is not MISSING"
+        if accepts == TRUTHY:
+            check += f" and {found}"
+        elif accepts == NOT_EMPTY:
+            check += f" and {found} != ''"
+        if types is not None:
+            check += f" and isinstance({found}, {src.constant(types)})"
+        src.emit(inner, f"if {check}:")
+        src.emit(inner + 1, f"{target} = {found}")
+
+
+def _emit_shape(src, depth, rule, clean, value, accept):
+    """Emit code turning value into the column text and running accept(depth) with it"""
+    src.emit(depth, f"if {value}.__class__ is not str:")
+    src.emit(depth + 1, f"{value} = str({value})")
+    if rule.before is not None:
+        src.emit(depth, f"{value} = {value}.split({rule.before!r})[0].strip()")
+    if rule.after is not None:
+        src.emit(depth, f"if {rule.after!r} in {value}:")
+        depth += 1
+        src.emit(depth, f"{value} = {value}.split({rule.after!r})[-1].strip()")
+        if rule.max_length is not None:
+            src.emit(depth, f"if len({value}) < {rule.max_length}:")
+            depth += 1
+    if clean:
+        src.emit(depth, f"{value} = clean({value})")
+    accept(depth)
+
+
+def _emit_rule(src, depth, rule, clean, accept):
+    """Emit code running accept(depth, value) for each value a rule produces"""
+    node = "data"
+    if rule.each is not None:
+        list_path, _, star = rule.each.rpartition(".")
+        items = src.name("items")
+        _emit_read(src, depth, "data", list_path, items)
+        src.emit(depth, f"if {items}.__class__ is list:")
+        node = src.name("item")
+        limit = star[1:]
+        src.emit(depth + 1, f"for {node} in {items}{f'[:{int(limit)}]' if limit else ''}:")
+        depth += 2
+        if rule.where:
+            key, expected = rule.where
+            # A type that is not text raises, which empties the column
+            src.emit(depth, f"if {node}.__class__ is not dict or "
+                            f"{node}.get({key!r}, '').lower() != {expected!r}:")
+            src.emit(depth + 1, "continue")
+    
+    value = src.name("value")
+    _emit_pick(src, depth, node, rule, value)
+    src.emit(depth, f"if {value} is not MISSING:")
+    _emit_shape(src, depth + 1, rule, clean, value, lambda inner: accept(inner, value))
+
+
+def _emit_column(src, column):
+    name = repr(column.name)
+    src.emit(1, "try:")
+    
+    if column.collect is not None:
+        values = src.name("values")
+        src.emit(2, f"{values} = set()")
+        for rule in column.rules:
+            _emit_rule(src, 2, rule, column.clean,
+                       lambda depth, value: src.emit(depth, f"{values}.add({value})"))
+        src.emit(2, f"record[{name}] = {column.collect!r}.join(sorted({values}))")
+    else:
+        # The loop runs once; break ends the fallback chain at the first rule with a value
+        src.emit(2, "for _ in ONCE:")
+        for rule in column.rules:
+            if rule.each is not None:
+                values = src.name("values")
+                src.emit(3, f"{values} = []")
+                _emit_rule(src, 3, rule, column.clean,
+                           lambda depth, value: src.emit(depth, f"{values}.append({value})"))
+                src.emit(3, f"record[{name}] = {column.join!r}.join({values})")
+                src.emit(3, "break")
+            else:
+                def accept(depth, value):
+                    src.emit(depth, f"record[{name}] = {value}")
+                    src.emit(depth, "break")
+                _emit_rule(src, 3, rule, column.clean, accept)
+        src.emit(3, f"record[{name}] = ''")
+    
+    src.emit(1, "except Exception:")
+    src.emit(2, f"record[{name}] = ''")
+
+
+def compile_columns(columns, clean_text):
+    """Build one function mapping a bib record to {column: value} for the given columns"""
+    src = _Source()
+    src.emit(0, "def extract(data):")
+    src.emit(1, "record = {}")
+    _emit_shared(src, columns)
+    for column in columns:
+        _emit_column(src, column)
+    src.emit(1, "return record")
+    
+    source = "\n".join(src.lines)
+    namespace = dict(src.constants, MISSING=MISSING, ONCE=(None,), clean=clean_text)
+    exec(compile(source, "<avocado columns>", "exec"), namespace)
+    extract = namespace["extract"]
+    extract.source = source
+    return extract
@@ -0,0 +1,93 @@
+import hashlib
+from pathlib import Path
+
+import avocado_json
+
+
+class RunJournal:
+    """Append-only per-row journal that lets an interrupted run resume where it stopped
+    
+    The first line fingerprints the input file. Each later line records one row's
+    search outcome or its finished output record, keyed by the row's position
+    among the non-empty input rows.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        # Rows completed by the previous run, filled by load()
+        self.searched = {}  # row -> (status, oclc_number, search_record, match)
+        self.records = {}   # row -> (record, error)
+        self.file = None
+    
+    @staticmethod
+    def fingerprint(input_file, *related_files):
+        """Hash of the input file contents, and of any other files the run depends on"""
+        digest = hashlib.sha1()
+        for path in (input_file,) + related_files:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+    
+    def start(self, input_file, *related_files):
+        """Begin a new journal for input_file, discarding any previous one"""
+        self.close()
+        self.searched.clear()
+        self.records.clear()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self._write({"input": self.fingerprint(input_file, *related_files), "file": Path(input_file).name})
+    
+    def load(self, input_file, *related_files):
+        """Load completed rows from an existing journal for input_file
+        
+        Returns False when there is no journal or it was written for different input
+        or related files, such as the baseline of an incremental run.
+        """
+        if not self.path.exists():
+            return False
+        
+        fingerprint = self.fingerprint(input_file, *related_files)
+        with open(self.path, "r", encoding="utf-8") as f:
+            line = f.readline()
+            try:
+                if avocado_json.loads(line).get("input") != fingerprint:
+                    return False
+            except ValueError:
+                return False
+            
+            for line in f:
+                try:
+                    entry = avocado_json.loads(line)
+                except ValueError:
+                    continue  # Torn line from a crash
+                
+                if "record" in entry:
+                    self.records[entry["row"]] = (entry["record"], entry["error"])
+                else:
+                    self.searched[entry["row"]] = (entry["status"], entry["oclc"], entry["search"],
+                                                   entry.get("match"))
+        
+        self.file = open(self.path, "a", encoding="utf-8")
+        if not line.endswith("\n"):
+            self.file.write("\n")
+        return True
+    
+    def record_search(self, row, status, oclc_number, search_record, match=None):
+        """Journal the search outcome of a row, with the strategy and score of its match"""
+        self._write({"row": row, "status": status, "oclc": oclc_number, "search": search_record,
+                     "match": match})
+    
+    def record_metadata(self, row, record, error):
+        """Journal the finished output record of a row"""
+        self._write({"row": row, "record": record, "error": error})
+    
+    def _write(self, entry):
+        self.file.write(avocado_json.dumps(entry) + "\n")
+        self.file.flush()
+    
+    def close(self):
+        """Close the journal file"""
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,46 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library is used without it
+    orjson = None
+
+
+# Decoder in use; set_backend() switches it
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def set_backend(name):
+    """Select "orjson" or "json"; "auto" takes orjson when it is installed"""
+    global BACKEND
+    BACKEND = "orjson" if name in ("auto", "orjson") and orjson is not None else "json"
+    return BACKEND
+
+
+def loads(data):
+    """Decode JSON text or UTF-8 bytes"""
+    if BACKEND == "orjson":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. integers beyond 64 bits, which the standard library accepts
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8-sig")
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Encode to a JSON string, keeping non-ASCII characters as they are"""
+    if BACKEND == "orjson":
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def project(data, keys):
+    """Copy of a JSON object holding only the given top-level keys, in document order"""
+    if not isinstance(data, dict):
+        return data
+    return {key: value for key, value in data.items() if key in keys}
@@ -0,0 +1,196 @@
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+
+
+# Strategy hit rates kept between runs, next to the response cache
+DEFAULT_STRATEGY_STATS_PATH = Path.home() / ".avocado" / "strategy_stats.json"
+
+
+def normalize(text):
+    """Casefolded text without accents or punctuation, for comparing titles and names"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", text.casefold()).strip()
+
+
+def candidate_title(bib):
+    """Main title of a bib record without its statement of responsibility"""
+    try:
+        text = bib["title"]["mainTitles"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return "", ""
+    title, _, responsibility = str(text).partition(" / ")
+    return title, responsibility
+
+
+def candidate_names(bib):
+    """Creator and contributor names of a bib record, as one string"""
+    names = []
+    contributor = bib.get("contributor") if isinstance(bib, dict) else None
+    if isinstance(contributor, dict):
+        for creator in contributor.get("creators") or []:
+            if isinstance(creator, dict):
+                for part in ("firstName", "secondName"):
+                    if isinstance(creator.get(part), dict):
+                        names.append(creator[part].get("text", ""))
+        for other in contributor.get("contributors") or []:
+            if isinstance(other, dict) and isinstance(other.get("name"), dict):
+                names.append(other["name"].get("text", ""))
+    return " ".join(name for name in names if name)
+
+
+def rank_candidates(bibs, title, author, title_weight=0.7):
+    """Score every candidate against the row and return (score, bib) pairs, best first
+    
+    The title score is the best character similarity against the candidate's
+    full title or the part before its subtitle. The author score is the share
+    of the row's author words found among the candidate's names. Ties keep the
+    server's order.
+    """
+    row_title = normalize(title)
+    row_author = set(normalize(author).split())
+    
+    # seq2 is indexed once and reused for every candidate
+    matcher = SequenceMatcher(autojunk=False)
+    matcher.set_seq2(row_title)
+    
+    ranked = []
+    for position, bib in enumerate(bibs):
+        if not isinstance(bib, dict):
+            continue
+        full_title, responsibility = candidate_title(bib)
+        title_score = 0.0
+        for variant in {normalize(full_title), normalize(full_title.split(" : ")[0])}:
+            if variant:
+                matcher.set_seq1(variant)
+                title_score = max(title_score, matcher.ratio())
+        
+        if row_author:
+            names = set(normalize(candidate_names(bib) + " " + responsibility).split())
+            author_score = len(row_author & names) / len(row_author)
+            score = title_weight * title_score + (1 - title_weight) * author_score
+        else:
+            score = title_score
+        ranked.append((round(score, 3), position, bib))
+    
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return [(score, bib) for score, _, bib in ranked]
+
+
+def match_score(bib, title, author):
+    """Similarity of a single bib record to the row"""
+    ranked = rank_candidates([bib], title, author)
+    return ranked[0][0] if ranked else 0.0
+
+
+class StrategyStats:
+    """Per-strategy search attempts and hits, used to try the likeliest strategies first
+    
+    Strategies are ordered by smoothed hit rate. One that has almost never hit
+    after enough attempts is skipped, except on every explore_every-th search,
+    which runs the default order so skipped strategies keep being measured.
+    The last strategy of the default order is never skipped: rows only reach
+    it when every other strategy missed, so its hit rate is a conditional one
+    and it is each row's final fallback. Skips are counted per strategy.
+    Counts from earlier runs are kept separately so the summary shows this run.
+    """
+    
+    def __init__(self, path=None, min_attempts=30, skip_rate=0.02, explore_every=20, memory=1000):
+        self.path = Path(path) if path else None
+        self.min_attempts = min_attempts
+        self.skip_rate = skip_rate
+        self.explore_every = explore_every
+        self.memory = memory
+        self.attempts = Counter()
+        self.hits = Counter()
+        self.prior_attempts = Counter()
+        self.prior_hits = Counter()
+        self.skipped = Counter()
+        self.searches = 0
+        self.lock = threading.Lock()
+    
+    def record(self, name, hit):
+        """Count one attempt of a strategy"""
+        with self.lock:
+            self.attempts[name] += 1
+            if hit:
+                self.hits[name] += 1
+    
+    def hit_rate(self, name):
+        """Share of attempts that found a record, smoothed toward one half"""
+        attempts = self.attempts[name] + self.prior_attempts[name]
+        hits = self.hits[name] + self.prior_hits[name]
+        return (hits + 1) / (attempts + 2)
+    
+    def order(self, strategies):
+        """(name, query) pairs in the order most likely to need the fewest requests"""
+        with self.lock:
+            self.searches += 1
+            if self.searches % self.explore_every == 0:
+                return list(strategies)
+            
+            # sorted() is stable, so untried strategies keep the default order
+            ordered = sorted(strategies, key=lambda strategy: -self.hit_rate(strategy[0]))
+            fallback = strategies[-1][0] if strategies else None
+            kept = []
+            for strategy in ordered:
+                if strategy[0] != fallback and self.exhausted(strategy[0]):
+                    self.skipped[strategy[0]] += 1
+                else:
+                    kept.append(strategy)
+            return kept
+    
+    def exhausted(self, name):
+        """True when a strategy has been tried enough to know it rarely hits"""
+        attempts = self.attempts[name] + self.prior_attempts[name]
+        hits = self.hits[name] + self.prior_hits[name]
+        return attempts >= self.min_attempts and hits / attempts < self.skip_rate
+    
+    def summary(self):
+        """(name, attempts, hits, skipped) for each strategy tried or skipped in this run"""
+        with self.lock:
+            names = list(self.attempts) + [name for name in self.skipped if name not in self.attempts]
+            return [(name, self.attempts[name], self.hits[name], self.skipped[name]) for name in names]
+    
+    def load(self):
+        """Pick up counts saved by earlier runs"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            for name, (attempts, hits) in saved.items():
+                self.prior_attempts[name] = int(attempts)
+                self.prior_hits[name] = int(hits)
+        except Exception:
+            pass
+    
+    def save(self):
+        """Keep combined counts for later runs, scaled down so recent runs weigh more"""
+        if not self.path:
+            return
+        with self.lock:
+            saved = {}
+            for name in set(self.attempts) | set(self.prior_attempts):
+                attempts = self.attempts[name] + self.prior_attempts[name]
+                hits = self.hits[name] + self.prior_hits[name]
+                if attempts > self.memory:
+                    hits = round(hits * self.memory / attempts)
+                    attempts = self.memory
+                saved[name] = [attempts, hits]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Jobs of the service save at the same time, each through a file of its own
+            temp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            temp_path.replace(self.path)
+        except Exception:
+            pass
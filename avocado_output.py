@@ -0,0 +1,290 @@
+import csv
+import re
+import sqlite3
+from pathlib import Path
+
+import avocado_json
+
+
+class OutputWriter:
+    """Output file that takes records one at a time
+    
+    fieldnames fixes the columns up front; without them the first record's keys
+    are used, as for basic results that keep whatever columns the input had.
+    If no record comes, close() still creates the file, with empty_fieldnames
+    as its columns (every output has at least an OCLC # column). Writers hold
+    at most one batch of records, so outputs of any size stream.
+    """
+    extension = ""
+    
+    def __init__(self, path, fieldnames=None, empty_fieldnames=None):
+        self.path = Path(path)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.empty_fieldnames = list(empty_fieldnames or ["OCLC #"])
+        self.count = 0
+        self.started = False
+        if self.fieldnames:
+            self.start()
+    
+    def start(self):
+        """Create the output once the columns are known"""
+        self.started = True
+    
+    def write(self, record):
+        """Append one record"""
+        if not self.started:
+            self.fieldnames = list(record)
+            self.start()
+        self.write_record(record)
+        self.count += 1
+    
+    def start_empty(self):
+        """Create the file with the fallback columns if no record was written"""
+        if not self.started:
+            self.fieldnames = self.empty_fieldnames
+            self.start()
+    
+    def write_record(self, record):
+        raise NotImplementedError
+    
+    def write_all(self, records):
+        """Append every record and return how many have been written"""
+        for record in records:
+            self.write(record)
+        return self.count
+    
+    def flush(self):
+        """Make the records written so far visible to readers of the file"""
+    
+    def close(self):
+        """Finish the file"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @classmethod
+    def read(cls, path):
+        """Yield the records of a file this writer wrote"""
+        raise NotImplementedError
+
+
+class CSVWriter(OutputWriter):
+    """CSV with a byte order mark, so spreadsheet programs detect UTF-8"""
+    extension = ".csv"
+    
+    def __init__(self, path, fieldnames=None, empty_fieldnames=None):
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = None
+        super().__init__(path, fieldnames, empty_fieldnames)
+    
+    def start(self):
+        super().start()
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames)
+        self.writer.writeheader()
+    
+    def write_record(self, record):
+        self.writer.writerow(record)
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        self.start_empty()
+        self.file.close()
+    
+    @classmethod
+    def read(cls, path):
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+class JSONLWriter(OutputWriter):
+    """One JSON object per line, in column order"""
+    extension = ".jsonl"
+    
+    def __init__(self, path, fieldnames=None, empty_fieldnames=None):
+        self.file = open(path, "w", encoding="utf-8")
+        super().__init__(path, fieldnames, empty_fieldnames)
+    
+    def write_record(self, record):
+        self.file.write(avocado_json.dumps({name: record.get(name, "") for name in self.fieldnames}))
+        self.file.write("\n")
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+    
+    @classmethod
+    def read(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield avocado_json.loads(line)
+
+
+class ParquetWriter(OutputWriter):
+    """Parquet file of string columns, written a row group at a time
+    
+    Needs pyarrow, which is only imported when Parquet output is chosen.
+    """
+    extension = ".parquet"
+    
+    def __init__(self, path, fieldnames=None, empty_fieldnames=None, row_group_size=50000):
+        import pyarrow
+        import pyarrow.parquet
+        
+        self.pyarrow = pyarrow
+        self.row_group_size = row_group_size
+        self.columns = None
+        self.buffered = 0
+        self.writer = None
+        super().__init__(path, fieldnames, empty_fieldnames)
+    
+    def start(self):
+        super().start()
+        schema = self.pyarrow.schema([(name, self.pyarrow.string()) for name in self.fieldnames])
+        self.columns = {name: [] for name in self.fieldnames}
+        self.writer = self.pyarrow.parquet.ParquetWriter(str(self.path), schema, compression="zstd")
+    
+    def write_record(self, record):
+        for name, values in self.columns.items():
+            value = record.get(name)
+            values.append(None if value is None else str(value))
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.write_row_group()
+    
+    def write_row_group(self):
+        """Write the buffered rows as one row group"""
+        if not self.buffered:
+            return
+        self.writer.write_table(self.pyarrow.table(self.columns, schema=self.writer.schema))
+        for values in self.columns.values():
+            values.clear()
+        self.buffered = 0
+    
+    def close(self):
+        # Row groups are not flushed early: many small groups make the file slow to scan
+        self.start_empty()
+        self.write_row_group()
+        self.writer.close()
+    
+    @classmethod
+    def read(cls, path):
+        import pyarrow.parquet
+        
+        for batch in pyarrow.parquet.ParquetFile(str(path)).iter_batches():
+            for record in batch.to_pylist():
+                yield {name: "" if value is None else value for name, value in record.items()}
+
+
+class SQLiteWriter(OutputWriter):
+    """SQLite database with a records table indexed on OCLC #, ISBN and Title
+    
+    Multi-valued ISBNs are also split into an isbns table (isbn, record), where
+    record is the rowid in records, so any single ISBN can be looked up.
+    """
+    extension = ".sqlite"
+    
+    # Columns that get an index when the output has them
+    INDEXED_COLUMNS = ("OCLC #", "ISBN", "Title")
+    
+    def __init__(self, path, fieldnames=None, empty_fieldnames=None, batch_size=10000):
+        path = Path(path)
+        if path.exists():
+            path.unlink()
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.batch_size = batch_size
+        self.rows = []
+        self.isbns = []
+        super().__init__(path, fieldnames, empty_fieldnames)
+    
+    @staticmethod
+    def quote(name):
+        return '"' + name.replace('"', '""') + '"'
+    
+    def start(self):
+        super().start()
+        columns = ", ".join(f"{self.quote(name)} TEXT" for name in self.fieldnames)
+        self.conn.execute(f"CREATE TABLE records ({columns})")
+        self.conn.execute("CREATE TABLE isbns (isbn TEXT NOT NULL, record INTEGER NOT NULL)")
+        names = ", ".join(["rowid"] + [self.quote(name) for name in self.fieldnames])
+        self.insert = f"INSERT INTO records ({names}) VALUES ({', '.join('?' * (len(self.fieldnames) + 1))})"
+    
+    def write_record(self, record):
+        rowid = self.count + 1
+        self.rows.append([rowid] + [record.get(name) for name in self.fieldnames])
+        for isbn in str(record.get("ISBN") or "").split(";"):
+            if isbn.strip():
+                self.isbns.append((isbn.strip(), rowid))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self.rows:
+            self.conn.executemany(self.insert, self.rows)
+            self.conn.executemany("INSERT INTO isbns VALUES (?, ?)", self.isbns)
+            self.rows = []
+            self.isbns = []
+        self.conn.commit()
+    
+    def close(self):
+        self.start_empty()
+        self.flush()
+        # Indexes are built once at the end, which is faster than maintaining them per insert
+        for name in self.INDEXED_COLUMNS:
+            if name in self.fieldnames:
+                slug = re.sub(r"\W+", "_", name.lower()).strip("_")
+                self.conn.execute(f"CREATE INDEX records_{slug} ON records ({self.quote(name)})")
+        self.conn.execute("CREATE INDEX isbns_isbn ON isbns (isbn)")
+        self.conn.commit()
+        self.conn.close()
+    
+    @classmethod
+    def read(cls, path):
+        conn = sqlite3.connect(str(path))
+        try:
+            cursor = conn.execute("SELECT * FROM records ORDER BY rowid")
+            names = [column[0] for column in cursor.description]
+            for row in cursor:
+                yield {name: "" if value is None else value for name, value in zip(names, row)}
+        finally:
+            conn.close()
+
+
+OUTPUT_WRITERS = {
+    "csv": CSVWriter,
+    "jsonl": JSONLWriter,
+    "parquet": ParquetWriter,
+    "sqlite": SQLiteWriter,
+}
+
+
+def output_writer(output_format):
+    """Writer class for a format; ValueError if unknown, ImportError if its library is missing"""
+    writer = OUTPUT_WRITERS.get(output_format)
+    if writer is None:
+        raise ValueError(f"Unknown output format: {output_format} "
+                         f"(choose {', '.join(OUTPUT_WRITERS)})")
+    if writer is ParquetWriter:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from None
+    return writer
+
+
+def read_records(path):
+    """Yield the records of an output file, in any format a writer produces"""
+    suffix = Path(path).suffix.lower()
+    for writer in OUTPUT_WRITERS.values():
+        if writer.extension == suffix:
+            return writer.read(path)
+    raise ValueError(f"Not an AVOCADO output file: {Path(path).name}")
@@ -0,0 +1,476 @@
+"""Local job service: an HTTP API other tools use to enrich book lists
+    
+    python avocado_cli.py --serve 127.0.0.1:8765
+    
+    POST   /jobs             queue a job; the body is a CSV file (Content-Type text/csv)
+                             or JSON, either a list of rows or {"books": [...], "name": ...,
+                             "format": ...}; ?name= and ?format= work for both
+    GET    /jobs             recent jobs, newest first
+    GET    /jobs/<id>        status, progress and counts of one job
+    GET    /jobs/<id>/result download the output once the job is done
+    DELETE /jobs/<id>        cancel a queued or running job
+
+Several jobs run at once (two by default), each with its own workflow state
+on a job client that shares the service client's token, connection pool,
+response cache, archive and adaptive rate, so a large job does not hold up
+the others and together they stay within one rate budget. Jobs are kept in
+a SQLite store, and a job that was running when the service stopped resumes
+from its journal on restart.
+"""
+import csv
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import avocado_json
+from avocado_batch import REQUIRED_COLUMNS
+from avocado_output import OUTPUT_WRITERS, output_writer
+from avocado_workflow import Workflow
+
+
+# Default location, next to the response cache
+DEFAULT_SERVICE_DIR = Path.home() / ".avocado" / "service"
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Jobs run at once unless the service is told otherwise
+JOB_WORKERS = 2
+
+# Largest request body accepted
+MAX_UPLOAD_BYTES = 100 << 20
+
+CONTENT_TYPES = {
+    ".csv": "text/csv; charset=utf-8",
+    ".jsonl": "application/x-ndjson",
+    ".parquet": "application/vnd.apache.parquet",
+    ".sqlite": "application/vnd.sqlite3",
+}
+
+JOB_COLUMNS = ("id", "name", "status", "format", "created", "started", "finished", "progress",
+               "message", "total", "oclc_found", "metadata_complete", "output", "error", "resume")
+
+
+class JobStore:
+    """Persistent SQLite record of submitted jobs, with one directory per job for its files"""
+    
+    def __init__(self, directory=DEFAULT_SERVICE_DIR):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        
+        (self.directory / "jobs").mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.directory / "jobs.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                format TEXT NOT NULL,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                total INTEGER,
+                oclc_found INTEGER,
+                metadata_complete INTEGER,
+                output TEXT,
+                error TEXT,
+                resume INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self.conn.commit()
+    
+    def job_dir(self, job_id):
+        """Directory holding a job's input, journal and output"""
+        return self.directory / "jobs" / job_id
+    
+    def create(self, name, output_format):
+        """Add a queued job and return its id"""
+        job_id = uuid.uuid4().hex[:12]
+        self.job_dir(job_id).mkdir(parents=True)
+        with self.lock:
+            self.conn.execute("INSERT INTO jobs (id, name, status, format, created) VALUES (?, ?, ?, ?, ?)",
+                              (job_id, name, QUEUED, output_format, time.time()))
+            self.conn.commit()
+        return job_id
+    
+    def update(self, job_id, **fields):
+        """Set some columns of a job"""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self.conn.commit()
+    
+    def get(self, job_id):
+        """A job as a dict, or None"""
+        with self.lock:
+            row = self.conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?",
+                                    (job_id,)).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+    
+    def list(self, limit=100):
+        """The most recent jobs, newest first"""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs "
+                                     f"ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(zip(JOB_COLUMNS, row)) for row in rows]
+    
+    def claim_next(self):
+        """Mark the oldest queued job running and return it, or None if nothing is queued
+        
+        The status guard on the UPDATE makes the claim atomic: a job cancelled
+        after it was read is not claimed, and the next one is tried instead.
+        """
+        with self.lock:
+            while True:
+                row = self.conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE status = ? "
+                                        f"ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+                if row is None:
+                    return None
+                job = dict(zip(JOB_COLUMNS, row))
+                claimed = self.conn.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ? AND status = ?",
+                                            (RUNNING, time.time(), job["id"], QUEUED)).rowcount
+                self.conn.commit()
+                if claimed:
+                    job["status"] = RUNNING
+                    return job
+    
+    def requeue_interrupted(self):
+        """Queue jobs left running by a stopped service again, to resume from their journal"""
+        with self.lock:
+            count = self.conn.execute("UPDATE jobs SET status = ?, resume = 1 WHERE status = ?",
+                                      (QUEUED, RUNNING)).rowcount
+            self.conn.commit()
+        return count
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class JobService:
+    """Queue of enrichment jobs run on one long-lived client
+    
+    The client is prepared once, so the OAuth token, pooled connections, response
+    cache and adaptive rate carry over from job to job. Runner threads take jobs
+    in submission order, each job on a job client of its own sharing that state;
+    the live progress of running jobs is kept in memory and written to the store
+    when a job ends.
+    """
+    
+    def __init__(self, app_instance, directory=DEFAULT_SERVICE_DIR, log=None, workers=JOB_WORKERS):
+        self.app = app_instance
+        self.store = JobStore(directory)
+        self.log = log or (lambda message: None)
+        self.wake = threading.Condition()
+        self.stopping = False
+        self.current = {}        # job id -> Workflow, or None until it is built, of running jobs
+        self.live = {}           # job id -> {"progress", "message"} while it runs
+        self.cancelled = set()
+        self.runners = [threading.Thread(target=self.run_jobs, name=f"avocado-jobs-{number + 1}", daemon=True)
+                        for number in range(max(1, workers))]
+    
+    def start(self):
+        """Start taking jobs, first resuming any the last service left running"""
+        resumed = self.store.requeue_interrupted()
+        if resumed:
+            self.log(f"Resuming {resumed} interrupted job(s)")
+        for runner in self.runners:
+            runner.start()
+    
+    def stop(self):
+        """Stop the running jobs and the runners; the jobs resume when the service starts again"""
+        with self.wake:
+            self.stopping = True
+            for workflow in self.current.values():
+                if workflow:
+                    workflow.stop()
+            self.wake.notify_all()
+        for runner in self.runners:
+            runner.join()
+        self.store.close()
+    
+    def submit(self, books, name="job", output_format=None):
+        """Queue a job for a list of rows and return it"""
+        output_format = output_format or self.app.output_format
+        output_writer(output_format)
+        name = re.sub(r"[^\w.-]+", "_", name).strip("._")[:60] or "job"
+        
+        job_id = self.store.create(name, output_format)
+        fieldnames = ["OCLC #", "Author", "Title"]
+        for book in books:
+            fieldnames.extend(column for column in book if column not in fieldnames)
+        with open(self.store.job_dir(job_id) / f"{name}.csv", "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+            writer.writeheader()
+            writer.writerows(books)
+        
+        with self.wake:
+            self.wake.notify_all()
+        self.log(f"Job {job_id} queued: {name}, {len(books)} rows")
+        return self.status(job_id)
+    
+    def status(self, job_id):
+        """A job's public state, or None if there is no such job"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        job.update(self.live.get(job_id, {}))
+        job.pop("resume")
+        output = job.pop("output")
+        job["result"] = f"/jobs/{job_id}/result" if job["status"] == DONE and output else None
+        return job
+    
+    def jobs(self):
+        return [self.status(job["id"]) for job in self.store.list()]
+    
+    def result_path(self, job_id):
+        """Output file of a finished job, or None"""
+        job = self.store.get(job_id)
+        if job is None or job["status"] != DONE or not job["output"]:
+            return None
+        path = Path(job["output"])
+        return path if path.exists() else None
+    
+    def cancel(self, job_id):
+        """Cancel a queued or running job; False if it has already ended"""
+        with self.wake:
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in (QUEUED, RUNNING):
+                return False
+            if job_id in self.current:
+                self.cancelled.add(job_id)
+                if self.current[job_id]:
+                    self.current[job_id].stop()
+            else:
+                self.store.update(job_id, status=CANCELLED, finished=time.time())
+        self.log(f"Job {job_id} cancelled")
+        return True
+    
+    def run_jobs(self):
+        """Runner thread: take queued jobs one at a time until the service stops"""
+        while True:
+            with self.wake:
+                job = None if self.stopping else self.store.claim_next()
+                while job is None and not self.stopping:
+                    self.wake.wait(5)
+                    job = self.store.claim_next()
+                if self.stopping:
+                    if job:
+                        self.store.update(job["id"], status=QUEUED)
+                    return
+                # Claimed and current under the same lock, so cancel() always sees one or the other
+                self.current[job["id"]] = None
+            try:
+                self.run_job(job)
+            except Exception as e:
+                self.store.update(job["id"], status=FAILED, finished=time.time(), error=str(e))
+            finally:
+                with self.wake:
+                    self.current.pop(job["id"], None)
+                    self.cancelled.discard(job["id"])
+    
+    def run_job(self, job):
+        """Run one job's complete workflow on a job client of the shared client"""
+        job_id = job["id"]
+        job_dir = self.store.job_dir(job_id)
+        result = {}
+        live = self.live[job_id] = {"progress": 0, "message": ""}
+        
+        def progress_update(message):
+            live["message"] = message
+        
+        def progress_value(value):
+            live["progress"] = value
+        
+        # Per-job settings and statistics; the rate limiter, token, session and cache stay warm
+        client = self.app.job_client()
+        client.input_file = str(job_dir / f"{job['name']}.csv")
+        client.output_dir = str(job_dir)
+        client.output_format = job["format"]
+        client.baseline_file = ""
+        
+        workflow = Workflow(client, bool(job["resume"]), progress_update, progress_value,
+                            lambda output_file, *counts: result.update(output=output_file, counts=counts),
+                            lambda message: result.update(error=message))
+        with self.wake:
+            if job_id in self.cancelled:
+                self.live.pop(job_id, None)
+                self.store.update(job_id, status=CANCELLED, finished=time.time())
+                self.log(f"Job {job_id} cancelled")
+                return
+            if self.stopping:
+                # Left running, so the next service start resumes it
+                self.live.pop(job_id, None)
+                return
+            self.current[job_id] = workflow
+        self.log(f"Job {job_id} started")
+        try:
+            workflow.run()
+        finally:
+            with self.wake:
+                stopping = self.stopping
+            self.live.pop(job_id, None)
+        
+        fields = dict(progress=live["progress"], message=live["message"], finished=time.time())
+        if "output" in result:
+            total, found_oclc, metadata_complete = result["counts"]
+            fields.update(status=DONE, output=str(result["output"]), total=total, oclc_found=found_oclc,
+                          metadata_complete=metadata_complete)
+        elif "error" in result:
+            fields.update(status=FAILED, error=result["error"])
+        elif job_id in self.cancelled:
+            fields.update(status=CANCELLED)
+        elif stopping:
+            # Left running, so the next service start resumes it
+            return
+        else:
+            fields.update(status=FAILED, error="Stopped without output")
+        self.store.update(job_id, **fields)
+        self.log(f"Job {job_id} {fields['status']}")
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP front end of the JobService set on the server"""
+    server_version = "AVOCADO"
+    
+    def do_GET(self):
+        service = self.server.service
+        parts = self.path_parts()
+        if parts == ["jobs"]:
+            self.send_json(200, {"jobs": service.jobs()})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = service.status(parts[1])
+            if job is None:
+                self.send_json(404, {"error": "No such job"})
+            else:
+                self.send_json(200, job)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            self.send_result(parts[1])
+        else:
+            self.send_json(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        if self.path_parts() != ["jobs"]:
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            books, options = self.read_job()
+            job = self.server.service.submit(books, options.get("name") or "job", options.get("format"))
+        except (ValueError, ImportError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(202, job, location=f"/jobs/{job['id']}")
+    
+    def do_DELETE(self):
+        parts = self.path_parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self.send_json(404, {"error": "Not found"})
+        elif self.server.service.cancel(parts[1]):
+            self.send_json(200, self.server.service.status(parts[1]))
+        else:
+            self.send_json(409, {"error": "Job is not queued or running"})
+    
+    def path_parts(self):
+        return [part for part in urlsplit(self.path).path.split("/") if part]
+    
+    def read_job(self):
+        """Rows and options ("name", "format") of a submitted job; ValueError if unusable"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            raise ValueError("Send the job's rows as the request body")
+        if length > MAX_UPLOAD_BYTES:
+            raise ValueError(f"Request body over {MAX_UPLOAD_BYTES >> 20} MB")
+        body = self.rfile.read(length)
+        options = {name: values[-1] for name, values in parse_qs(urlsplit(self.path).query).items()}
+        
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type == "application/json":
+            try:
+                data = avocado_json.loads(body)
+            except ValueError:
+                raise ValueError("Body is not valid JSON") from None
+            if isinstance(data, dict):
+                options = {**options, **{name: data[name] for name in ("name", "format") if data.get(name)}}
+                data = data.get("books")
+            if not isinstance(data, list) or not all(isinstance(book, dict) for book in data):
+                raise ValueError('JSON jobs need a list of rows, or {"books": [rows]}')
+            books = [{str(column): "" if value is None else str(value) for column, value in book.items()}
+                     for book in data]
+        else:
+            try:
+                lines = body.decode("utf-8-sig").splitlines()
+            except UnicodeDecodeError:
+                raise ValueError("CSV body must be UTF-8") from None
+            reader = csv.DictReader(lines)
+            if not REQUIRED_COLUMNS.issubset(reader.fieldnames or []):
+                raise ValueError(f"CSV must contain columns: {', '.join(REQUIRED_COLUMNS)}")
+            books = list(reader)
+        
+        if not books:
+            raise ValueError("The job has no rows")
+        if options.get("format") and options["format"] not in OUTPUT_WRITERS:
+            raise ValueError(f"Unknown output format: {options['format']} (choose {', '.join(OUTPUT_WRITERS)})")
+        return books, options
+    
+    def send_json(self, status, data, location=None):
+        body = avocado_json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if location:
+            self.send_header("Location", location)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_result(self, job_id):
+        """Stream a finished job's output file"""
+        path = self.server.service.result_path(job_id)
+        if path is None:
+            self.send_json(404, {"error": "No result for this job"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES.get(path.suffix, "application/octet-stream"))
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{path.name}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(1 << 16)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+    
+    def log_message(self, format, *args):
+        self.server.service.log(f"{self.address_string()} {format % args}")
+
+
+def serve(app_instance, host="127.0.0.1", port=8765, directory=DEFAULT_SERVICE_DIR, log=None,
+          workers=JOB_WORKERS):
+    """Run the job service until interrupted"""
+    service = JobService(app_instance, directory, log, workers)
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    
+    service.start()
+    service.log(f"AVOCADO job service on http://{host}:{server.server_address[1]}/jobs "
+                f"(jobs in {service.store.directory})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.stop()
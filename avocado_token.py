@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+# Default location, next to the response cache
+DEFAULT_TOKEN_PATH = Path.home() / ".avocado" / "token.json"
+
+
+class TokenManager:
+    """OAuth access token shared by every worker, refreshed shortly before it expires
+    
+    fetch(wskey, wssecret) requests a new token and returns (access_token, expires_in),
+    or None on failure. A still-valid token is kept on disk so the next run can skip
+    the OAuth round-trip.
+    """
+    
+    def __init__(self, fetch, path=DEFAULT_TOKEN_PATH, refresh_margin=60):
+        self.fetch = fetch
+        self.path = Path(path) if path else None
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expires = 0.0
+        self.identity = None
+        self.fetches = 0
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def identity_of(wskey, wssecret):
+        """Hash identifying the credentials a token belongs to"""
+        return hashlib.sha256(f"{wskey}:{wssecret}".encode("utf-8")).hexdigest()
+    
+    def usable(self, wskey, wssecret, stale=None):
+        """Return the current token if it is valid for these credentials, else None"""
+        if (self.token and self.token != stale
+                and self.identity == self.identity_of(wskey, wssecret)
+                and time.time() < self.expires - self.refresh_margin):
+            return self.token
+        return None
+    
+    def get(self, wskey, wssecret, stale=None, force=False):
+        """Return a valid token, fetching a new one only when needed
+        
+        A worker that got a 401 passes the rejected token as stale. Only the first
+        such worker refreshes; the rest pick up the token it fetched.
+        """
+        if not force:
+            token = self.usable(wskey, wssecret, stale)
+            if token:
+                return token
+        
+        with self.lock:
+            identity = self.identity_of(wskey, wssecret)
+            if identity != self.identity:
+                self.token, self.expires, self.identity = None, 0.0, identity
+                if not force:
+                    self._load()
+            
+            if not force:
+                token = self.usable(wskey, wssecret, stale)
+                if token:
+                    return token
+            
+            self.fetches += 1
+            result = self.fetch(wskey, wssecret)
+            if not result or not result[0]:
+                self.token, self.expires = None, 0.0
+                return None
+            
+            self.token, expires_in = result
+            self.expires = time.time() + expires_in
+            self._save()
+            return self.token
+    
+    def _load(self):
+        """Pick up a token saved by an earlier run with the same credentials"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("identity") == self.identity:
+                self.token = saved["token"]
+                self.expires = float(saved["expires"])
+        except Exception:
+            pass
+    
+    def _save(self):
+        """Keep the token for later runs, readable only by this user"""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            fd = os.open(str(temp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"identity": self.identity, "token": self.token, "expires": self.expires}, f)
+            os.replace(str(temp_path), str(self.path))
+        except Exception:
+            pass
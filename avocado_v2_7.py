@@ -1,14 +1,6 @@
 import sys
 import os
-from PyQt5.QtCore import Qt
-from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv()  # automatically looks for .env in the current dir
 import csv
-import time
-import requests
-import unicodedata
-import re
 from pathlib import Path
 
 # ✅ Now import everything else
@@ -18,270 +10,63 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton,
     QTextEdit, QFileDialog, QMessageBox, QProgressBar, QGroupBox, 
     QGridLayout, QFrame, QCheckBox, QVBoxLayout, QHBoxLayout, QTabWidget,
-    QSizePolicy, QSpacerItem
+    QSizePolicy, QSpacerItem, QSpinBox, QDoubleSpinBox, QComboBox
 )
 
+from avocado_core import OCLCClient
+
 # ✅ Nothing PyQt5-related (e.g., QPixmap, QFont) must appear before the above block
 
 
 # Full logo path (safe across platforms)
 logo_path = os.path.join(os.path.dirname(__file__), "avocado_logo.png")
 
-# Declare logo_pixmap as global variable (will be initialized in main)
-logo_pixmap = None
-
 class WorkerThread(QThread):
     """Worker thread for OCLC operations without blocking UI"""
     progress_update = pyqtSignal(str)
     progress_value = pyqtSignal(int)
     workflow_complete = pyqtSignal(str, int, int, int)
     workflow_error = pyqtSignal(str)
-
     
-    def __init__(self, operation_type, app_instance):
+    
+    def __init__(self, operation_type, app_instance, resume=False, input_files=None):
         super().__init__()
         self.operation_type = operation_type
-        self.app = app_instance
-        self.should_stop = False
-
+        callbacks = (self.progress_update.emit, self.progress_value.emit, self.workflow_complete.emit,
+                     self.workflow_error.emit)
+        # The workflow modules are imported when work starts, to keep the window's startup fast
+        if operation_type == "batch_workflow":
+            from avocado_batch import BatchWorkflow
+            self.workflow = BatchWorkflow(app_instance, input_files, resume, *callbacks)
+        else:
+            from avocado_workflow import Workflow
+            self.workflow = Workflow(app_instance, resume, *callbacks)
+    
     def run(self):
         """Execute operation in separate thread"""
-        try:
-            if self.operation_type == "complete_workflow":
-                self.run_complete_workflow()
-        except Exception as e:
-            self.workflow_error.emit(f"Unexpected error: {str(e)}")
+        if self.operation_type in ("complete_workflow", "batch_workflow"):
+            self.workflow.run()
     
     def stop(self):
         """Stop operation"""
-        self.should_stop = True
-    
-    def run_complete_workflow(self):
-        """Execute complete workflow"""
-        try:
-            self.progress_update.emit("AVOCADO Professional - Complete Workflow Started")
-            self.progress_update.emit("=" * 60)
-            
-            # Phase 1: Authentication
-            self.progress_update.emit("Phase 1: Authenticating with OCLC...")
-            self.progress_value.emit(5)
-            
-            if not self.app.fetch_oclc_token():
-                self.workflow_error.emit("Failed to authenticate with OCLC API")
-                return
-                
-            self.progress_update.emit("OCLC authentication successful")
-            self.progress_value.emit(10)
-            
-            if self.should_stop:
-                return
-            
-            # Phase 2: Read CSV file
-            self.progress_update.emit("Phase 2: Processing CSV file...")
-            
-            try:
-                with open(self.app.input_file, 'r', encoding='utf-8-sig') as f:
-                    reader = csv.DictReader(f)
-                    
-                    # Validate headers
-                    expected_headers = {'OCLC #', 'Author', 'Title'}
-                    if not expected_headers.issubset(set(reader.fieldnames)):
-                        self.workflow_error.emit(f"CSV must contain columns: {', '.join(expected_headers)}")
-                        return
-                    
-                    # Read books
-                    raw_books = list(reader)
-                    
-                # Filter valid books
-                books = []
-                for book in raw_books:
-                    if any(v.strip() for v in book.values() if v):
-                        books.append(book)
-                
-                if not books:
-                    self.workflow_error.emit("No valid books found in CSV")
-                    return
-                    
-            except Exception as e:
-                self.workflow_error.emit(f"Error reading CSV: {str(e)}")
-                return
-            
-            total_books = len(books)
-            self.progress_update.emit(f"Found {total_books} books to process")
-            self.progress_value.emit(15)
-            
-            if self.should_stop:
-                return
-            
-            # Phase 3: Search for OCLC numbers
-            self.progress_update.emit("Phase 3: Searching for OCLC numbers...")
-            
-            oclc_results = []
-            found_oclc = 0
-            
-            for i, book in enumerate(books):
-                if self.should_stop:
-                    return
-                    
-                existing_oclc = book.get("OCLC #", "").strip()
-                title = book.get("Title", "").strip()
-                author = book.get("Author", "").strip()
-                
-                display_title = title[:40] + "..." if len(title) > 40 else title
-                self.progress_update.emit(f"Processing {i+1}/{total_books}: {display_title}")
-                
-                if existing_oclc:
-                    self.progress_update.emit(f"OCLC already present: {existing_oclc}")
-                    book["OCLC #"] = existing_oclc
-                    found_oclc += 1
-                elif title and author:
-                    oclc_number = self.app.search_oclc(title, author)
-                    book["OCLC #"] = oclc_number or ""
-                    if oclc_number:
-                        self.progress_update.emit(f"OCLC found: {oclc_number}")
-                        found_oclc += 1
-                    else:
-                        self.progress_update.emit("No OCLC found")
-                else:
-                    self.progress_update.emit("Insufficient data for search")
-                    book["OCLC #"] = ""
-                
-                oclc_results.append(book)
-                
-                # Progress 15-50% for OCLC search
-                progress = 15 + int((i + 1) / total_books * 35)
-                self.progress_value.emit(progress)
-                
-                time.sleep(0.3)  # Rate limiting
-            
-            self.progress_update.emit(f"Phase 3 complete: {found_oclc}/{total_books} OCLC numbers found")
-            
-            if self.should_stop:
-                return
-            
-            # Phase 4: Download complete metadata
-            self.progress_update.emit("Phase 4: Downloading complete metadata...")
-            self.progress_value.emit(50)
-            
-            # Extract valid OCLC numbers
-            oclc_numbers = []
-            for result in oclc_results:
-                oclc_num = result.get("OCLC #", "").strip()
-                if oclc_num:
-                    oclc_numbers.append((oclc_num, result))
-            
-            if not oclc_numbers:
-                self.progress_update.emit("No OCLC numbers to download metadata")
-                # Save basic results
-                self.save_basic_results(oclc_results)
-                return
-            
-            # Process metadata
-            complete_records = []
-            metadata_complete = 0
-            
-            for i, (oclc_num, original_book) in enumerate(oclc_numbers):
-                if self.should_stop:
-                    return
-                    
-                self.progress_update.emit(f"Downloading metadata {i+1}/{len(oclc_numbers)}: OCLC {oclc_num}")
-                
-                try:
-                    metadata = self.app.fetch_metadata_json(oclc_num)
-                    record = self.app.parse_complete_record(metadata or {}, oclc_num, original_book)
-                    complete_records.append(record)
-                    
-                    if record.get("Title") and record.get("Publisher"):
-                        self.progress_update.emit(f"Complete: {record['Title'][:30]}...")
-                        metadata_complete += 1
-                    else:
-                        self.progress_update.emit("Partial metadata")
-                        
-                except Exception as e:
-                    self.progress_update.emit(f"Error in metadata: {str(e)}")
-                    # Create basic record on error
-                    record = self.app.create_basic_record(original_book, oclc_num)
-                    complete_records.append(record)
-                
-                # Progress 50-90% for metadata
-                progress = 50 + int((i + 1) / len(oclc_numbers) * 40)
-                self.progress_value.emit(progress)
-                
-                time.sleep(0.3)  # Rate limiting
-            
-            # Phase 5: Save results
-            self.progress_update.emit("Phase 5: Saving final file...")
-            self.progress_value.emit(90)
-            
-            output_file = self.save_complete_results(complete_records)
-            
-            self.progress_value.emit(100)
-            self.progress_update.emit("=" * 60)
-            self.progress_update.emit("COMPLETE WORKFLOW FINISHED!")
-            self.progress_update.emit(f"File: {Path(output_file).name}")
-            self.progress_update.emit(f"Total: {len(complete_records)} | OCLC: {found_oclc} | Metadata: {metadata_complete}")
-            self.progress_update.emit("=" * 60)
-            
-            # Emit completion signal
-            self.workflow_complete.emit(output_file, len(complete_records), found_oclc, metadata_complete)
-            
-        except Exception as e:
-            self.workflow_error.emit(f"Workflow error: {str(e)}")
-    
-    def save_basic_results(self, results):
-        """Save basic results without metadata"""
-        input_name = Path(self.app.input_file).stem
-        timestamp = int(time.time())
-        output_file = Path(self.app.output_dir) / f"{input_name}_avocado_basic_{timestamp}.csv"
-        
-        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-            if results:
-                fieldnames = results[0].keys()
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(results)
-        
-        self.workflow_complete.emit(str(output_file), len(results), 0, 0)
-    
-    def save_complete_results(self, records):
-        """Save complete results with metadata"""
-        input_name = Path(self.app.input_file).stem
-        timestamp = int(time.time())
-        output_file = Path(self.app.output_dir) / f"{input_name}_avocado_professional_{timestamp}.csv"
-        
-        # Field order for consistent output
-        fieldnames = [
-            "OCLC #", "Title", "Creator", "Contributor", "Publisher", 
-            "Date", "Language", "Subjects", "Type", "Format", 
-            "ISBN", "ISSN", "Edition", "URL"
-        ]
-        
-        with open(output_file, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(records)
-        
-        return str(output_file)
+        self.workflow.stop()
 
 class AvocadoProfessional(QMainWindow):
     def __init__(self):
         super().__init__()
+        # The OCLC client holds the settings, loaded from .env, and does the work
+        self.client = OCLCClient()
         
         # State variables
-        self.wskey = ""
-        self.wssecret = ""
-        self.input_file = ""
-        self.output_dir = str(Path.home() / "Downloads")
-        self.access_token = None
         self.worker_thread = None
         
-        # Load credentials
-        self.load_credentials()
-        
         # Initialize UI
         self.init_ui()
         self.apply_professional_styles()
         
+        # Scale the logo once the window is on screen
+        QTimer.singleShot(0, self.load_logo)
+    
     def init_ui(self):
         """Initialize professional interface"""
         self.setWindowTitle("AVOCADO v2.7 - Archivo Venezuela OCLC & Data Organizer")
@@ -331,12 +116,9 @@ class AvocadoProfessional(QMainWindow):
         title_layout.addWidget(features_label)
         title_layout.addStretch()
         
-        # Logo
-        logo_label = QLabel()
-        if logo_pixmap and not logo_pixmap.isNull():
-            logo_label.setPixmap(logo_pixmap)
-        else:
-            logo_label.setText("LOGO")
+        # Logo, filled in by load_logo
+        self.logo_label = QLabel()
+        self.logo_label.setMinimumHeight(48)
         
         # Status indicator
         self.status_indicator = QLabel("●")
@@ -347,10 +129,18 @@ class AvocadoProfessional(QMainWindow):
         header_layout.addWidget(title_widget)
         header_layout.addStretch()
         header_layout.addWidget(self.status_indicator)
-        header_layout.addWidget(logo_label)
+        header_layout.addWidget(self.logo_label)
         
         main_layout.addWidget(header)
     
+    def load_logo(self):
+        """Load and scale the header logo"""
+        logo_pixmap = QPixmap(logo_path)
+        if logo_pixmap.isNull():
+            self.logo_label.setText("LOGO")
+        else:
+            self.logo_label.setPixmap(logo_pixmap.scaledToHeight(48, Qt.SmoothTransformation))
+    
     def create_content_area(self, main_layout):
         """Create content area with professional tabs"""
         content_widget = QWidget()
@@ -362,14 +152,37 @@ class AvocadoProfessional(QMainWindow):
         self.tab_widget.setObjectName("professionalTabs")
         content_layout.addWidget(self.tab_widget)
         
-        # Create tabs
+        # Create tabs; Advanced and About are built the first time they are opened
+        self.lazy_tabs = {}
         self.create_setup_tab()
         self.create_complete_workflow_tab()
-        self.create_advanced_tab()
-        self.create_about_tab()
+        self.add_lazy_tab("Advanced", self.create_advanced_tab)
+        self.add_lazy_tab("About", self.create_about_tab)
+        self.tab_widget.currentChanged.connect(self.build_lazy_tab)
         
         main_layout.addWidget(content_widget)
     
+    def add_lazy_tab(self, title, create_tab):
+        """Add a placeholder tab whose contents are created on first view"""
+        placeholder = QWidget()
+        self.lazy_tabs[placeholder] = create_tab
+        self.tab_widget.addTab(placeholder, title)
+    
+    def build_lazy_tab(self, index):
+        """Swap a placeholder tab for its real contents"""
+        placeholder = self.tab_widget.widget(index)
+        create_tab = self.lazy_tabs.pop(placeholder, None)
+        if create_tab is None:
+            return
+        
+        title = self.tab_widget.tabText(index)
+        self.tab_widget.blockSignals(True)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, create_tab(), title)
+        self.tab_widget.setCurrentIndex(index)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+    
     def create_setup_tab(self):
         """Professional setup tab"""
         tab = QWidget()
@@ -414,7 +227,7 @@ class AvocadoProfessional(QMainWindow):
         self.wskey_input = QLineEdit()
         self.wskey_input.setEchoMode(QLineEdit.Password)
         self.wskey_input.setPlaceholderText("Enter your OCLC WSKey")
-        self.wskey_input.setText(self.wskey)
+        self.wskey_input.setText(self.client.wskey)
         self.wskey_input.textChanged.connect(self.on_credentials_changed)
         cred_layout.addWidget(self.wskey_input, 0, 1)
         
@@ -423,13 +236,13 @@ class AvocadoProfessional(QMainWindow):
         self.wssecret_input = QLineEdit()
         self.wssecret_input.setEchoMode(QLineEdit.Password)
         self.wssecret_input.setPlaceholderText("Enter your OCLC Secret")
-        self.wssecret_input.setText(self.wssecret)
+        self.wssecret_input.setText(self.client.wssecret)
         self.wssecret_input.textChanged.connect(self.on_credentials_changed)
         cred_layout.addWidget(self.wssecret_input, 1, 1)
         
         # Save credentials checkbox
         self.save_creds_checkbox = QCheckBox("Save credentials securely (.env file)")
-        self.save_creds_checkbox.setChecked(bool(self.wskey and self.wssecret))
+        self.save_creds_checkbox.setChecked(bool(self.client.wskey and self.client.wssecret))
         self.save_creds_checkbox.setObjectName("saveCredsCheckbox")
         cred_layout.addWidget(self.save_creds_checkbox, 2, 0, 1, 2)
         
@@ -446,19 +259,31 @@ class AvocadoProfessional(QMainWindow):
         file_layout.setSpacing(15)
         
         file_layout.addWidget(QLabel("Output Directory:"), 0, 0)
-        self.output_dir_input = QLineEdit(self.output_dir)
-        self.output_dir_input.textChanged.connect(lambda: setattr(self, 'output_dir', self.output_dir_input.text()))
+        self.output_dir_input = QLineEdit(self.client.output_dir)
+        self.output_dir_input.textChanged.connect(
+            lambda: setattr(self.client, 'output_dir', self.output_dir_input.text()))
         file_layout.addWidget(self.output_dir_input, 0, 1)
         
         browse_btn = QPushButton("Browse")
         browse_btn.clicked.connect(self.browse_output_dir)
         file_layout.addWidget(browse_btn, 0, 2)
         
+        file_layout.addWidget(QLabel("Output Format:"), 1, 0)
+        self.output_format_input = QComboBox()
+        self.output_format_input.addItem("CSV", "csv")
+        self.output_format_input.addItem("JSON Lines", "jsonl")
+        self.output_format_input.addItem("Parquet (needs pyarrow)", "parquet")
+        self.output_format_input.addItem("SQLite (indexed on OCLC #, ISBN and Title)", "sqlite")
+        self.output_format_input.setCurrentIndex(max(0, self.output_format_input.findData(self.client.output_format)))
+        self.output_format_input.currentIndexChanged.connect(
+            lambda: setattr(self.client, 'output_format', self.output_format_input.currentData()))
+        file_layout.addWidget(self.output_format_input, 1, 1, 1, 2)
+        
         # Template download
         template_btn = QPushButton("Download AVOCADO Template")
         template_btn.setObjectName("templateButton")
         template_btn.clicked.connect(self.download_template)
-        file_layout.addWidget(template_btn, 1, 0, 1, 3)
+        file_layout.addWidget(template_btn, 2, 0, 1, 3)
         
         # Add all groups
         layout.addWidget(welcome_group)
@@ -503,7 +328,8 @@ class AvocadoProfessional(QMainWindow):
         input_layout.addWidget(QLabel("CSV File:"), 0, 0)
         self.input_file_input = QLineEdit()
         self.input_file_input.setPlaceholderText("Select CSV file with your book list")
-        self.input_file_input.textChanged.connect(lambda: setattr(self, 'input_file', self.input_file_input.text()))
+        self.input_file_input.textChanged.connect(
+            lambda: setattr(self.client, 'input_file', self.input_file_input.text()))
         input_layout.addWidget(self.input_file_input, 0, 1)
         
         browse_input_btn = QPushButton("Browse")
@@ -537,6 +363,7 @@ class AvocadoProfessional(QMainWindow):
         self.results_text.setObjectName("professionalResults")
         self.results_text.setReadOnly(True)
         self.results_text.setMinimumHeight(250)
+        self.results_text.document().setMaximumBlockCount(5000)  # Keep the log bounded on huge files
         results_layout.addWidget(self.results_text)
         
         # Control buttons
@@ -547,10 +374,30 @@ class AvocadoProfessional(QMainWindow):
         self.stop_btn.clicked.connect(self.stop_processing)
         self.stop_btn.setEnabled(False)
         
+        # Picks up from the journal of an interrupted run on the same file
+        self.resume_btn = QPushButton("Resume Previous Run")
+        self.resume_btn.clicked.connect(lambda: self.start_complete_workflow(resume=True))
+        
+        # Rebuilds the output from archived raw responses without contacting OCLC
+        self.reextract_btn = QPushButton("Re-extract from Archive")
+        self.reextract_btn.clicked.connect(lambda: self.start_complete_workflow(offline=True))
+        
+        # Processes only the rows that are new or changed since a previous output
+        self.update_btn = QPushButton("Update Previous Output...")
+        self.update_btn.clicked.connect(self.start_incremental_workflow)
+        
+        # Runs every CSV in a folder as one batch, with an output per file and a report
+        self.batch_btn = QPushButton("Process Folder...")
+        self.batch_btn.clicked.connect(self.start_batch_workflow)
+        
         clear_btn = QPushButton("Clear")
         clear_btn.clicked.connect(self.results_text.clear)
         
         controls_layout.addWidget(self.stop_btn)
+        controls_layout.addWidget(self.resume_btn)
+        controls_layout.addWidget(self.reextract_btn)
+        controls_layout.addWidget(self.update_btn)
+        controls_layout.addWidget(self.batch_btn)
         controls_layout.addStretch()
         controls_layout.addWidget(clear_btn)
         
@@ -566,7 +413,7 @@ class AvocadoProfessional(QMainWindow):
         self.tab_widget.addTab(tab, "Complete Workflow")
     
     def create_advanced_tab(self):
-        """Advanced options tab"""
+        """Advanced options tab, returned for add_lazy_tab"""
         tab = QWidget()
         layout = QVBoxLayout(tab)
         layout.setSpacing(25)
@@ -636,6 +483,135 @@ class AvocadoProfessional(QMainWindow):
         oclc_buttons.addWidget(clear_btn)
         oclc_layout.addLayout(oclc_buttons)
         
+        # Performance settings
+        perf_group = QGroupBox("Performance Settings")
+        perf_group.setObjectName("performanceGroup")
+        perf_layout = QGridLayout(perf_group)
+        perf_layout.setSpacing(15)
+        
+        perf_layout.addWidget(QLabel("Parallel workers:"), 0, 0)
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, 32)
+        self.workers_input.setValue(self.client.max_workers)
+        self.workers_input.valueChanged.connect(lambda value: setattr(self.client, 'max_workers', value))
+        perf_layout.addWidget(self.workers_input, 0, 1)
+        
+        perf_layout.addWidget(QLabel("Requests per second:"), 1, 0)
+        self.rate_input = QDoubleSpinBox()
+        self.rate_input.setRange(0.5, 100.0)
+        self.rate_input.setSingleStep(0.5)
+        self.rate_input.setValue(self.client.requests_per_second)
+        self.rate_input.valueChanged.connect(lambda value: setattr(self.client, 'requests_per_second', value))
+        perf_layout.addWidget(self.rate_input, 1, 1)
+        
+        perf_layout.addWidget(QLabel("HTTP engine:"), 2, 0)
+        self.engine_input = QComboBox()
+        self.engine_input.addItem("Thread pool", "threads")
+        self.engine_input.addItem("Asyncio (aiohttp)", "async")
+        self.engine_input.setCurrentIndex(max(0, self.engine_input.findData(self.client.http_engine)))
+        self.engine_input.currentIndexChanged.connect(
+            lambda: setattr(self.client, 'http_engine', self.engine_input.currentData()))
+        perf_layout.addWidget(self.engine_input, 2, 1)
+        
+        perf_layout.addWidget(QLabel("Async requests in flight:"), 3, 0)
+        self.async_concurrency_input = QSpinBox()
+        self.async_concurrency_input.setRange(1, 1000)
+        self.async_concurrency_input.setValue(self.client.async_concurrency)
+        self.async_concurrency_input.valueChanged.connect(
+            lambda value: setattr(self.client, 'async_concurrency', value))
+        perf_layout.addWidget(self.async_concurrency_input, 3, 1)
+        
+        perf_layout.addWidget(QLabel("Workflow mode:"), 4, 0)
+        self.workflow_mode_input = QComboBox()
+        self.workflow_mode_input.addItem("Phased (search all, then download all)", "phased")
+        self.workflow_mode_input.addItem("Pipeline (stream rows, save as they complete)", "pipeline")
+        self.workflow_mode_input.setCurrentIndex(max(0, self.workflow_mode_input.findData(self.client.workflow_mode)))
+        self.workflow_mode_input.currentIndexChanged.connect(
+            lambda: setattr(self.client, 'workflow_mode', self.workflow_mode_input.currentData()))
+        perf_layout.addWidget(self.workflow_mode_input, 4, 1)
+        
+        perf_layout.addWidget(QLabel("Search mode:"), 5, 0)
+        self.search_mode_input = QComboBox()
+        self.search_mode_input.addItem("Strategies (up to four queries in turn)", "strategies")
+        self.search_mode_input.addItem("Ranked (one broad query, ranked locally)", "ranked")
+        self.search_mode_input.addItem("Race (all queries at once, lowest latency)", "race")
+        self.search_mode_input.setCurrentIndex(max(0, self.search_mode_input.findData(self.client.search_mode)))
+        self.search_mode_input.currentIndexChanged.connect(
+            lambda: setattr(self.client, 'search_mode', self.search_mode_input.currentData()))
+        perf_layout.addWidget(self.search_mode_input, 5, 1)
+        
+        self.strategy_order_checkbox = QCheckBox("Try the search strategies that hit most often first")
+        self.strategy_order_checkbox.setChecked(self.client.strategy_order == "adaptive")
+        self.strategy_order_checkbox.toggled.connect(
+            lambda checked: setattr(self.client, 'strategy_order', "adaptive" if checked else "fixed"))
+        perf_layout.addWidget(self.strategy_order_checkbox, 6, 0, 1, 2)
+        
+        self.reuse_search_checkbox = QCheckBox("Reuse search results as metadata when complete")
+        self.reuse_search_checkbox.setChecked(self.client.reuse_search_records)
+        self.reuse_search_checkbox.toggled.connect(
+            lambda checked: setattr(self.client, 'reuse_search_records', checked))
+        perf_layout.addWidget(self.reuse_search_checkbox, 7, 0, 1, 2)
+        
+        self.adaptive_rate_checkbox = QCheckBox("Adapt rate and concurrency when OCLC throttles requests")
+        self.adaptive_rate_checkbox.setChecked(self.client.adaptive_rate)
+        self.adaptive_rate_checkbox.toggled.connect(
+            lambda checked: setattr(self.client, 'adaptive_rate', checked))
+        perf_layout.addWidget(self.adaptive_rate_checkbox, 8, 0, 1, 2)
+        
+        perf_layout.addWidget(QLabel("Maximum requests per second:"), 9, 0)
+        self.max_rate_input = QDoubleSpinBox()
+        self.max_rate_input.setRange(0.5, 100.0)
+        self.max_rate_input.setSingleStep(0.5)
+        self.max_rate_input.setValue(self.client.max_requests_per_second)
+        self.max_rate_input.valueChanged.connect(
+            lambda value: setattr(self.client, 'max_requests_per_second', value))
+        perf_layout.addWidget(self.max_rate_input, 9, 1)
+        
+        perf_desc = QLabel("All workers share one request budget. Use your WSKey's allowance. "
+                           "With adaptation on, the rate climbs toward the maximum and backs off on 429/503.")
+        perf_desc.setObjectName("stepDesc")
+        perf_desc.setWordWrap(True)
+        perf_layout.addWidget(perf_desc, 10, 0, 1, 2)
+        
+        # Response cache
+        cache_group = QGroupBox("Response Cache")
+        cache_group.setObjectName("cacheGroup")
+        cache_layout = QGridLayout(cache_group)
+        cache_layout.setSpacing(15)
+        
+        cache_layout.addWidget(QLabel("Cache mode:"), 0, 0)
+        self.cache_mode_input = QComboBox()
+        self.cache_mode_input.addItem("Use cached responses", "use")
+        self.cache_mode_input.addItem("Refresh (re-download and update)", "refresh")
+        self.cache_mode_input.addItem("Bypass cache", "bypass")
+        self.cache_mode_input.setCurrentIndex(max(0, self.cache_mode_input.findData(self.client.cache_mode)))
+        self.cache_mode_input.currentIndexChanged.connect(
+            lambda: setattr(self.client, 'cache_mode', self.cache_mode_input.currentData()))
+        cache_layout.addWidget(self.cache_mode_input, 0, 1)
+        
+        cache_layout.addWidget(QLabel("Keep responses (days):"), 1, 0)
+        self.cache_ttl_input = QSpinBox()
+        self.cache_ttl_input.setRange(1, 3650)
+        self.cache_ttl_input.setValue(self.client.cache_ttl_days)
+        self.cache_ttl_input.valueChanged.connect(lambda value: setattr(self.client, 'cache_ttl_days', value))
+        cache_layout.addWidget(self.cache_ttl_input, 1, 1)
+        
+        clear_cache_btn = QPushButton("Clear Cache")
+        clear_cache_btn.clicked.connect(self.clear_response_cache)
+        cache_layout.addWidget(clear_cache_btn, 2, 1)
+        
+        self.project_responses_checkbox = QCheckBox("Keep only the fields AVOCADO uses (smaller cache, faster replays)")
+        self.project_responses_checkbox.setChecked(self.client.project_responses)
+        self.project_responses_checkbox.toggled.connect(
+            lambda checked: setattr(self.client, 'project_responses', checked))
+        cache_layout.addWidget(self.project_responses_checkbox, 3, 0, 1, 2)
+        
+        self.archive_responses_checkbox = QCheckBox("Archive raw responses for offline re-extraction")
+        self.archive_responses_checkbox.setChecked(self.client.archive_responses)
+        self.archive_responses_checkbox.toggled.connect(
+            lambda checked: setattr(self.client, 'archive_responses', checked))
+        cache_layout.addWidget(self.archive_responses_checkbox, 4, 0, 1, 2)
+        
         # Advanced progress
         self.advanced_progress = QProgressBar()
         self.advanced_progress.setObjectName("advancedProgressBar")
@@ -643,13 +619,15 @@ class AvocadoProfessional(QMainWindow):
         # Add to layout
         layout.addWidget(steps_group)
         layout.addWidget(oclc_group)
+        layout.addWidget(perf_group)
+        layout.addWidget(cache_group)
         layout.addWidget(self.advanced_progress)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "Advanced")
+        return tab
     
     def create_about_tab(self):
-        """About tab with professional design"""
+        """About tab with professional design, returned for add_lazy_tab"""
         tab = QWidget()
         layout = QVBoxLayout(tab)
         layout.setSpacing(25)
@@ -710,7 +688,7 @@ class AvocadoProfessional(QMainWindow):
         layout.addWidget(tech_group)
         layout.addStretch()
         
-        self.tab_widget.addTab(tab, "About")
+        return tab
     
     def apply_professional_styles(self):
         """Apply clean professional styling without shadows and transforms"""
@@ -1141,54 +1119,11 @@ class AvocadoProfessional(QMainWindow):
         """)
     
     # Helper methods
-    def load_credentials(self):
-        """Load credentials from .env - CLEAN VERSION"""
-        env_files = ['.env', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')]
-        
-        for env_file in env_files:
-            if os.path.exists(env_file):
-                try:
-                    with open(env_file, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key, value = line.split('=', 1)
-                                key = key.strip()
-                                value = value.strip().strip('"\'')
-                                
-                                if key == 'OCLC_WSKEY':
-                                    self.wskey = value
-                                elif key == 'OCLC_WSSECRET':
-                                    self.wssecret = value
-                                elif key == 'OUTPUT_DIR':
-                                    self.output_dir = value
-                    return
-                except Exception:
-                    pass
-    
-    def save_credentials(self):
-        """Save credentials to .env"""
-        try:
-            env_content = f"""# AVOCADO v2.7 - OCLC Credentials
-# Keep this file secure and do not commit to version control
-
-OCLC_WSKEY={self.wskey}
-OCLC_WSSECRET={self.wssecret}
-
-# Output directory
-OUTPUT_DIR={self.output_dir}
-"""
-            with open('.env', 'w', encoding='utf-8') as f:
-                f.write(env_content)
-            return True
-        except Exception:
-            return False
-    
     # Event handlers
     def on_credentials_changed(self):
         """Handle credential changes"""
-        self.wskey = self.wskey_input.text().strip()
-        self.wssecret = self.wssecret_input.text().strip()
+        self.client.wskey = self.wskey_input.text().strip()
+        self.client.wssecret = self.wssecret_input.text().strip()
         self.update_connection_status(False)
     
     def update_connection_status(self, connected):
@@ -1206,14 +1141,14 @@ OUTPUT_DIR={self.output_dir}
     
     def test_connection(self):
         """Test OCLC connection"""
-        if not self.wskey or not self.wssecret:
+        if not self.client.wskey or not self.client.wssecret:
             QMessageBox.warning(self, "AVOCADO Professional", 
                               "Please enter both credentials to test connection.")
             return
         
         # Save credentials if checked
         if self.save_creds_checkbox.isChecked():
-            self.save_credentials()
+            self.client.save_credentials()
         
         self.test_btn.setText("Testing...")
         self.test_btn.setEnabled(False)
@@ -1223,7 +1158,7 @@ OUTPUT_DIR={self.output_dir}
     def do_connection_test(self):
         """Perform actual connection test"""
         try:
-            if self.fetch_oclc_token():
+            if self.client.fetch_oclc_token(force=True):
                 self.update_connection_status(True)
                 QMessageBox.information(self, "AVOCADO Professional - Success", 
                                       "Connection successful!\n\n"
@@ -1250,14 +1185,14 @@ OUTPUT_DIR={self.output_dir}
         )
         if filename:
             self.input_file_input.setText(filename)
-            self.input_file = filename
+            self.client.input_file = filename
     
     def browse_output_dir(self):
         """Browse for output directory"""
         dirname = QFileDialog.getExistingDirectory(self, "Select output directory")
         if dirname:
             self.output_dir_input.setText(dirname)
-            self.output_dir = dirname
+            self.client.output_dir = dirname
     
     def download_template(self):
         """Download CSV template"""
@@ -1291,47 +1226,93 @@ OUTPUT_DIR={self.output_dir}
                 QMessageBox.critical(self, "AVOCADO Professional", 
                                    f"Error saving template:\n{str(e)}")
     
-    def start_complete_workflow(self):
-        """Start complete professional workflow"""
-        # Validations
-        if not self.input_file:
+    def start_incremental_workflow(self):
+        """Pick a previous output for the selected file and process only what changed since"""
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Select previous AVOCADO output", self.client.output_dir,
+            "AVOCADO output (*.csv *.jsonl *.parquet *.sqlite)"
+        )
+        if filename:
+            self.start_complete_workflow(baseline=filename)
+    
+    def start_batch_workflow(self):
+        """Pick a folder and process every CSV in it as one batch"""
+        directory = QFileDialog.getExistingDirectory(self, "Select folder of CSV files",
+                                                     str(Path(self.client.input_file).parent)
+                                                     if self.client.input_file else "")
+        if not directory:
+            return
+        from avocado_batch import batch_inputs
+        input_files = batch_inputs([directory])
+        if not input_files:
+            QMessageBox.warning(self, "AVOCADO Professional", 
+                              "The selected folder has no CSV files.")
+            return
+        self.start_complete_workflow(input_files=input_files)
+    
+    def start_complete_workflow(self, resume=False, offline=False, baseline="", input_files=None):
+        """Start complete professional workflow, resume an interrupted one, re-extract offline or run a batch"""
+        # Validations; a batch has its files from the folder already
+        if not input_files and not self.client.input_file:
             QMessageBox.warning(self, "AVOCADO Professional", 
                               "Please select a CSV file first.")
             return
-            
-        if not os.path.exists(self.input_file):
+        
+        if not input_files and not os.path.exists(self.client.input_file):
             QMessageBox.warning(self, "AVOCADO Professional", 
                               "Selected file does not exist.")
             return
-            
-        if not self.wskey or not self.wssecret:
+        
+        if not offline and (not self.client.wskey or not self.client.wssecret):
             QMessageBox.warning(self, "AVOCADO Professional", 
                               "Please configure your OCLC credentials first.")
             return
+        self.client.offline = offline
+        self.client.baseline_file = baseline
         
         # Prepare UI
         self.process_btn.setText("Processing...")
         self.process_btn.setEnabled(False)
+        self.resume_btn.setEnabled(False)
+        self.reextract_btn.setEnabled(False)
+        self.update_btn.setEnabled(False)
+        self.batch_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.progress_bar.setValue(0)
         self.results_text.clear()
         
         # Update credentials and directory
-        self.wskey = self.wskey_input.text().strip()
-        self.wssecret = self.wssecret_input.text().strip()
-        self.output_dir = self.output_dir_input.text().strip()
+        self.client.wskey = self.wskey_input.text().strip()
+        self.client.wssecret = self.wssecret_input.text().strip()
+        self.client.output_dir = self.output_dir_input.text().strip()
         
         # Create output directory
         try:
-            os.makedirs(self.output_dir, exist_ok=True)
+            os.makedirs(self.client.output_dir, exist_ok=True)
         except Exception as e:
-            QMessageBox.critical(self, "AVOCADO Professional", 
+            QMessageBox.critical(self, "AVOCADO Professional",
                                f"Could not create output directory:\n{str(e)}")
             self.reset_ui()
             return
         
+        # Reset the rate limiter and open the response cache
+        try:
+            self.client.prepare_run()
+        except Exception as e:
+            self.client.response_cache = None
+            self.update_progress_text(f"Response cache unavailable: {str(e)}")
+        
+        if offline and not self.client.response_archive:
+            QMessageBox.critical(self, "AVOCADO Professional",
+                               f"Could not open the response archive in:\n{self.client.archive_dir}")
+            self.reset_ui()
+            return
+        
         # Start worker thread
-        self.worker_thread = WorkerThread("complete_workflow", self)
+        if input_files:
+            self.worker_thread = WorkerThread("batch_workflow", self.client, resume, input_files)
+        else:
+            self.worker_thread = WorkerThread("complete_workflow", self.client, resume)
         self.worker_thread.progress_update.connect(self.update_progress_text)
         self.worker_thread.progress_value.connect(self.progress_bar.setValue)
         self.worker_thread.workflow_complete.connect(self.on_workflow_complete)
@@ -1381,6 +1362,10 @@ OUTPUT_DIR={self.output_dir}
         """Reset UI after processing"""
         self.process_btn.setText("Process Complete Professional Workflow")
         self.process_btn.setEnabled(True)
+        self.resume_btn.setEnabled(True)
+        self.reextract_btn.setEnabled(True)
+        self.update_btn.setEnabled(True)
+        self.batch_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         if self.worker_thread:
             self.worker_thread = None
@@ -1414,414 +1399,23 @@ OUTPUT_DIR={self.output_dir}
                 QMessageBox.critical(self, "AVOCADO Professional", 
                                    f"Error loading file:\n{str(e)}")
     
-    # OCLC API methods - FIXED VERSION
-    def fetch_oclc_token(self):
-        """Get OCLC token - CLEAN"""
+    def clear_response_cache(self):
+        """Delete every cached WorldCat response"""
         try:
-            token_url = "https://oauth.oclc.org/token"
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            payload = {
-                "grant_type": "client_credentials",
-                "scope": "wcapi:view_bib"
-            }
-            
-            response = requests.post(token_url, 
-                                   auth=(self.wskey, self.wssecret), 
-                                   data=payload, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                self.access_token = response.json().get("access_token")
-                return True
-            return False
-        except Exception:
-            return False
-    
-    def search_oclc(self, title, author):
-        """Search for OCLC number - CLEAN VERSION"""
-        try:
-            # Clean search terms
-            title_clean = self.clean_search_term(title)
-            author_clean = self.clean_search_term(author)
-            
-            # Multiple search strategies
-            queries = [
-                f'ti:"{title_clean}" AND au:"{author_clean}"',
-                f'ti:{title_clean} AND au:{author_clean}',
-                f'"{title_clean}" AND "{author_clean}"',
-                f'{title_clean} {author_clean}',
-            ]
-            
-            for query in queries:
-                result = self._search_with_query(query)
-                if result:
-                    return result
-                time.sleep(0.2)
-                    
-            return None
-        except Exception:
-            return None
-    
-    def _search_with_query(self, query):
-        """Perform search with specific query - FIXED API PARAMETERS"""
-        try:
-            url = "https://americas.discovery.api.oclc.org/worldcat/search/v2/bibs"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Accept": "application/json"
-            }
-            params = {
-                "q": query,
-                "limit": 10,
-                "offset": 1,  # FIXED: Must start from 1, not 0
-                "orderBy": "bestMatch"  # FIXED: Use bestMatch instead of relevance
-            }
-            
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                bibs = data.get("bibRecords", [])
-                
-                if bibs:
-                    identifier = bibs[0].get("identifier", {})
-                    oclc_number = identifier.get("oclcNumber") if identifier else None
-                    return str(oclc_number) if oclc_number else None
-                    
-            return None
-        except Exception:
-            return None
-    
-    def fetch_metadata_json(self, oclc_number):
-        """Get metadata JSON for OCLC number"""
-        try:
-            url = f"https://americas.discovery.api.oclc.org/worldcat/search/v2/bibs/{oclc_number}"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Accept": "application/json"
-            }
-            
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                return response.json()
-            return None
-        except Exception:
-            return None
-    
-    def parse_complete_record(self, json_data, oclc_number, original_book):
-        """Parse complete record - CLEAN VERSION"""
-        record = {
-            "OCLC #": str(oclc_number),
-            "Title": "",
-            "Creator": "",
-            "Contributor": "",
-            "Publisher": "",
-            "Date": "",
-            "Language": "",
-            "Subjects": "",
-            "Type": "",
-            "Format": "",
-            "ISBN": "",
-            "ISSN": "",
-            "Edition": "",
-            "URL": f"https://www.worldcat.org/oclc/{oclc_number}"
-        }
-        
-        try:
-            if not json_data:
-                return self.create_basic_record(original_book, oclc_number)
-            
-            # Title
-            self.extract_title(json_data, record)
-            
-            # Creator
-            self.extract_creator(json_data, record)
-            
-            # Contributors
-            self.extract_contributors(json_data, record)
-            
-            # Publisher
-            self.extract_publisher(json_data, record)
-            
-            # Other metadata
-            self.extract_other_metadata(json_data, record)
-            
-            return record
-            
-        except Exception:
-            return self.create_basic_record(original_book, oclc_number)
-    
-    def extract_title(self, json_data, record):
-        """Extract title"""
-        try:
-            title_data = json_data.get("title", {})
-            if isinstance(title_data, dict):
-                main_titles = title_data.get("mainTitles", [])
-                if main_titles and isinstance(main_titles, list) and len(main_titles) > 0:
-                    first_title = main_titles[0]
-                    if isinstance(first_title, dict):
-                        title_text = first_title.get("text", "")
-                        if title_text:
-                            clean_title = title_text.split(" / ")[0].strip()
-                            record["Title"] = self.clean_text(clean_title)
-        except Exception:
-            pass
-    
-    def extract_creator(self, json_data, record):
-        """Extract creator"""
-        try:
-            contributor_data = json_data.get("contributor", {})
-            if isinstance(contributor_data, dict):
-                creators = contributor_data.get("creators", [])
-                if creators and isinstance(creators, list) and len(creators) > 0:
-                    creator = creators[0]
-                    if isinstance(creator, dict):
-                        first_name = ""
-                        last_name = ""
-                        
-                        if "firstName" in creator and isinstance(creator["firstName"], dict):
-                            first_name = creator["firstName"].get("text", "")
-                        if "secondName" in creator and isinstance(creator["secondName"], dict):
-                            last_name = creator["secondName"].get("text", "")
-                        
-                        full_name = f"{first_name} {last_name}".strip()
-                        if full_name:
-                            record["Creator"] = self.clean_text(full_name)
-        except Exception:
-            pass
-    
-    def extract_contributors(self, json_data, record):
-        """Extract contributors"""
-        try:
-            contributor_data = json_data.get("contributor", {})
-            if isinstance(contributor_data, dict):
-                contributors = contributor_data.get("contributors", [])
-                names = []
-                
-                if contributors and isinstance(contributors, list):
-                    for c in contributors[:5]:
-                        if isinstance(c, dict):
-                            name_obj = c.get("name", {})
-                            if isinstance(name_obj, dict):
-                                name = name_obj.get("text", "")
-                                if name:
-                                    names.append(self.clean_text(name))
-                
-                if names:
-                    record["Contributor"] = " ; ".join(names)
-        except Exception:
-            pass
-    
-    def extract_publisher(self, json_data, record):
-        """Extract publisher - MULTIPLE METHODS"""
-        publisher = ""
-        
-        try:
-            # Method 1: publishers array
-            publishers = json_data.get("publishers", [])
-            if publishers and isinstance(publishers, list) and len(publishers) > 0:
-                pub = publishers[0]
-                if isinstance(pub, dict):
-                    pub_name = pub.get("publisherName", {})
-                    if isinstance(pub_name, dict):
-                        publisher = pub_name.get("text", "")
-            
-            # Method 2: publication array
-            if not publisher:
-                publication = json_data.get("publication", [])
-                if publication and isinstance(publication, list) and len(publication) > 0:
-                    pub = publication[0]
-                    if isinstance(pub, dict):
-                        pub_text = pub.get("publisher", "")
-                        if pub_text:
-                            publisher = str(pub_text)
-            
-            # Method 3: direct publisher field
-            if not publisher:
-                pub_direct = json_data.get("publisher")
-                if pub_direct:
-                    if isinstance(pub_direct, list) and pub_direct:
-                        publisher = str(pub_direct[0])
-                    elif isinstance(pub_direct, str):
-                        publisher = pub_direct
-            
-            # Method 4: placeOfPublication
-            if not publisher:
-                place_pub = json_data.get("placeOfPublication", [])
-                if place_pub and isinstance(place_pub, list) and len(place_pub) > 0:
-                    if isinstance(place_pub[0], dict):
-                        pub_text = place_pub[0].get("publisher", "")
-                        if pub_text:
-                            publisher = str(pub_text)
-            
-            # Method 5: search in title field
-            if not publisher:
-                title_data = json_data.get("title", {})
-                if isinstance(title_data, dict):
-                    titles = title_data.get("mainTitles", [])
-                    if titles and isinstance(titles, list) and len(titles) > 0:
-                        if isinstance(titles[0], dict):
-                            full_title = titles[0].get("text", "")
-                            if " : " in full_title:
-                                parts = full_title.split(" : ")
-                                if len(parts) > 1:
-                                    potential_pub = parts[-1].strip()
-                                    if len(potential_pub) < 100:
-                                        publisher = potential_pub
-            
-            record["Publisher"] = self.clean_text(publisher)
-            
-        except Exception:
-            pass
-    
-    def extract_other_metadata(self, json_data, record):
-        """Extract remaining metadata"""
-        try:
-            # Date
-            date_data = json_data.get("date", {})
-            if isinstance(date_data, dict):
-                pub_date = date_data.get("publicationDate", "")
-                if pub_date:
-                    record["Date"] = str(pub_date)
-            
-            # Language
-            languages = json_data.get("language", [])
-            if languages and isinstance(languages, list) and len(languages) > 0:
-                lang = languages[0]
-                if isinstance(lang, dict):
-                    lang_code = lang.get("languageCode", "")
-                    if lang_code:
-                        record["Language"] = str(lang_code)
-                elif isinstance(lang, str):
-                    record["Language"] = lang
-            
-            # Subjects
-            subjects = json_data.get("subject", [])
-            subject_list = []
-            if subjects and isinstance(subjects, list):
-                for subj in subjects[:5]:
-                    if isinstance(subj, dict):
-                        subj_name = subj.get("subjectName", {})
-                        if isinstance(subj_name, dict):
-                            subj_text = subj_name.get("text", "")
-                            if subj_text:
-                                subject_list.append(self.clean_text(subj_text))
-                    elif isinstance(subj, str):
-                        subject_list.append(self.clean_text(subj))
-            record["Subjects"] = " ; ".join(subject_list)
-            
-            # Type
-            item_type = json_data.get("itemType", {})
-            if isinstance(item_type, dict):
-                type_text = item_type.get("text", "")
-                if type_text:
-                    record["Type"] = str(type_text)
-            
-            # Format
-            formats = json_data.get("format", [])
-            if formats and isinstance(formats, list) and len(formats) > 0:
-                fmt = formats[0]
-                if isinstance(fmt, dict):
-                    fmt_text = fmt.get("text", "")
-                    if fmt_text:
-                        record["Format"] = str(fmt_text)
-                elif isinstance(fmt, str):
-                    record["Format"] = fmt
-            
-            # ISBN/ISSN
-            self.extract_identifiers(json_data, record)
-            
-            # Edition
-            edition_info = json_data.get("edition", "")
-            if isinstance(edition_info, list) and edition_info:
-                edition_info = edition_info[0]
-            if isinstance(edition_info, dict):
-                edition_info = edition_info.get("text", "")
-            if edition_info:
-                record["Edition"] = self.clean_text(str(edition_info))
-                
-        except Exception:
-            pass
-    
-    def extract_identifiers(self, json_data, record):
-        """Extract ISBN and ISSN"""
-        try:
-            isbn_list = []
-            issn_list = []
-            
-            identifier = json_data.get("identifier", {})
-            if isinstance(identifier, dict):
-                # Direct lists
-                isbns = identifier.get("isbns", [])
-                if isinstance(isbns, list):
-                    isbn_list.extend([str(isbn) for isbn in isbns if isbn])
-                
-                issns = identifier.get("issns", [])
-                if isinstance(issns, list):
-                    issn_list.extend([str(issn) for issn in issns if issn])
-                
-                # Items array
-                items = identifier.get("items", [])
-                if isinstance(items, list):
-                    for item in items:
-                        if isinstance(item, dict):
-                            item_type = item.get("type", "").lower()
-                            value = item.get("value", "")
-                            if item_type == "isbn" and value:
-                                isbn_list.append(str(value))
-                            elif item_type == "issn" and value:
-                                issn_list.append(str(value))
-            
-            # Clean and deduplicate
-            if isbn_list:
-                record["ISBN"] = "; ".join(sorted(set(isbn_list)))
-            if issn_list:
-                record["ISSN"] = "; ".join(sorted(set(issn_list)))
-                
-        except Exception:
-            pass
-    
-    def create_basic_record(self, original_book, oclc_number=""):
-        """Create basic record"""
-        return {
-            "OCLC #": oclc_number,
-            "Title": original_book.get("Title", ""),
-            "Creator": original_book.get("Author", ""),
-            "Contributor": "",
-            "Publisher": "",
-            "Date": "",
-            "Language": "",
-            "Subjects": "",
-            "Type": "",
-            "Format": "",
-            "ISBN": "",
-            "ISSN": "",
-            "Edition": "",
-            "URL": f"https://www.worldcat.org/oclc/{oclc_number}" if oclc_number else ""
-        }
-    
-    def clean_text(self, text):
-        """Clean text"""
-        if not text:
-            return ""
-        
-        if not isinstance(text, str):
-            text = str(text)
-        
-        text = unicodedata.normalize('NFC', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
-    
-    def clean_search_term(self, term):
-        """Clean search terms"""
-        cleaned = re.sub(r'[^\w\sáéíóúüñÁÉÍÓÚÜÑ]', ' ', term)
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        return cleaned
+            from avocado_cache import ResponseCache
+            client = self.client
+            cache = client.response_cache or ResponseCache(client.cache_path, client.cache_ttl_days,
+                                                           client.cache_max_entries)
+            cache.clear()
+            QMessageBox.information(self, "AVOCADO Professional", "Response cache cleared")
+        except Exception as e:
+            QMessageBox.critical(self, "AVOCADO Professional",
+                               f"Error clearing cache:\n{str(e)}")
 
 def main():
     """Launch AVOCADO Professional"""
-    global logo_pixmap
+    from dotenv import load_dotenv
+    load_dotenv()  # automatically looks for .env in the current dir
     
     try:
         app = QApplication(sys.argv)
@@ -1830,10 +1424,6 @@ def main():
         app.setOrganizationName("Archivo Venezuela")
         app.setFont(QFont("Segoe UI", 10))
         
-        # Now that QApplication exists, load logo
-        from PyQt5.QtCore import Qt
-        logo_pixmap = QPixmap(logo_path).scaledToHeight(48, Qt.SmoothTransformation)
-        
         # Create main window
         window = AvocadoProfessional()
         window.show()
@@ -0,0 +1,780 @@
+import csv
+import os
+import threading
+import time
+from functools import partial
+from itertools import chain
+from pathlib import Path
+
+from avocado_cache import CACHE_BYPASS
+from avocado_core import COMPLETE_FIELDNAMES, OCLCClient
+from avocado_delta import Baseline, RowFingerprints, row_fingerprint
+from avocado_journal import RunJournal
+from avocado_output import output_writer
+from avocado_engine import (
+    SharedLookups, ThrottledError, run_ordered, run_ordered_chunks, run_pipeline, unique_by_key, fan_out
+)
+
+
+def _ignore(*args):
+    pass
+
+
+# Workflow of a re-extraction worker process, set up once by _start_worker
+_worker_workflow = None
+
+
+def _start_worker(settings):
+    """Process pool initializer: a client reading the archive with the parent's settings"""
+    global _worker_workflow
+    app = OCLCClient()
+    for name, value in settings.items():
+        setattr(app, name, value)
+    app.cache_mode = CACHE_BYPASS
+    app.prepare_run()
+    _worker_workflow = Workflow(app)
+
+
+def _run_chunk(method_name, items):
+    """Run a Workflow row method over one chunk of rows in a worker process"""
+    method = getattr(_worker_workflow, method_name)
+    return [method(item) for item in items]
+
+
+class PipelineLookups:
+    """Lookups shared by the rows of a pipeline run, and the run's counts"""
+    
+    def __init__(self, max_entries):
+        # Bounded so memory stays flat on very large inputs
+        self.searches = SharedLookups(max_entries)
+        self.downloads = SharedLookups(max_entries)
+        self.reused = 0
+        self.search_rows = 0
+        self.bib_rows = 0
+        self.found_oclc = 0
+        self.metadata_complete = 0
+        self.lock = threading.Lock()
+    
+    def count_reused(self):
+        """Count a download answered by the search record"""
+        with self.lock:
+            self.reused += 1
+    
+    def stats(self):
+        """Lookup counts as finish_workflow reports them"""
+        return (self.searches.computed, self.search_rows, self.downloads.computed - self.reused,
+                self.bib_rows - self.downloads.computed, self.bib_rows, self.reused)
+
+
+class Workflow:
+    """Complete search-and-download workflow, reporting through callbacks instead of a UI"""
+    # Lookups remembered for in-run deduplication in pipeline mode. Searches keep
+    # only their outcome and downloads the parsed output record, about 2 KB each,
+    # so the tables stay around 50 MB however large the input
+    PIPELINE_LOOKUP_MEMORY = 20000
+    
+    # Rows handed to a re-extraction process at a time; smaller inputs stay on threads
+    PROCESS_CHUNK = 200
+    
+    # Client settings a re-extraction process needs to search and parse as this run does
+    WORKER_SETTINGS = ("offline", "archive_dir", "json_backend", "project_responses",
+                       "reuse_search_records", "search_mode", "rank_candidate_limit",
+                       "rank_threshold", "strategy_order", "strategy_stats_path")
+    
+    def __init__(self, app_instance, resume=False, progress_update=None, progress_value=None,
+                 workflow_complete=None, workflow_error=None):
+        self.app = app_instance
+        self.resume = resume
+        self.progress_update = progress_update or _ignore
+        self.progress_value = progress_value or _ignore
+        self.workflow_complete = workflow_complete or _ignore
+        self.workflow_error = workflow_error or _ignore
+        self.should_stop = False
+        self.loop = None
+        self.async_engine = None
+        self.journal = None
+        self.used_processes = False
+    
+    def run(self):
+        """Execute the complete workflow"""
+        try:
+            self.run_complete_workflow()
+        except Exception as e:
+            self.workflow_error(f"Unexpected error: {str(e)}")
+        finally:
+            self.stop_async_engine()
+            if self.journal:
+                self.journal.close()
+            self.app.save_strategy_stats()
+            self.app.close_response_archive()
+    
+    def stop(self):
+        """Stop operation"""
+        self.should_stop = True
+    
+    def start_async_engine(self):
+        """Host an asyncio event loop in the running thread for the async HTTP engine"""
+        # Imported here so runs on the thread pool engine never load asyncio or aiohttp
+        import asyncio
+        from avocado_async import AsyncOCLCEngine
+        
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.async_engine = AsyncOCLCEngine(self.app, self.app.async_concurrency)
+    
+    def stop_async_engine(self):
+        """Close the async HTTP session and event loop"""
+        if self.loop is None:
+            return
+        if self.async_engine:
+            self.loop.run_until_complete(self.async_engine.close())
+        self.loop.close()
+        self.loop = None
+        self.async_engine = None
+    
+    def iterate_rows(self, method_name, items):
+        """Run rows through the selected HTTP engine, yielding results in input order
+        
+        Re-extraction from the archive makes no requests and is bound by decoding
+        and parsing instead, so large offline runs spread rows over processes.
+        """
+        processes = self.app.process_count() if self.app.offline else 1
+        if processes > 1 and len(items) > self.PROCESS_CHUNK:
+            self.progress_update(f"Re-extracting {len(items)} rows on {processes} processes")
+            self.used_processes = True
+            settings = {name: getattr(self.app, name) for name in self.WORKER_SETTINGS}
+            return run_ordered_chunks(partial(_run_chunk, method_name), items, processes,
+                                      self.PROCESS_CHUNK, _start_worker, (settings,),
+                                      lambda: self.should_stop)
+        
+        if self.async_engine:
+            from avocado_async import iterate_on_loop
+            method = getattr(self.async_engine, method_name)
+            rows = self.async_engine.run_ordered(method, items, lambda: self.should_stop)
+            return iterate_on_loop(self.loop, rows)
+        
+        method = getattr(self, method_name)
+        return run_ordered(method, items, self.app.max_workers, lambda: self.should_stop)
+    
+    def open_journal(self):
+        """Open the run journal, picking up completed rows when resuming"""
+        self.journal = RunJournal(self.app.journal_path())
+        # Rows of an incremental run are numbered among the changed rows, which depend on the baseline
+        related = (self.app.baseline_file,) if self.app.baseline_file else ()
+        if self.resume:
+            if self.journal.load(self.app.input_file, *related):
+                self.progress_update(f"Resuming previous run: {len(self.journal.searched)} rows searched, "
+                                          f"{len(self.journal.records)} records complete")
+                return
+            self.progress_update("No interrupted run found for this file, starting from the beginning")
+        self.journal.start(self.app.input_file, *related)
+    
+    def authenticate(self):
+        """Check the output format and authenticate (phase 1); False once an error is reported"""
+        # Fail before any lookups when the output format cannot be written
+        try:
+            output_writer(self.app.output_format)
+        except (ValueError, ImportError) as e:
+            self.workflow_error(str(e))
+            return False
+        
+        # Phase 1: Authentication
+        if self.app.offline:
+            # Every response comes from the archive; no requests, so no token either
+            self.progress_update(f"Phase 1: Re-extracting from archive {self.app.archive_dir} "
+                                 f"(no network requests)")
+        else:
+            self.progress_update("Phase 1: Authenticating with OCLC...")
+            self.progress_value(5)
+            
+            if self.app.http_engine == "async" and self.app.workflow_mode != "pipeline":
+                self.start_async_engine()
+                authenticated = self.loop.run_until_complete(self.async_engine.fetch_oclc_token())
+            else:
+                authenticated = self.app.fetch_oclc_token()
+            
+            if not authenticated:
+                self.workflow_error("Failed to authenticate with OCLC API")
+                return False
+            
+            self.progress_update("OCLC authentication successful")
+        self.progress_value(10)
+        return True
+    
+    def run_complete_workflow(self):
+        """Execute complete workflow"""
+        try:
+            self.progress_update("AVOCADO Professional - Complete Workflow Started")
+            self.progress_update("=" * 60)
+            
+            if not self.authenticate():
+                return
+            
+            if self.should_stop:
+                return
+            
+            # Phase 2: Read CSV file
+            self.progress_update("Phase 2: Processing CSV file...")
+            
+            try:
+                with open(self.app.input_file, 'r', encoding='utf-8-sig') as f:
+                    reader = csv.DictReader(f)
+                    
+                    # Validate headers
+                    expected_headers = {'OCLC #', 'Author', 'Title'}
+                    if not expected_headers.issubset(set(reader.fieldnames)):
+                        self.workflow_error(f"CSV must contain columns: {', '.join(expected_headers)}")
+                        return
+                
+                # Incremental runs merge with the baseline by row, which needs every row at hand
+                streaming = self.app.workflow_mode == "pipeline" and not self.app.baseline_file
+                if streaming:
+                    # Pipeline streams rows from disk; only count them here
+                    books = None
+                    total_books = self.count_books()
+                else:
+                    books = list(self.iter_books())
+                    total_books = len(books)
+                
+                if not total_books:
+                    self.workflow_error("No valid books found in CSV")
+                    return
+            
+            except Exception as e:
+                self.workflow_error(f"Error reading CSV: {str(e)}")
+                return
+            
+            self.progress_update(f"Found {total_books} books to process")
+            
+            # Fingerprints are taken before lookups fill in OCLC numbers
+            fingerprints = None if streaming else [row_fingerprint(book) for book in books]
+            input_books = books
+            kept = {}
+            if self.app.baseline_file:
+                kept = self.load_baseline(books, fingerprints)
+                if kept is None:
+                    return
+                books = [book for i, book in enumerate(books) if i not in kept]
+                total_books = len(books)
+            pending = [i for i in range(len(input_books or ())) if i not in kept]
+            
+            self.progress_value(15)
+            self.open_journal()
+            
+            if self.should_stop:
+                return
+            
+            if streaming:
+                self.run_pipelined_workflow(total_books)
+                return
+            
+            result = self.process_books(books)
+            if result is None:
+                return
+            row_records, found_oclc, metadata_complete, lookup_stats = result
+            if not row_records and not self.app.baseline_file:
+                self.progress_update("No OCLC numbers to download metadata")
+                # Save basic results
+                self.save_basic_results(books)
+                return
+            
+            # Phase 5: Save results
+            self.progress_update("Phase 5: Saving final file...")
+            self.progress_value(90)
+            
+            # Records in input order; unchanged rows of an incremental run keep their baseline record
+            processed = {input_row: row_records.get(row) for row, input_row in enumerate(pending)}
+            complete_records = []
+            positions = []
+            for i in range(len(input_books)):
+                record = kept[i] if i in kept else processed.get(i)
+                positions.append(None if record is None else len(complete_records))
+                if record is not None:
+                    complete_records.append(record)
+                    if i in kept:
+                        found_oclc += 1
+                        metadata_complete += bool(record.get("Title") and record.get("Publisher"))
+            
+            output_file = self.save_complete_results(complete_records)
+            with RowFingerprints(output_file) as rows:
+                for fingerprint, position in zip(fingerprints, positions):
+                    rows.add(fingerprint, position)
+            
+            self.finish_workflow(output_file, len(complete_records), found_oclc, metadata_complete,
+                                 lookup_stats)
+        
+        except Exception as e:
+            self.workflow_error(f"Workflow error: {str(e)}")
+    
+    def process_books(self, books):
+        """Search and download metadata for rows (phases 3 and 4)
+        
+        Returns ({row: record}, found_oclc, metadata_complete, lookup_stats), with
+        a record for every row that has an OCLC number, or None when stopped.
+        """
+        # Phase 3: Search for OCLC numbers
+        self.progress_update("Phase 3: Searching for OCLC numbers...")
+        
+        journal = self.journal
+        oclc_results = []
+        found_oclc = 0
+        search_records = {}
+        
+        # Deduplicate rows so each title/author pair is searched once, skipping
+        # rows already searched by an interrupted run
+        lookup_keys = [("journal", i) if i in journal.searched else self.lookup_key(book, i)
+                       for i, book in enumerate(books)]
+        unique_lookups = unique_by_key(lookup_keys, books)
+        search_rows = sum(1 for key in lookup_keys if key[0] == "search")
+        unique_searches = sum(1 for key, _ in unique_lookups if key[0] == "search")
+        if search_rows > unique_searches:
+            self.progress_update(f"{unique_searches} unique title/author pairs "
+                                      f"({search_rows - unique_searches} duplicate rows)")
+        
+        unique_lookups = [(key, book) for key, book in unique_lookups if key[0] != "journal"]
+        lookups = self.iterate_rows("lookup_book", [book for _, book in unique_lookups])
+        keyed_lookups = chain(
+            ((("journal", i), result) for i, result in journal.searched.items()),
+            ((key, result) for (key, _), (_, result) in zip(unique_lookups, lookups)))
+        
+        for i, (status, oclc_number, search_record, match) in fan_out(lookup_keys, keyed_lookups):
+            book = books[i]
+            if i not in journal.searched:
+                search_record = self.app.reusable_search_record(search_record)
+                journal.record_search(i, status, oclc_number, search_record, match)
+            if search_record is not None:
+                search_records[oclc_number] = search_record
+            title = book.get("Title", "").strip()
+            
+            display_title = title[:40] + "..." if len(title) > 40 else title
+            self.progress_update(f"Processing {i+1}/{len(books)}: {display_title}")
+            
+            book["OCLC #"] = oclc_number or ""
+            if status == "existing":
+                self.progress_update(f"OCLC already present: {oclc_number}")
+                found_oclc += 1
+            elif status == "found":
+                self.progress_update(f"OCLC found: {oclc_number}{self.describe_match(match)}")
+                found_oclc += 1
+            elif status == "not_found":
+                self.progress_update("No OCLC found")
+            else:
+                self.progress_update("Insufficient data for search")
+            
+            oclc_results.append(book)
+            
+            # Progress 15-50% for OCLC search
+            progress = 15 + int((i + 1) / len(books) * 35)
+            self.progress_value(progress)
+        
+        if self.should_stop:
+            return None
+        
+        self.progress_update(f"Phase 3 complete: {found_oclc}/{len(books)} OCLC numbers found")
+        
+        if self.should_stop:
+            return None
+        
+        # Phase 4: Download complete metadata
+        self.progress_update("Phase 4: Downloading complete metadata...")
+        self.progress_value(50)
+        
+        # Extract valid OCLC numbers
+        oclc_numbers = []
+        for row, result in enumerate(oclc_results):
+            oclc_num = result.get("OCLC #", "").strip()
+            if oclc_num:
+                oclc_numbers.append((oclc_num, result, row))
+        
+        if not oclc_numbers:
+            return {}, found_oclc, 0, (unique_searches, search_rows, 0, 0, 0, 0)
+        
+        # Process metadata
+        row_records = {}
+        metadata_complete = 0
+        
+        # Deduplicate OCLC numbers so each bib is downloaded once, skipping rows
+        # already finished by an interrupted run
+        bib_keys = [("journal", row) if row in journal.records else ("bib", oclc_num)
+                    for oclc_num, _, row in oclc_numbers]
+        unique_bibs = [oclc_num for (kind, oclc_num), _ in unique_by_key(bib_keys, bib_keys)
+                       if kind == "bib"]
+        bib_rows = sum(1 for kind, _ in bib_keys if kind == "bib")
+        if bib_rows > len(unique_bibs):
+            self.progress_update(f"{len(unique_bibs)} unique OCLC numbers "
+                                      f"({bib_rows - len(unique_bibs)} duplicate rows)")
+        
+        # Search results complete enough to use as-is need no download
+        bib_items = [(oclc_num, self.app.reusable_search_record(search_records.get(oclc_num)))
+                     for oclc_num in unique_bibs]
+        search_records.clear()
+        reused_bibs = sum(1 for _, brief in bib_items if brief is not None)
+        if reused_bibs:
+            self.progress_update(f"{reused_bibs} records taken from search results")
+        
+        downloads = self.iterate_rows("parse_metadata", bib_items)
+        keyed_downloads = chain(
+            ((key, None) for key in bib_keys if key[0] == "journal"),
+            ((("bib", oclc_num), result) for (oclc_num, _), result in downloads))
+        
+        for i, result in fan_out(bib_keys, keyed_downloads):
+            oclc_num, original_book, row = oclc_numbers[i]
+            self.progress_update(f"Downloading metadata {i+1}/{len(oclc_numbers)}: OCLC {oclc_num}")
+            
+            if row in journal.records:
+                record, error = journal.records[row]
+            else:
+                parsed, error = result
+                if error or parsed is None:
+                    # Create basic record on error or without metadata
+                    record = self.app.create_basic_record(original_book, oclc_num)
+                else:
+                    # Rows sharing an OCLC number share the parse; each gets its own copy
+                    record = dict(parsed)
+                journal.record_metadata(row, record, error)
+            row_records[row] = record
+            
+            if error:
+                self.progress_update(f"Error in metadata: {error}")
+            elif record.get("Title") and record.get("Publisher"):
+                self.progress_update(f"Complete: {record['Title'][:30]}...")
+                metadata_complete += 1
+            else:
+                self.progress_update("Partial metadata")
+            
+            # Progress 50-90% for metadata
+            progress = 50 + int((i + 1) / len(oclc_numbers) * 40)
+            self.progress_value(progress)
+        
+        if self.should_stop:
+            return None
+        
+        lookup_stats = (unique_searches, search_rows, len(unique_bibs) - reused_bibs,
+                        bib_rows - len(unique_bibs), bib_rows, reused_bibs)
+        return row_records, found_oclc, metadata_complete, lookup_stats
+    
+    def run_pipelined_workflow(self, total_books):
+        """Stream rows from disk through search, download, parse and write stages"""
+        self.progress_update("Pipeline: searching, downloading and saving rows as they complete...")
+        self.report_pipeline_settings()
+        
+        lookups = PipelineLookups(self.PIPELINE_LOOKUP_MEMORY)
+        output_file = self.complete_output_path()
+        rows = run_pipeline(enumerate(self.iter_books()), self.pipeline_stages(lookups),
+                            self.app.max_workers, should_stop=lambda: self.should_stop)
+        
+        written = 0
+        with self.open_output(output_file, COMPLETE_FIELDNAMES) as writer, \
+                RowFingerprints(output_file) as fingerprints:
+            last_flush = time.monotonic()
+            
+            for (i, book), result in rows:
+                # Taken before the row's OCLC number is filled in, as later runs will see it
+                fingerprint = row_fingerprint(book)
+                record = self.finish_pipeline_row(i, book, result, total_books, lookups)
+                fingerprints.add(fingerprint, written if record is not None else None)
+                
+                if record is not None:
+                    # Append each record as soon as it is ready
+                    writer.write(record)
+                    written += 1
+                    if time.monotonic() - last_flush > 1:
+                        writer.flush()
+                        last_flush = time.monotonic()
+        
+        if self.should_stop:
+            return
+        
+        if not written:
+            os.remove(output_file)
+            os.remove(fingerprints.path)
+            self.progress_update("No OCLC numbers to download metadata")
+            self.save_basic_results(dict(book, **{"OCLC #": ""}) for book in self.iter_books())
+            return
+        
+        self.finish_workflow(str(output_file), written, lookups.found_oclc, lookups.metadata_complete,
+                             lookups.stats())
+    
+    def report_pipeline_settings(self):
+        """Say which selected settings pipeline mode does not use"""
+        if self.app.http_engine == "async":
+            self.progress_update("Pipeline mode uses the thread pool engine")
+        if self.app.offline and self.app.process_count() > 1:
+            self.progress_update("Pipeline mode re-extracts on threads; phased mode uses every core")
+    
+    def pipeline_stages(self, lookups):
+        """Search and download stages of run_pipeline for (journal row, book) items
+        
+        Rows with the same lookup key or OCLC number share one lookup through
+        lookups, whichever input they come from. Only the row that ran a search
+        carries its reusable search record on to the download stage.
+        """
+        journal = self.journal
+        
+        def search_stage(row):
+            index, book = row
+            if index in journal.searched:
+                return index, book, journal.searched[index]
+            key = self.lookup_key(book, index)
+            if key[0] != "search":
+                return index, book, self.lookup_book(book)
+            
+            briefs = []
+            
+            def search():
+                status, oclc_number, search_record, match = self.lookup_book(book)
+                briefs.append(self.app.reusable_search_record(search_record))
+                # Rows sharing the search share its OCLC number's download, so they need no record
+                return status, oclc_number, None, match
+            
+            status, oclc_number, _, match = lookups.searches.get(key, search)
+            return index, book, (status, oclc_number, briefs[0] if briefs else None, match)
+        
+        def parse(oclc_number, brief):
+            if brief is not None:
+                lookups.count_reused()
+            return self.parse_metadata((oclc_number, brief))
+        
+        def download_stage(value):
+            index, book, (status, oclc_number, search_record, match) = value
+            brief = self.app.reusable_search_record(search_record)
+            if not oclc_number:
+                return status, None, match, None, None
+            if index in journal.records:
+                return (status, oclc_number, match) + tuple(journal.records[index])
+            
+            # Downloads keep the parsed record, a fraction of the size of the bib response
+            parsed, error = lookups.downloads.get(oclc_number, lambda: parse(oclc_number, brief))
+            if parsed is None:
+                # Create basic record on error or without metadata
+                return status, oclc_number, match, self.app.create_basic_record(book, oclc_number), error
+            # Rows sharing an OCLC number share the parse; each gets its own copy
+            return status, oclc_number, match, dict(parsed), None
+        
+        return [search_stage, download_stage]
+    
+    def finish_pipeline_row(self, i, book, result, total_books, lookups):
+        """Report and journal one row leaving the pipeline, returning its record or None"""
+        status, oclc_number, match, record, error = result
+        title = book.get("Title", "").strip()
+        display_title = title[:40] + "..." if len(title) > 40 else title
+        self.progress_update(f"Processing {i+1}/{total_books}: {display_title}")
+        
+        book["OCLC #"] = oclc_number or ""
+        if status == "existing":
+            self.progress_update(f"OCLC already present: {oclc_number}")
+        elif status == "found":
+            self.progress_update(f"OCLC found: {oclc_number}{self.describe_match(match)}")
+        elif status == "not_found":
+            self.progress_update("No OCLC found")
+        else:
+            self.progress_update("Insufficient data for search")
+        
+        # Rows finished by an interrupted run are journaled already. A row's record is
+        # journaled with its search, so resuming never needs the search record.
+        journal = self.journal
+        if i not in journal.searched:
+            journal.record_search(i, status, oclc_number, None, match)
+            if status in ("found", "not_found"):
+                lookups.search_rows += 1
+        if record is not None and i not in journal.records:
+            journal.record_metadata(i, record, error)
+            lookups.bib_rows += 1
+        
+        if record is not None:
+            lookups.found_oclc += 1
+            
+            if error:
+                self.progress_update(f"Error in metadata: {error}")
+            elif record.get("Title") and record.get("Publisher"):
+                self.progress_update(f"Complete: {record['Title'][:30]}...")
+                lookups.metadata_complete += 1
+            else:
+                self.progress_update("Partial metadata")
+        
+        # Progress 15-90% for the whole pipeline
+        progress = 15 + int((i + 1) / total_books * 75)
+        self.progress_value(progress)
+        return record
+    
+    def finish_workflow(self, output_file, total, found_oclc, metadata_complete, lookup_stats):
+        """Report the run summary and signal completion"""
+        searches, search_rows, downloads, bib_duplicates, bib_rows, reused = lookup_stats
+        
+        self.progress_value(100)
+        self.progress_update("=" * 60)
+        self.progress_update("COMPLETE WORKFLOW FINISHED!")
+        self.progress_update(f"File: {Path(output_file).name}")
+        self.progress_update(f"Total: {total} | OCLC: {found_oclc} | Metadata: {metadata_complete}")
+        self.progress_update(f"Searches: {searches} for {search_rows} rows "
+                                  f"({search_rows - searches} duplicates) | "
+                                  f"Downloads: {downloads} for {bib_rows} rows "
+                                  f"({bib_duplicates} duplicates, {reused} from search results)")
+        self.progress_update(f"API requests: {self.app.rate_limiter.requests} | "
+                             f"Token requests: {self.app.token_manager.fetches}")
+        strategies = self.app.strategy_stats.summary()
+        if strategies:
+            queries = sum(attempts for _, attempts, _, _ in strategies)
+            matches = sum(hits for _, _, hits, _ in strategies)
+            self.progress_update("Strategy hits: " + " | ".join(
+                f"{name} {hits}/{attempts} ({hits / attempts:.0%})"
+                for name, attempts, hits, _ in strategies if attempts))
+            per_match = f"{queries / matches:.2f}" if matches else "n/a"
+            self.progress_update(f"Queries per match: {per_match} ({self.app.strategy_order} order)")
+            skipped = [(name, count) for name, _, _, count in strategies if count]
+            if skipped:
+                self.progress_update("Strategies skipped as rarely hitting: " + " | ".join(
+                    f"{name} {count} rows" for name, count in skipped))
+        control = self.app.rate_control
+        if control.throttled or control.retries:
+            rate = f"{control.bucket.rate:.1f}/s" if control.bucket.rate > 0 else "unlimited"
+            self.progress_update(f"Throttled: {control.throttled} responses, {control.retries} retries | "
+                                 f"Final rate: {rate}, {int(control.limit)} in flight")
+        if self.app.response_cache:
+            cache = self.app.response_cache
+            self.progress_update(f"Cache: {cache.hits} hits | {cache.misses} misses")
+        if self.used_processes:
+            self.progress_update(f"Archive: read by {self.app.process_count()} processes")
+        elif self.app.response_archive:
+            archive = self.app.response_archive
+            if self.app.offline:
+                self.progress_update(f"Archive: {archive.hits} responses found | {archive.misses} not archived")
+            else:
+                self.progress_update(f"Archive: {archive.written} responses written")
+        self.progress_update("=" * 60)
+        
+        # Emit completion signal
+        self.workflow_complete(output_file, total, found_oclc, metadata_complete)
+    
+    def lookup_key(self, book, row):
+        """Key identifying rows that resolve to the same OCLC lookup"""
+        existing_oclc = book.get("OCLC #", "").strip()
+        title = book.get("Title", "").strip()
+        author = book.get("Author", "").strip()
+        
+        if existing_oclc:
+            return ("oclc", existing_oclc)
+        if title and author:
+            return ("search",
+                    self.app.clean_search_term(title).casefold(),
+                    self.app.clean_search_term(author).casefold())
+        return ("row", row)
+    
+    def lookup_book(self, book):
+        """Resolve the OCLC number for one book row"""
+        existing_oclc = book.get("OCLC #", "").strip()
+        title = book.get("Title", "").strip()
+        author = book.get("Author", "").strip()
+        
+        if existing_oclc:
+            return "existing", existing_oclc, None, None
+        if title and author:
+            search_record, match = self.app.search_oclc_match(title, author)
+            oclc_number = self.app.record_oclc_number(search_record)
+            return ("found" if oclc_number else "not_found"), oclc_number, search_record, match
+        return "insufficient", None, None, None
+    
+    def describe_match(self, match):
+        """Strategy and score of a match for the progress log"""
+        if not match:
+            return ""
+        return f" ({match['strategy']}, score {match['score']:.2f})"
+    
+    def download_metadata(self, item):
+        """Download metadata for one OCLC number unless the search result already has it"""
+        oclc_num, search_record = item
+        if search_record is not None:
+            return search_record, None
+        try:
+            return self.app.fetch_metadata_json(oclc_num), None
+        except ThrottledError:
+            raise
+        except Exception as e:
+            return None, str(e)
+    
+    def load_baseline(self, books, fingerprints):
+        """Rows the baseline output already covers, as {row: record or None}, or None if unreadable"""
+        name = Path(self.app.baseline_file).name
+        try:
+            baseline = Baseline(self.app.baseline_file)
+        except Exception as e:
+            self.workflow_error(f"Could not read baseline {name}: {str(e)}")
+            return None
+        
+        kept = {}
+        for i, (book, fingerprint) in enumerate(zip(books, fingerprints)):
+            covered, record = baseline.find(book, fingerprint)
+            if covered:
+                kept[i] = record
+        
+        matching = "row fingerprints" if baseline.has_fingerprints else "OCLC # only, no fingerprint file"
+        self.progress_update(f"Baseline {name}: {len(kept)} unchanged rows kept, "
+                             f"{len(books) - len(kept)} new or changed rows to process ({matching})")
+        if self.app.workflow_mode == "pipeline":
+            self.progress_update("Incremental runs use phased mode")
+        return kept
+    
+    def parse_metadata(self, item):
+        """Download and parse one record, returning (record, error)
+        
+        The record is None when there is no metadata, as the basic record built
+        instead depends on the input row.
+        """
+        metadata, error = self.download_metadata(item)
+        if error or not metadata:
+            return None, error
+        try:
+            return self.app.parse_complete_record(metadata, item[0], {}), None
+        except Exception as e:
+            return None, str(e)
+    
+    def save_basic_results(self, results):
+        """Save basic results without metadata, with the input's own columns"""
+        output_file = self.output_path("basic")
+        with self.open_output(output_file, empty_fieldnames=self.input_columns()) as writer:
+            total = writer.write_all(results)
+        
+        self.workflow_complete(str(output_file), total, 0, 0)
+    
+    def iter_books(self, input_file=None):
+        """Yield the non-empty rows of the input CSV without loading the whole file"""
+        with open(input_file or self.app.input_file, 'r', encoding='utf-8-sig') as f:
+            for book in csv.DictReader(f):
+                if any(v.strip() for v in book.values() if v):
+                    yield book
+    
+    def input_columns(self, input_file=None):
+        """Column names of the input CSV, with OCLC # first if the header lacks it"""
+        with open(input_file or self.app.input_file, 'r', encoding='utf-8-sig') as f:
+            columns = csv.DictReader(f).fieldnames or []
+        return columns if "OCLC #" in columns else ["OCLC #"] + columns
+    
+    def count_books(self, input_file=None):
+        """Count non-empty input rows in a cheap pass that keeps nothing in memory"""
+        with open(input_file or self.app.input_file, 'r', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return sum(1 for row in reader if any(v.strip() for v in row))
+    
+    def output_path(self, kind, input_name=None):
+        """Path of a results file for this run, with the output format's extension"""
+        input_name = input_name or Path(self.app.input_file).stem
+        timestamp = int(time.time())
+        extension = output_writer(self.app.output_format).extension
+        return Path(self.app.output_dir) / f"{input_name}_avocado_{kind}_{timestamp}{extension}"
+    
+    def complete_output_path(self):
+        """Path of the complete results file for this run"""
+        return self.output_path("professional")
+    
+    def open_output(self, output_file, fieldnames=None, empty_fieldnames=None):
+        """Writer for the configured output format, taking records one at a time"""
+        return output_writer(self.app.output_format)(output_file, fieldnames, empty_fieldnames)
+    
+    def save_complete_results(self, records):
+        """Save complete results with metadata"""
+        output_file = self.complete_output_path()
+        with self.open_output(output_file, COMPLETE_FIELDNAMES) as writer:
+            writer.write_all(records)
+        
+        return str(output_file)
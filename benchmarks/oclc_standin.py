@@ -0,0 +1,376 @@
+"""Local stand-in for the OCLC APIs AVOCADO calls
+
+Serves the token endpoint (POST /token), bib search (GET /worldcat/search/v2/bibs)
+and bib records (GET /worldcat/search/v2/bibs/{oclcNumber}) on localhost, with
+configurable latency, server errors, throttling and token expiry:
+    
+    python benchmarks/oclc_standin.py --port 8790 --latency 0.08 --throttle-rate 0.01
+    python benchmarks/oclc_standin.py --archive ~/.avocado/archive   # replay recorded responses
+
+A client is pointed at it by setting its TOKEN_URL and SEARCH_URL (see
+StandIn.configure_client). Records are built from fixtures/bib_record.json, so
+payloads have the size and shape of real WorldCat records. With a catalogue of
+(title, author) books, as the throughput benchmark passes, every search
+strategy for a book finds the same record; otherwise titles and authors are
+read back from the query. With --archive, archived responses are served as
+they were recorded and anything missing is made up.
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bib_record.json")
+
+SEARCH_PATH = "/worldcat/search/v2/bibs"
+
+# Query forms AVOCADO sends, from most to least specific
+QUERY_FORMS = (
+    re.compile(r'^ti:"(?P<title>.*)" AND au:"(?P<author>.*)"$'),
+    re.compile(r"^ti:(?P<title>.*) AND au:(?P<author>.*)$"),
+    re.compile(r'^"(?P<title>.*)" AND "(?P<author>.*)"$'),
+)
+
+# Share of findable books that the most specific query form already finds, then the next...
+FINDABLE_BY_FORM = (0.6, 0.2, 0.1, 0.1)
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[\W_]+", " ", str(text).casefold()).split())
+
+
+def _fraction(*parts):
+    """Stable number in [0, 1) for a key, the same in every run"""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+class StandInConfig:
+    """Behaviour of the stand-in server
+    
+    latency is added to every API response, plus an exponential tail averaging
+    jitter. error_rate and throttle_rate answer that share of API requests with
+    500 or with 429 and Retry-After; rate_limit throttles requests beyond that
+    many per second the way the real service does. Tokens are issued with an
+    expires_in of token_ttl seconds but stop working after token_lifetime
+    (token_ttl if not set), after which API requests with them get 401, as when
+    a token is revoked before it expires. hit_rate is the share of books that
+    can be found at all, and candidates how many records a successful search
+    returns.
+    """
+    
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 rate_limit=0.0, token_ttl=1199, token_lifetime=None, token_latency=0.1, hit_rate=0.9,
+                 candidates=3, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.token_ttl = token_ttl
+        self.token_lifetime = token_lifetime or token_ttl
+        self.token_latency = token_latency
+        self.hit_rate = hit_rate
+        self.candidates = candidates
+        self.seed = seed
+
+
+class StandIn:
+    """Threaded HTTP server standing in for oauth.oclc.org and the WorldCat Search API
+    
+    stats counts requests by endpoint and status; reset_stats() starts a new count.
+    """
+    
+    def __init__(self, config=None, host="127.0.0.1", port=0, catalogue=(), archive_dir=None):
+        self.config = config or StandInConfig()
+        with open(FIXTURE_PATH, "r", encoding="utf-8") as f:
+            self.template = json.load(f)
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.tokens = {}            # token -> expiry time
+        self.recent = deque()       # times of recent API requests, for rate_limit
+        self.stats = Counter()
+        self.books = {}             # normalized title -> (title, author)
+        self.keywords = {}          # normalized "title author" -> (title, author)
+        self.add_catalogue(catalogue)
+        
+        self.archive = None
+        if archive_dir:
+            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            from avocado_archive import ResponseArchive
+            self.archive = ResponseArchive(archive_dir)
+        
+        self.server = _StandInServer((host, port), _StandInHandler)
+        self.server.standin = self
+        self.thread = None
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def configure_client(self, client):
+        """Send a client's token and API requests here instead of to OCLC"""
+        client.TOKEN_URL = f"{self.url}/token"
+        client.SEARCH_URL = f"{self.url}{SEARCH_PATH}"
+    
+    def start(self):
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.server.serve_forever, name="oclc-standin", daemon=True)
+        self.thread.start()
+        return self
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.archive:
+            self.archive.close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def add_catalogue(self, books):
+        """Books (title, author) that searches should find, whichever query form is used"""
+        for title, author in books:
+            self.books.setdefault(_normalize(title), (title, author))
+            self.keywords.setdefault(_normalize(f"{title} {author}"), (title, author))
+    
+    def reset_stats(self):
+        with self.lock:
+            self.stats = Counter()
+    
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+    
+    def api_requests(self):
+        """API requests answered so far, any status"""
+        with self.lock:
+            return sum(count for name, count in self.stats.items()
+                       if name.split(" ")[0] in ("search", "bib"))
+    
+    # Behaviour
+    
+    def delay(self, base):
+        with self.lock:
+            tail = self.random.expovariate(1 / self.config.jitter) if self.config.jitter > 0 else 0.0
+        time.sleep(base + tail)
+    
+    def issue_token(self):
+        """(token, expires_in) for a token request"""
+        time.sleep(self.config.token_latency)
+        with self.lock:
+            token = f"standin-{len(self.tokens) + 1}-{self.random.getrandbits(32):08x}"
+            self.tokens[token] = time.monotonic() + self.config.token_lifetime
+            self.stats["token"] += 1
+        return token, self.config.token_ttl
+    
+    def refusal(self, authorization):
+        """(status, headers) an API request is refused with, or None to answer it"""
+        config = self.config
+        now = time.monotonic()
+        token = authorization[7:] if authorization.startswith("Bearer ") else ""
+        with self.lock:
+            expiry = self.tokens.get(token)
+            if expiry is None or expiry <= now:
+                return 401, {}
+            
+            if config.rate_limit > 0:
+                while self.recent and now - self.recent[0] >= 1.0:
+                    self.recent.popleft()
+                if len(self.recent) >= config.rate_limit:
+                    return 429, {"Retry-After": str(config.retry_after)}
+                self.recent.append(now)
+            
+            draw = self.random.random()
+        if draw < config.throttle_rate:
+            return 429, {"Retry-After": str(config.retry_after)}
+        if draw < config.throttle_rate + config.error_rate:
+            return 500, {}
+        return None
+    
+    # Payloads
+    
+    def record(self, oclc_number, title, author):
+        """Bib record for a book, shaped like the fixture"""
+        record = copy.deepcopy(self.template)
+        first, _, last = author.rpartition(" ") if " " in author else ("", "", author)
+        isbn = f"978{int(oclc_number) % 10 ** 10:010d}"
+        
+        record["identifier"]["oclcNumber"] = str(oclc_number)
+        record["identifier"]["isbns"] = [isbn, isbn[3:]]
+        record["identifier"]["mergedOclcNumbers"] = [str(int(oclc_number) + 7)]
+        record["title"]["mainTitles"][0]["text"] = f"{title} : novela / {author}"
+        record["contributor"]["creators"][0]["firstName"]["text"] = first
+        record["contributor"]["creators"][0]["secondName"]["text"] = last
+        record["contributor"]["statementOfResponsibility"]["text"] = author
+        record["date"]["publicationDate"] = str(1900 + int(oclc_number) % 120)
+        return record
+    
+    def oclc_number(self, title, author):
+        return str(10 ** 8 + int(_fraction(self.config.seed, _normalize(title), _normalize(author)) * 9 * 10 ** 8))
+    
+    def find(self, query):
+        """(title, author) a query finds, or None"""
+        for form, pattern in enumerate(QUERY_FORMS):
+            match = pattern.match(query)
+            if match:
+                title, author = match.group("title"), match.group("author")
+                break
+        else:
+            form = len(QUERY_FORMS)
+            title, author = self.keywords.get(_normalize(query), (query, ""))
+        title, author = self.books.get(_normalize(title), (title, author))
+        
+        # Each book is findable from some query form on, so stricter forms miss more
+        draw = _fraction(self.config.seed, "findable", _normalize(title))
+        if draw >= self.config.hit_rate:
+            return None
+        needed = 0
+        threshold = self.config.hit_rate * FINDABLE_BY_FORM[0]
+        while draw >= threshold and needed < len(FINDABLE_BY_FORM) - 1:
+            needed += 1
+            threshold += self.config.hit_rate * FINDABLE_BY_FORM[needed]
+        return (title, author) if form >= needed else None
+    
+    def search(self, query, limit):
+        """Search response: the book found plus a few weaker candidates"""
+        if self.archive:
+            key = query if limit == 10 else f"{query}|limit={limit}"
+            archived = self.archive.get("search", key)
+            if archived is not None:
+                return archived
+        found = self.find(query)
+        if found is None:
+            return {"numberOfRecords": 0}
+        title, author = found
+        bibs = [self.record(self.oclc_number(title, author), title, author)]
+        for number in range(1, min(limit, self.config.candidates)):
+            other = f"{title} {['tomo', 'antología', 'estudio crítico'][number % 3]} {number}"
+            bibs.append(self.record(self.oclc_number(other, author), other, "Varios autores"))
+        return {"numberOfRecords": len(bibs) + 40, "bibRecords": bibs}
+    
+    def bib(self, oclc_number):
+        """Bib record response for an OCLC number"""
+        if self.archive:
+            archived = self.archive.get("bib", oclc_number)
+            if archived is not None:
+                return archived
+        return self.record(oclc_number, f"Title {oclc_number}", "Autor Desconocido")
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # listen() runs in the constructor, so the backlog must be set on the class. With
+    # the default of 5, connections opened at once by many workers lose their SYNs
+    # and wait out the 1 s retransmission timeout.
+    request_queue_size = 1024
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, the body waits for the
+    # client's delayed ACK of the headers, about 40 ms on every keep-alive response
+    disable_nagle_algorithm = True
+    
+    def do_POST(self):
+        standin = self.server.standin
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlsplit(self.path).path.rstrip("/") != "/token":
+            self.send_json(404, {"message": "Not found"})
+            return
+        token, expires_in = standin.issue_token()
+        self.send_json(200, {"access_token": token, "token_type": "bearer", "expires_in": expires_in})
+    
+    def do_GET(self):
+        standin = self.server.standin
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        if path == SEARCH_PATH:
+            kind = "search"
+        elif path.startswith(SEARCH_PATH + "/") and path.rsplit("/", 1)[1].isdigit():
+            kind = "bib"
+        else:
+            self.send_json(404, {"message": "Not found"})
+            return
+        
+        standin.delay(standin.config.latency)
+        refusal = standin.refusal(self.headers.get("Authorization", ""))
+        if refusal:
+            status, headers = refusal
+            standin.count(f"{kind} {status}")
+            self.send_json(status, {"type": "error", "title": "Refused by the stand-in"}, headers)
+            return
+        
+        standin.count(f"{kind} 200")
+        if kind == "search":
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0]
+            limit = int(params.get("limit", ["10"])[0])
+            self.send_json(200, standin.search(query, limit))
+        else:
+            self.send_json(200, standin.bib(path.rsplit("/", 1)[1]))
+    
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the OCLC APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every API response")
+    parser.add_argument("--jitter", type=float, default=0.02, help="mean of the extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of API requests answered 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="requests per second beyond which requests get 429 (0 for none)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--token-ttl", type=int, default=1199, help="expires_in sent with tokens (s)")
+    parser.add_argument("--token-lifetime", type=float,
+                        help="seconds a token actually works, if shorter than --token-ttl")
+    parser.add_argument("--hit-rate", type=float, default=0.9, help="share of books that can be found")
+    parser.add_argument("--archive", help="response archive to replay recorded responses from")
+    args = parser.parse_args()
+    
+    config = StandInConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                           rate_limit=args.rate_limit, token_ttl=args.token_ttl,
+                           token_lifetime=args.token_lifetime, hit_rate=args.hit_rate)
+    standin = StandIn(config, args.host, args.port, archive_dir=args.archive)
+    print(f"OCLC stand-in on {standin.url} (token: {standin.url}/token, search: {standin.url}{SEARCH_PATH})")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server.server_close()
+        print(f"Requests: {dict(standin.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Measure AVOCADO desktop cold start
+
+Each run starts a fresh interpreter and reports how long importing avocado_v2_7
+takes and how long until the main window has been shown and painted:
+    
+    python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --import-budget 400 --window-budget 1200
+
+With budgets (milliseconds) the script exits with status 1 when a median goes
+over, so it can guard against startup regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should stay out of the process until they are first needed
+DEFERRED_MODULES = ("requests", "aiohttp", "asyncio", "dotenv")
+
+
+def measure():
+    """Child process: time the import and the first window, then print JSON"""
+    sys.path.insert(0, ROOT)
+    start = time.perf_counter()
+    import avocado_v2_7
+    imported = time.perf_counter()
+    
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    window = avocado_v2_7.AvocadoProfessional()
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+    
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "window_ms": (shown - start) * 1000,
+        "loaded": [name for name in DEFERRED_MODULES if name in sys.modules],
+    }))
+    window.close()
+
+
+def run_once():
+    """Run one cold start in a fresh interpreter"""
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, __file__, "--child"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure AVOCADO desktop startup time")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument("--import-budget", type=float, help="fail if the median import time exceeds this (ms)")
+    parser.add_argument("--window-budget", type=float, help="fail if the median time-to-window exceeds this (ms)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        measure()
+        return 0
+    
+    results = [run_once() for _ in range(max(1, args.runs))]
+    medians = {key: statistics.median(result[key] for result in results)
+               for key in ("import_ms", "window_ms", "process_ms")}
+    
+    print(f"Runs:            {len(results)}")
+    print(f"Import:          {medians['import_ms']:.0f} ms")
+    print(f"Time to window:  {medians['window_ms']:.0f} ms")
+    print(f"Whole process:   {medians['process_ms']:.0f} ms")
+    print(f"Deferred modules loaded at startup: {', '.join(results[0]['loaded']) or 'none'}")
+    
+    over = []
+    if args.import_budget is not None and medians["import_ms"] > args.import_budget:
+        over.append(f"import {medians['import_ms']:.0f} ms > {args.import_budget:.0f} ms")
+    if args.window_budget is not None and medians["window_ms"] > args.window_budget:
+        over.append(f"time to window {medians['window_ms']:.0f} ms > {args.window_budget:.0f} ms")
+    for message in over:
+        print(f"Over budget: {message}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
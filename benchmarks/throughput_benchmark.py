@@ -0,0 +1,236 @@
+"""Measure end-to-end workflow throughput against the local OCLC stand-in
+    
+    python benchmarks/throughput_benchmark.py --sizes 100 1000 5000
+    python benchmarks/throughput_benchmark.py --engine async --concurrency 64 --latency 0.2
+    python benchmarks/throughput_benchmark.py --throttle-rate 0.02 --min-rows-per-second 50
+
+For each input size a book list is generated, with repeated books and rows that
+already have an OCLC number as real lists do, the stand-in is given the same
+catalogue, and the complete headless workflow runs without the response cache.
+Reported per size: rows per second, API requests per row, and p50/p99 latency
+of API calls as the workflow sees them, including waits for a request slot or
+the rate limiter, and retries. The async engine keeps twice --concurrency rows
+going, so at high concurrency its p99 is mostly slot waits; the stand-in also
+runs in this process and shares its interpreter. With --min-rows-per-second
+the script exits with status 1 when a size runs slower, so it can guard
+against throughput regressions.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from avocado_cache import CACHE_BYPASS  # noqa: E402
+from avocado_core import OCLCClient  # noqa: E402
+from avocado_token import TokenManager  # noqa: E402
+from avocado_workflow import Workflow  # noqa: E402
+from oclc_standin import StandIn, StandInConfig  # noqa: E402
+
+TITLE_WORDS = ("casa", "río", "noche", "memoria", "ciudad", "viento", "sombra", "llano", "mar", "tiempo",
+               "historia", "canto", "tierra", "fuego", "silencio", "camino", "sueño", "jardín", "voz", "luz")
+FIRST_NAMES = ("Ana", "Rómulo", "Teresa", "Arturo", "María", "José", "Elena", "Andrés", "Lucía", "Miguel")
+LAST_NAMES = ("Gallegos", "de la Parra", "Uslar Pietri", "Pérez", "Brito", "Otero Silva", "Liscano",
+              "Garmendia", "Nazoa", "Palacios")
+
+
+def make_books(count, seed=0, repeated=0.1, known=0.05):
+    """count (title, author, oclc) rows; a share repeats earlier books, another has an OCLC #"""
+    rng = random.Random(seed)
+    books = []
+    for number in range(count):
+        if books and rng.random() < repeated:
+            books.append(rng.choice(books))
+            continue
+        title = " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+        title = f"{title} {number}"
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        oclc = str(rng.randint(10 ** 6, 10 ** 9)) if rng.random() < known else ""
+        books.append((title, author, oclc))
+    return books
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class TimedClient(OCLCClient):
+    """Client that records how long every API call takes, retries and waits included"""
+    
+    def __init__(self):
+        super().__init__()
+        self.latencies = []
+        self.latency_lock = threading.Lock()
+    
+    def record_latency(self, seconds):
+        with self.latency_lock:
+            self.latencies.append(seconds)
+    
+    def api_get(self, url, params=None):
+        start = time.perf_counter()
+        try:
+            return super().api_get(url, params)
+        finally:
+            self.record_latency(time.perf_counter() - start)
+
+
+class TimedWorkflow(Workflow):
+    """Workflow whose async engine records API call times on the client too"""
+    
+    def start_async_engine(self):
+        super().start_async_engine()
+        get_json = self.async_engine._get_json
+        
+        async def timed_get_json(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await get_json(*args, **kwargs)
+            finally:
+                self.app.record_latency(time.perf_counter() - start)
+        
+        self.async_engine._get_json = timed_get_json
+
+
+def make_client(args, standin, work_dir):
+    """Fresh client sending every request to the stand-in, with no cache or saved state"""
+    client = TimedClient()
+    standin.configure_client(client)
+    client.wskey = client.wssecret = "benchmark"
+    client.token_manager = TokenManager(client.request_token, None)
+    client.output_dir = work_dir
+    client.output_format = "csv"
+    client.cache_mode = CACHE_BYPASS
+    client.archive_responses = False
+    client.offline = False
+    client.baseline_file = ""
+    client.strategy_stats_path = ""
+    client.max_workers = args.workers
+    client.requests_per_second = args.rate
+    client.max_requests_per_second = max(args.rate, args.max_rate)
+    client.adaptive_rate = not args.no_adaptive
+    client.http_engine = args.engine
+    client.async_concurrency = args.concurrency
+    client.workflow_mode = args.mode
+    client.search_mode = args.search_mode
+    client.prepare_run()
+    return client
+
+
+def run_size(args, standin, size, work_dir):
+    """Run the workflow over a generated list of size rows and return its measurements"""
+    books = make_books(size, args.seed)
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    input_file = os.path.join(work_dir, f"benchmark_{size}.csv")
+    with open(input_file, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["OCLC #", "Author", "Title"])
+        writer.writerows((oclc, author, title) for title, author, oclc in books)
+    
+    client = make_client(args, standin, work_dir)
+    client.input_file = input_file
+    result = {}
+    workflow = TimedWorkflow(client, workflow_complete=lambda output_file, *counts: result.update(counts=counts),
+                             workflow_error=lambda message: result.update(error=message))
+    standin.reset_stats()
+    start = time.perf_counter()
+    try:
+        workflow.run()
+    finally:
+        elapsed = time.perf_counter() - start
+        client.close_session()
+    if "error" in result:
+        raise RuntimeError(f"{size} rows: {result['error']}")
+    
+    stats = standin.stats
+    requests = standin.api_requests()
+    return {
+        "rows": size,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(size / elapsed, 1),
+        "requests": requests,
+        "requests_per_row": round(requests / size, 2),
+        "tokens": stats["token"],
+        "throttled": stats["search 429"] + stats["bib 429"],
+        "errors": stats["search 500"] + stats["bib 500"],
+        "unauthorized": stats["search 401"] + stats["bib 401"],
+        "p50_ms": round(percentile(client.latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(client.latencies, 0.99) * 1000, 1),
+        "oclc_found": result["counts"][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure AVOCADO workflow throughput against a local OCLC stand-in")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="input sizes in rows")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated book lists")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent lookups (thread engine)")
+    parser.add_argument("--rate", type=float, default=0.0, help="requests per second (0 for no limit)")
+    parser.add_argument("--max-rate", type=float, default=0.0, help="ceiling for the adaptive request rate")
+    parser.add_argument("--no-adaptive", action="store_true", help="keep rate and concurrency fixed")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads", help="HTTP engine")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight for the async engine")
+    parser.add_argument("--mode", choices=("phased", "pipeline"), default="phased", help="workflow mode")
+    parser.add_argument("--search-mode", choices=("strategies", "ranked", "race"), default="strategies")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in response latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="mean extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of API requests answered 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="stand-in requests per second limit")
+    parser.add_argument("--token-ttl", type=int, default=1199, help="expires_in of stand-in tokens (s)")
+    parser.add_argument("--token-lifetime", type=float,
+                        help="seconds a stand-in token actually works, to exercise refreshes after 401")
+    parser.add_argument("--hit-rate", type=float, default=0.9, help="share of books the stand-in finds")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per size")
+    parser.add_argument("--min-rows-per-second", type=float,
+                        help="fail if any size runs slower than this many rows per second")
+    args = parser.parse_args()
+    
+    config = StandInConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+                           token_ttl=args.token_ttl, token_lifetime=args.token_lifetime,
+                           hit_rate=args.hit_rate, seed=args.seed)
+    work_dir = tempfile.mkdtemp(prefix="avocado_benchmark_")
+    results = []
+    try:
+        with StandIn(config) as standin:
+            for size in args.sizes:
+                results.append(run_size(args, standin, size, work_dir))
+                if args.json:
+                    print(json.dumps(results[-1]), flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if not args.json:
+        engine = args.engine if args.mode == "phased" else "threads"
+        print(f"Engine: {engine} | Mode: {args.mode} | Search: {args.search_mode} | "
+              f"Stand-in latency: {args.latency * 1000:.0f} ms + {args.jitter * 1000:.0f} ms jitter")
+        print(f"{'Rows':>8} {'Seconds':>9} {'Rows/s':>9} {'Req/row':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'429':>5} {'500':>5} {'401':>5} {'Found':>7}")
+        for r in results:
+            print(f"{r['rows']:>8} {r['seconds']:>9.2f} {r['rows_per_second']:>9.1f} {r['requests_per_row']:>8.2f} "
+                  f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['throttled']:>5} {r['errors']:>5} "
+                  f"{r['unauthorized']:>5} {r['oclc_found']:>7}")
+    
+    over = []
+    if args.min_rows_per_second is not None:
+        over = [r for r in results if r["rows_per_second"] < args.min_rows_per_second]
+    for r in over:
+        print(f"Under budget: {r['rows']} rows at {r['rows_per_second']:.1f} rows/s "
+              f"< {args.min_rows_per_second:.1f}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Make the AVOCADO modules and the benchmark stand-in importable, and share a stand-in client"""
+import csv
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from avocado_cache import CACHE_BYPASS  # noqa: E402
+from avocado_core import OCLCClient  # noqa: E402
+from avocado_token import TokenManager  # noqa: E402
+from oclc_standin import StandIn, StandInConfig  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standin():
+    """Local OCLC stand-in answering at once, without errors, that finds every book"""
+    with StandIn(StandInConfig(latency=0, jitter=0, token_latency=0, hit_rate=1.0)) as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(standin, tmp_path):
+    """Factory of clients sending every request to the stand-in, with no cache or saved state"""
+    clients = []
+    
+    def make(**settings):
+        client = OCLCClient()
+        standin.configure_client(client)
+        client.wskey = client.wssecret = "test"
+        client.token_manager = TokenManager(client.request_token, None)
+        client.output_dir = str(tmp_path)
+        client.output_format = "csv"
+        client.cache_mode = CACHE_BYPASS
+        client.archive_responses = False
+        client.baseline_file = ""
+        client.strategy_stats_path = ""
+        client.max_workers = 4
+        client.requests_per_second = 0.0
+        for name, value in settings.items():
+            setattr(client, name, value)
+        client.prepare_run()
+        clients.append(client)
+        return client
+    
+    yield make
+    for client in clients:
+        client.close_session()
+
+
+def write_books(path, books):
+    """Write (title, author, oclc) rows as an AVOCADO input CSV"""
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["OCLC #", "Author", "Title"])
+        writer.writerows((oclc, author, title) for title, author, oclc in books)
+    return path
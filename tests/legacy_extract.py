@@ -0,0 +1,315 @@
+"""The extract_* methods AVOCADO used before the compiled column rules, kept unchanged
+
+test_extract.py checks that the compiled extractor gives the same records.
+"""
+import re
+import unicodedata
+
+
+class LegacyExtractor:
+    """parse_complete_record and its helpers as they were in OCLCClient"""
+    
+    def parse_complete_record(self, json_data, oclc_number, original_book):
+        """Parse complete record - CLEAN VERSION"""
+        record = {
+            "OCLC #": str(oclc_number),
+            "Title": "",
+            "Creator": "",
+            "Contributor": "",
+            "Publisher": "",
+            "Date": "",
+            "Language": "",
+            "Subjects": "",
+            "Type": "",
+            "Format": "",
+            "ISBN": "",
+            "ISSN": "",
+            "Edition": "",
+            "URL": f"https://www.worldcat.org/oclc/{oclc_number}"
+        }
+        
+        try:
+            if not json_data:
+                return self.create_basic_record(original_book, oclc_number)
+            
+            # Title
+            self.extract_title(json_data, record)
+            
+            # Creator
+            self.extract_creator(json_data, record)
+            
+            # Contributors
+            self.extract_contributors(json_data, record)
+            
+            # Publisher
+            self.extract_publisher(json_data, record)
+            
+            # Other metadata
+            self.extract_other_metadata(json_data, record)
+            
+            return record
+        
+        except Exception:
+            return self.create_basic_record(original_book, oclc_number)
+    
+    def extract_title(self, json_data, record):
+        """Extract title"""
+        try:
+            title_data = json_data.get("title", {})
+            if isinstance(title_data, dict):
+                main_titles = title_data.get("mainTitles", [])
+                if main_titles and isinstance(main_titles, list) and len(main_titles) > 0:
+                    first_title = main_titles[0]
+                    if isinstance(first_title, dict):
+                        title_text = first_title.get("text", "")
+                        if title_text:
+                            clean_title = title_text.split(" / ")[0].strip()
+                            record["Title"] = self.clean_text(clean_title)
+        except Exception:
+            pass
+    
+    def extract_creator(self, json_data, record):
+        """Extract creator"""
+        try:
+            contributor_data = json_data.get("contributor", {})
+            if isinstance(contributor_data, dict):
+                creators = contributor_data.get("creators", [])
+                if creators and isinstance(creators, list) and len(creators) > 0:
+                    creator = creators[0]
+                    if isinstance(creator, dict):
+                        first_name = ""
+                        last_name = ""
+                        
+                        if "firstName" in creator and isinstance(creator["firstName"], dict):
+                            first_name = creator["firstName"].get("text", "")
+                        if "secondName" in creator and isinstance(creator["secondName"], dict):
+                            last_name = creator["secondName"].get("text", "")
+                        
+                        full_name = f"{first_name} {last_name}".strip()
+                        if full_name:
+                            record["Creator"] = self.clean_text(full_name)
+        except Exception:
+            pass
+    
+    def extract_contributors(self, json_data, record):
+        """Extract contributors"""
+        try:
+            contributor_data = json_data.get("contributor", {})
+            if isinstance(contributor_data, dict):
+                contributors = contributor_data.get("contributors", [])
+                names = []
+                
+                if contributors and isinstance(contributors, list):
+                    for c in contributors[:5]:
+                        if isinstance(c, dict):
+                            name_obj = c.get("name", {})
+                            if isinstance(name_obj, dict):
+                                name = name_obj.get("text", "")
+                                if name:
+                                    names.append(self.clean_text(name))
+                
+                if names:
+                    record["Contributor"] = " ; ".join(names)
+        except Exception:
+            pass
+    
+    def extract_publisher(self, json_data, record):
+        """Extract publisher - MULTIPLE METHODS"""
+        publisher = ""
+        
+        try:
+            # Method 1: publishers array
+            publishers = json_data.get("publishers", [])
+            if publishers and isinstance(publishers, list) and len(publishers) > 0:
+                pub = publishers[0]
+                if isinstance(pub, dict):
+                    pub_name = pub.get("publisherName", {})
+                    if isinstance(pub_name, dict):
+                        publisher = pub_name.get("text", "")
+            
+            # Method 2: publication array
+            if not publisher:
+                publication = json_data.get("publication", [])
+                if publication and isinstance(publication, list) and len(publication) > 0:
+                    pub = publication[0]
+                    if isinstance(pub, dict):
+                        pub_text = pub.get("publisher", "")
+                        if pub_text:
+                            publisher = str(pub_text)
+            
+            # Method 3: direct publisher field
+            if not publisher:
+                pub_direct = json_data.get("publisher")
+                if pub_direct:
+                    if isinstance(pub_direct, list) and pub_direct:
+                        publisher = str(pub_direct[0])
+                    elif isinstance(pub_direct, str):
+                        publisher = pub_direct
+            
+            # Method 4: placeOfPublication
+            if not publisher:
+                place_pub = json_data.get("placeOfPublication", [])
+                if place_pub and isinstance(place_pub, list) and len(place_pub) > 0:
+                    if isinstance(place_pub[0], dict):
+                        pub_text = place_pub[0].get("publisher", "")
+                        if pub_text:
+                            publisher = str(pub_text)
+            
+            # Method 5: search in title field
+            if not publisher:
+                title_data = json_data.get("title", {})
+                if isinstance(title_data, dict):
+                    titles = title_data.get("mainTitles", [])
+                    if titles and isinstance(titles, list) and len(titles) > 0:
+                        if isinstance(titles[0], dict):
+                            full_title = titles[0].get("text", "")
+                            if " : " in full_title:
+                                parts = full_title.split(" : ")
+                                if len(parts) > 1:
+                                    potential_pub = parts[-1].strip()
+                                    if len(potential_pub) < 100:
+                                        publisher = potential_pub
+            
+            record["Publisher"] = self.clean_text(publisher)
+        
+        except Exception:
+            pass
+    
+    def extract_other_metadata(self, json_data, record):
+        """Extract remaining metadata"""
+        try:
+            # Date
+            date_data = json_data.get("date", {})
+            if isinstance(date_data, dict):
+                pub_date = date_data.get("publicationDate", "")
+                if pub_date:
+                    record["Date"] = str(pub_date)
+            
+            # Language
+            languages = json_data.get("language", [])
+            if languages and isinstance(languages, list) and len(languages) > 0:
+                lang = languages[0]
+                if isinstance(lang, dict):
+                    lang_code = lang.get("languageCode", "")
+                    if lang_code:
+                        record["Language"] = str(lang_code)
+                elif isinstance(lang, str):
+                    record["Language"] = lang
+            
+            # Subjects
+            subjects = json_data.get("subject", [])
+            subject_list = []
+            if subjects and isinstance(subjects, list):
+                for subj in subjects[:5]:
+                    if isinstance(subj, dict):
+                        subj_name = subj.get("subjectName", {})
+                        if isinstance(subj_name, dict):
+                            subj_text = subj_name.get("text", "")
+                            if subj_text:
+                                subject_list.append(self.clean_text(subj_text))
+                    elif isinstance(subj, str):
+                        subject_list.append(self.clean_text(subj))
+            record["Subjects"] = " ; ".join(subject_list)
+            
+            # Type
+            item_type = json_data.get("itemType", {})
+            if isinstance(item_type, dict):
+                type_text = item_type.get("text", "")
+                if type_text:
+                    record["Type"] = str(type_text)
+            
+            # Format
+            formats = json_data.get("format", [])
+            if formats and isinstance(formats, list) and len(formats) > 0:
+                fmt = formats[0]
+                if isinstance(fmt, dict):
+                    fmt_text = fmt.get("text", "")
+                    if fmt_text:
+                        record["Format"] = str(fmt_text)
+                elif isinstance(fmt, str):
+                    record["Format"] = fmt
+            
+            # ISBN/ISSN
+            self.extract_identifiers(json_data, record)
+            
+            # Edition
+            edition_info = json_data.get("edition", "")
+            if isinstance(edition_info, list) and edition_info:
+                edition_info = edition_info[0]
+            if isinstance(edition_info, dict):
+                edition_info = edition_info.get("text", "")
+            if edition_info:
+                record["Edition"] = self.clean_text(str(edition_info))
+        
+        except Exception:
+            pass
+    
+    def extract_identifiers(self, json_data, record):
+        """Extract ISBN and ISSN"""
+        try:
+            isbn_list = []
+            issn_list = []
+            
+            identifier = json_data.get("identifier", {})
+            if isinstance(identifier, dict):
+                # Direct lists
+                isbns = identifier.get("isbns", [])
+                if isinstance(isbns, list):
+                    isbn_list.extend([str(isbn) for isbn in isbns if isbn])
+                
+                issns = identifier.get("issns", [])
+                if isinstance(issns, list):
+                    issn_list.extend([str(issn) for issn in issns if issn])
+                
+                # Items array
+                items = identifier.get("items", [])
+                if isinstance(items, list):
+                    for item in items:
+                        if isinstance(item, dict):
+                            item_type = item.get("type", "").lower()
+                            value = item.get("value", "")
+                            if item_type == "isbn" and value:
+                                isbn_list.append(str(value))
+                            elif item_type == "issn" and value:
+                                issn_list.append(str(value))
+            
+            # Clean and deduplicate
+            if isbn_list:
+                record["ISBN"] = "; ".join(sorted(set(isbn_list)))
+            if issn_list:
+                record["ISSN"] = "; ".join(sorted(set(issn_list)))
+        
+        except Exception:
+            pass
+    
+    def create_basic_record(self, original_book, oclc_number=""):
+        """Create basic record"""
+        return {
+            "OCLC #": oclc_number,
+            "Title": original_book.get("Title", ""),
+            "Creator": original_book.get("Author", ""),
+            "Contributor": "",
+            "Publisher": "",
+            "Date": "",
+            "Language": "",
+            "Subjects": "",
+            "Type": "",
+            "Format": "",
+            "ISBN": "",
+            "ISSN": "",
+            "Edition": "",
+            "URL": f"https://www.worldcat.org/oclc/{oclc_number}" if oclc_number else ""
+        }
+    
+    def clean_text(self, text):
+        """Clean text"""
+        if not text:
+            return ""
+        
+        if not isinstance(text, str):
+            text = str(text)
+        
+        text = unicodedata.normalize('NFC', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        
+        return text
@@ -0,0 +1,77 @@
+"""ResponseArchive lookups by request key and by OCLC number"""
+import json
+
+from avocado_archive import ResponseArchive
+from avocado_cache import CACHE_USE
+from avocado_core import OCLCClient
+from avocado_output import read_records
+from avocado_workflow import Workflow
+from conftest import write_books
+
+
+def search_response(*oclc_numbers):
+    return {"numberOfRecords": len(oclc_numbers),
+            "bibRecords": [{"identifier": {"oclcNumber": n}, "title": {"mainTitles": [{"text": f"Book {n}"}]}}
+                           for n in oclc_numbers]}
+
+
+def test_get_by_key_and_oclc(tmp_path):
+    archive = ResponseArchive(tmp_path, block_records=2)
+    archive.put("search", "ti:one", json.dumps(search_response("1", "2")), ["1", "2"])
+    archive.put("bib", "3", json.dumps({"identifier": {"oclcNumber": "3"}}), ["3"])
+    archive.put("search", "ti:two", json.dumps(search_response("2")), ["2"])
+    
+    # Pending (not yet compressed) and flushed entries are both found
+    assert archive.get("search", "ti:two")["numberOfRecords"] == 1
+    assert archive.get_by_oclc("search", "2")["numberOfRecords"] == 1
+    archive.flush()
+    assert archive.get("search", "ti:one")["numberOfRecords"] == 2
+    assert archive.get_by_oclc("search", "2")["numberOfRecords"] == 1
+    assert archive.get_by_oclc("search", "1")["numberOfRecords"] == 2
+    assert archive.get_by_oclc("search", "3") is None
+    assert archive.get_by_oclc("bib", "3")["identifier"]["oclcNumber"] == "3"
+    archive.close()
+    
+    reopened = ResponseArchive(tmp_path)
+    assert reopened.get_by_oclc("search", "1")["numberOfRecords"] == 2
+    reopened.close()
+
+
+def test_offline_bib_falls_back_to_search_record(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    archive.put("search", "ti:one", json.dumps(search_response("1", "2")), ["1", "2"])
+    archive.close()
+    
+    client = OCLCClient()
+    client.archive_dir = str(tmp_path)
+    client.offline = True
+    client.project_responses = False
+    client.open_response_archive()
+    try:
+        assert client.fetch_metadata_json("2")["title"]["mainTitles"][0]["text"] == "Book 2"
+        assert client.fetch_metadata_json("9") is None
+    finally:
+        client.close_response_archive()
+
+
+def run_to_records(client):
+    result = {}
+    Workflow(client, workflow_complete=lambda output, *counts: result.update(output=output),
+             workflow_error=lambda message: result.update(error=message)).run()
+    assert "error" not in result, result
+    return list(read_records(result["output"]))
+
+
+def test_cached_responses_are_archived(make_client, standin, tmp_path):
+    books = [(f"Ensayo {n}", "Mario Briceño", "") for n in range(5)]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    settings = dict(input_file=str(write_books(tmp_path / "ensayos.csv", books)), cache_mode=CACHE_USE,
+                    cache_path=str(tmp_path / "cache.sqlite"), archive_responses=True, reuse_search_records=False)
+    online = run_to_records(make_client(archive_dir=str(tmp_path / "first"), **settings))
+    
+    # Every response of the second run comes from the cache and still reaches its archive
+    standin.reset_stats()
+    assert run_to_records(make_client(archive_dir=str(tmp_path / "second"), **settings)) == online
+    assert standin.api_requests() == 0
+    offline = make_client(archive_dir=str(tmp_path / "second"), offline=True, **settings)
+    assert run_to_records(offline) == online
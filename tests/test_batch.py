@@ -0,0 +1,68 @@
+"""Batch runs over several input files against the stand-in"""
+from avocado_batch import BatchWorkflow, batch_inputs
+from avocado_output import read_records
+from conftest import write_books
+
+
+def run_batch(client, files, resume=False):
+    result = {}
+    messages = []
+    workflow = BatchWorkflow(client, files, resume, messages.append,
+                             workflow_complete=lambda output, *counts: result.update(output=output, counts=counts),
+                             workflow_error=lambda message: result.update(error=message))
+    workflow.run()
+    return result, messages
+
+
+def test_batch_writes_one_output_per_file(make_client, standin, tmp_path):
+    books = [(f"Libro {n}", "Ana Pérez", "") for n in range(6)]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    write_books(inputs / "a.csv", books[:4])
+    write_books(inputs / "b.csv", books[4:] + [("Libro 0", "Ana Pérez", "")])
+    write_books(inputs / "empty.csv", [])
+    (inputs / "old_avocado_basic_1.csv").write_text("ignored", encoding="utf-8")
+    
+    files = batch_inputs([inputs])
+    assert [path.name for path in files] == ["a.csv", "b.csv", "empty.csv"]
+    result, messages = run_batch(make_client(), files)
+    assert "error" not in result, result
+    total, found, _ = result["counts"]
+    assert found == total == 7
+    # "Libro 0" is in both files and is searched for once
+    assert any(message.startswith("Searches: 6 for 7 rows") for message in messages), messages
+    
+    report = list(read_records(result["output"]))
+    assert [(line["File"].split("/")[-1], line["Rows"]) for line in report] == [
+        ("a.csv", "4"), ("b.csv", "3"), ("empty.csv", "0"), ("Total", "7")]
+    for line in report[:3]:
+        output = tmp_path / line["Output"]
+        assert output.exists()
+        assert len(list(read_records(output))) == int(line["Rows"])
+
+
+def test_batch_keeps_files_apart_in_one_pipeline(make_client, standin, tmp_path):
+    books = [(f"Cuento {n}", "Rosa Díaz", "") for n in range(30)]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    files = [write_books(tmp_path / f"part{n}.csv", books[n * 10:(n + 1) * 10]) for n in range(3)]
+    result, _ = run_batch(make_client(max_workers=8), files)
+    assert "error" not in result, result
+    
+    report = list(read_records(result["output"]))
+    for line, part in zip(report, range(3)):
+        titles = [record["Title"] for record in read_records(tmp_path / line["Output"])]
+        assert titles == [f"{title} : novela" for title, _, _ in books[part * 10:(part + 1) * 10]]
+
+
+def test_batch_resumes_from_its_journal(make_client, standin, tmp_path):
+    books = [(f"Obra {n}", "José Brito", "") for n in range(5)]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    files = [write_books(tmp_path / "one.csv", books[:3]), write_books(tmp_path / "two.csv", books[3:])]
+    first, _ = run_batch(make_client(), files)
+    
+    standin.reset_stats()
+    second, messages = run_batch(make_client(), files, resume=True)
+    assert any(message.startswith("Resuming previous batch") for message in messages)
+    assert standin.api_requests() == 0
+    assert second["counts"] == first["counts"]
@@ -0,0 +1,58 @@
+"""Response cache modes, expiry and size cap"""
+import time
+
+from avocado_cache import CACHE_BYPASS, CACHE_REFRESH, ResponseCache
+
+
+def test_keys_are_normalized(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.put("search", 'ti:"Doña  Bárbara" AND au:Gallegos', {"n": 1})
+    assert cache.get("search", 'ti:"doña bárbara"   and au:gallegos') == {"n": 1}
+    assert cache.get("bib", 'ti:"doña bárbara" and au:gallegos') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get_any(("bib", "search"), 'ti:"Doña Bárbara" AND au:Gallegos') == ("search", {"n": 1})
+    cache.close()
+
+
+def test_expired_entries_miss_and_are_pruned(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_days=1)
+    cache.put("bib", "1", {"old": True})
+    cache.put("bib", "2", {"old": False})
+    cache.conn.execute("UPDATE responses SET created = ? WHERE key = '1'", (time.time() - 2 * 86400,))
+    assert cache.get("bib", "1") is None
+    assert cache.get("bib", "2") == {"old": False}
+    
+    cache._prune()
+    assert [row[0] for row in cache.conn.execute("SELECT key FROM responses")] == ["2"]
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=3)
+    for number in range(5):
+        cache.put("bib", str(number), {"n": number})
+        cache.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (1000 + number, str(number)))
+    # Reading an old entry makes it recent
+    assert cache.get("bib", "0") == {"n": 0}
+    
+    cache.close()
+    reopened = ResponseCache(tmp_path / "cache.sqlite", max_entries=3)
+    assert sorted(row[0] for row in reopened.conn.execute("SELECT key FROM responses")) == ["0", "3", "4"]
+    reopened.close()
+
+
+def test_refresh_and_bypass_modes(tmp_path):
+    refresh = ResponseCache(tmp_path / "cache.sqlite", mode=CACHE_REFRESH)
+    refresh.put("bib", "1", {"fresh": True})
+    assert refresh.get("bib", "1") is None
+    refresh.close()
+    
+    bypass = ResponseCache(tmp_path / "cache.sqlite", mode=CACHE_BYPASS)
+    bypass.put("bib", "2", {"kept": False})
+    assert bypass.get("bib", "1") is None
+    bypass.close()
+    
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    assert cache.get("bib", "1") == {"fresh": True}
+    assert cache.get("bib", "2") is None
+    cache.close()
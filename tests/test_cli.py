@@ -0,0 +1,16 @@
+"""Command line startup"""
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# Loaded only by the branches of main() that run files or the service
+DEFERRED_MODULES = ("avocado_batch", "avocado_service", "avocado_workflow", "http.server")
+
+
+def test_cli_import_leaves_run_and_service_modules_out():
+    code = f"import json, sys, avocado_cli; print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
@@ -0,0 +1,43 @@
+"""Matching rows of an incremental run against the previous output"""
+from avocado_delta import Baseline, RowFingerprints, fingerprint_path, row_fingerprint
+from avocado_output import CSVWriter
+
+RECORDS = [{"OCLC #": "11", "Title": "Uno"}, {"OCLC #": "22", "Title": "Dos"}]
+
+
+def test_fingerprint_ignores_surrounding_whitespace_and_column_order():
+    row = {"Title": "Uno", "Author": "Ana", "OCLC #": ""}
+    assert row_fingerprint(row) == row_fingerprint({"OCLC #": None, "Author": " Ana ", "Title": "Uno\n"})
+    assert row_fingerprint(row) != row_fingerprint(dict(row, Title="Dos"))
+
+
+def test_baseline_matches_rows_by_fingerprint(tmp_path):
+    output = tmp_path / "out.csv"
+    with CSVWriter(output) as writer:
+        writer.write_all(RECORDS)
+    rows = [{"Title": "Uno"}, {"Title": "Nada"}, {"Title": "Dos"}]
+    with RowFingerprints(output) as fingerprints:
+        for row, position in zip(rows, [0, None, 1]):
+            fingerprints.add(row_fingerprint(row), position)
+    
+    baseline = Baseline(output)
+    assert baseline.has_fingerprints
+    assert baseline.find(rows[0], row_fingerprint(rows[0])) == (True, RECORDS[0])
+    assert baseline.find(rows[1], row_fingerprint(rows[1])) == (True, None)
+    assert baseline.find(rows[2], row_fingerprint(rows[2])) == (True, RECORDS[1])
+    changed = {"Title": "Uno", "Author": "Otro"}
+    assert baseline.find(changed, row_fingerprint(changed)) == (False, None)
+    # With fingerprints only rows seen before match, even if their OCLC # is in the output
+    known = {"Title": "Otro", "OCLC #": "22"}
+    assert baseline.find(known, row_fingerprint(known)) == (False, None)
+
+
+def test_baseline_without_fingerprints_matches_by_oclc(tmp_path):
+    output = tmp_path / "old.csv"
+    with CSVWriter(output) as writer:
+        writer.write_all(RECORDS)
+    assert not fingerprint_path(output).exists()
+    
+    baseline = Baseline(output)
+    assert baseline.find({"OCLC #": " 22 ", "Title": "x"}, "unknown") == (True, RECORDS[1])
+    assert baseline.find({"OCLC #": "", "Title": "Uno"}, "unknown") == (False, None)
@@ -0,0 +1,90 @@
+"""Token bucket and adaptive rate and concurrency control"""
+import random
+
+import pytest
+
+from avocado_engine import AdaptiveRateController, TokenBucket
+
+
+def test_token_bucket_without_rate_never_waits():
+    bucket = TokenBucket(0)
+    assert [bucket.reserve() for _ in range(100)] == [0.0] * 100
+    assert bucket.requests == 100
+
+
+def test_token_bucket_waits_in_arrival_order():
+    bucket = TokenBucket(10, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits == sorted(waits)
+    assert waits[0] == pytest.approx(0.1, abs=0.02)
+    assert waits[2] == pytest.approx(0.3, abs=0.02)
+
+
+def test_token_bucket_set_rate_changes_refill():
+    bucket = TokenBucket(10, capacity=1)
+    bucket.reserve()
+    bucket.set_rate(2)
+    assert bucket.capacity == 2.0
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+
+
+def make_controller(rate=4.0, max_rate=8.0, concurrency=4, adaptive=True):
+    return AdaptiveRateController(TokenBucket(rate), concurrency, max_rate, adaptive)
+
+
+def test_controller_grows_on_success_up_to_maximums():
+    control = make_controller()
+    control.limit = 2.0
+    for _ in range(200):
+        assert control.try_acquire() == 0
+        control.release(200)
+    assert control.limit == 4.0
+    assert control.bucket.rate == 8.0
+    assert control.active == 0
+
+
+def test_controller_halves_once_per_burst_of_throttling():
+    control = make_controller()
+    for _ in range(3):
+        control.try_acquire()
+    for _ in range(3):
+        control.release(429, retry_after=2)
+    assert control.throttled == 3
+    assert control.limit == 2.0
+    assert control.bucket.rate == 2.0
+    
+    # Every worker waits out Retry-After
+    wait = control.try_acquire()
+    assert 1.5 < wait <= 2.0
+
+
+def test_controller_keeps_rate_when_not_adaptive():
+    control = make_controller(adaptive=False)
+    control.acquire()
+    control.release(503)
+    control.blocked_until = 0
+    control.acquire()
+    control.release(200)
+    assert (control.limit, control.bucket.rate) == (4.0, 4.0)
+    assert control.throttled == 1
+
+
+def test_controller_slots_block_until_released():
+    control = make_controller(concurrency=1)
+    assert control.try_acquire() == 0
+    assert control.try_acquire() is None
+    control.release(200)
+    assert control.try_acquire() == 0
+
+
+def test_backoff_honours_retry_after_and_grows():
+    control = make_controller()
+    random.seed(1)
+    assert 3.0 <= control.backoff(1, retry_after=3.0) <= 3.75
+    for attempt in range(1, 10):
+        delay = control.backoff(attempt)
+        limit = min(60.0, 2 ** (attempt - 1))
+        assert limit * 0.5 <= delay <= limit
+    assert control.retries == 10
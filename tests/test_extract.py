@@ -0,0 +1,137 @@
+"""The compiled column extractor against the extract_* methods it replaced
+
+Edge-case records are made by setting or deleting one path of the benchmark
+fixture at a time, then every record is parsed both ways and compared field
+by field.
+"""
+import copy
+import json
+import os
+
+import pytest
+
+from avocado_core import OCLCClient
+from legacy_extract import LegacyExtractor
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "benchmarks", "fixtures", "bib_record.json")
+
+PATHS = (
+    "title", "title.mainTitles", "title.mainTitles.0", "title.mainTitles.0.text",
+    "contributor", "contributor.creators", "contributor.creators.0",
+    "contributor.creators.0.firstName", "contributor.creators.0.firstName.text",
+    "contributor.creators.0.secondName", "contributor.creators.0.secondName.text",
+    "contributor.creators.0.nonPersonName", "contributor.creators.0.nonPersonName.text",
+    "contributor.creators.0.name", "contributor.creators.0.name.text",
+    "contributor.contributors", "contributor.contributors.0", "contributor.contributors.0.name",
+    "contributor.contributors.0.name.text", "contributor.contributors.1.firstName",
+    "contributor.statementOfResponsibility", "contributor.statementOfResponsibility.text",
+    "publishers", "publishers.0", "publishers.0.publisherName", "publishers.0.publisherName.text",
+    "publication", "publication.0", "publication.0.publisher",
+    "publisher", "publisher.0", "placeOfPublication", "placeOfPublication.0",
+    "placeOfPublication.0.publisher",
+    "date", "date.publicationDate", "date.machineReadableDate",
+    "language", "language.0", "language.0.languageCode", "language.0.text",
+    "subject", "subject.0", "subject.1", "subject.0.subjectName", "subject.0.subjectName.text",
+    "subject.5", "itemType", "itemType.text", "itemType.itemSubType",
+    "format", "format.0", "format.0.text", "edition", "edition.0", "edition.0.text",
+    "identifier", "identifier.isbns", "identifier.isbns.0", "identifier.issns", "identifier.issns.0",
+    "identifier.items", "identifier.items.0", "identifier.items.0.type", "identifier.items.0.value",
+    "identifier.items.1.type", "identifier.items.1.value",
+)
+
+VALUES = (
+    None, 0, 1, 2.5, True, False, "", " ", "  a \t b\n", "\x1c\x1f x \x85 　",
+    "Título / autor", "Main : sub", "x" * 150, [], [0], [""], [None], ["s"], ["a", "b"], [{}],
+    [{"text": "t"}], [{"text": ""}], {}, {"text": "dict text"}, {"text": None}, {"text": 0},
+    [{"type": "ISBN", "value": "111"}, {"type": "issn", "value": "222"}],
+    [{"type": 5, "value": "111"}], [{"type": None, "value": "111"}],
+)
+
+MISSING = object()
+
+
+def set_path(record, path, value):
+    """Copy of record with path set to value, or deleted for MISSING; None if the path cannot be reached"""
+    record = copy.deepcopy(record)
+    *parents, last = path.split(".")
+    node = record
+    for part in parents:
+        if isinstance(node, list):
+            if not part.isdigit() or int(part) >= len(node):
+                return None
+            node = node[int(part)]
+        elif isinstance(node, dict):
+            node = node.setdefault(part, {} if not part.isdigit() else [])
+        else:
+            return None
+    if isinstance(node, dict):
+        if value is MISSING:
+            node.pop(last, None)
+        else:
+            node[last] = value
+    elif isinstance(node, list) and last.isdigit():
+        index = int(last)
+        if value is MISSING:
+            if index < len(node):
+                del node[index]
+        else:
+            node.extend({} for _ in range(index + 1 - len(node)))
+            node[index] = value
+    else:
+        return None
+    return record
+
+
+def edge_records():
+    with open(FIXTURE, encoding="utf-8") as f:
+        fixture = json.load(f)
+    bare = {key: value for key, value in fixture.items() if key != "publishers"}
+    serial = set_path(fixture, "identifier.issns", ["0028-0836", "1476-4687"])
+    bases = (fixture, bare, serial, {})
+    records = list(bases)
+    for base in bases:
+        for path in PATHS:
+            for value in VALUES + (MISSING,):
+                record = set_path(base, path, value)
+                if record is not None:
+                    records.append(record)
+    return records
+
+
+RECORDS = edge_records()
+
+
+@pytest.fixture(scope="module")
+def extractors():
+    return LegacyExtractor(), OCLCClient()
+
+
+def test_fixture_fields(extractors):
+    _, client = extractors
+    record = client.parse_complete_record(RECORDS[0], "1023478816", {})
+    assert record["Title"] == "Doña Bárbara : novela"
+    assert record["Creator"] == "Rómulo Gallegos"
+    assert record["Publisher"] == "Fundación Biblioteca Ayacucho"
+    assert record["ISBN"] == "9789802763152; 9802763155"
+    assert record["Subjects"].count(";") == 2
+
+
+def test_compiled_extraction_matches_legacy(extractors):
+    legacy, client = extractors
+    book = {"Title": "Original", "Author": "Someone"}
+    mismatches = []
+    for record in RECORDS:
+        old = legacy.parse_complete_record(record, "42", dict(book))
+        new = client.parse_complete_record(record, "42", dict(book))
+        if old != new:
+            changed = {key: (old.get(key), new.get(key)) for key in old.keys() | new.keys()
+                       if old.get(key) != new.get(key)}
+            mismatches.append((record, changed))
+    assert not mismatches, f"{len(mismatches)} of {len(RECORDS)} records differ, first: {mismatches[0]}"
+
+
+@pytest.mark.parametrize("text", ["", " ", "a  b", "\x1c\x1d\x1e\x1fx", "a\x85b c　", "\ta\n", 0, 12, None])
+def test_clean_text_matches_legacy(extractors, text):
+    legacy, client = extractors
+    assert client.clean_text(text) == legacy.clean_text(text)
@@ -0,0 +1,62 @@
+"""Resuming interrupted runs from the run journal"""
+from avocado_journal import RunJournal
+
+
+def write_input(path, rows):
+    path.write_text("OCLC #,Author,Title\n" + "".join(f",A{n},T{n}\n" for n in range(rows)), encoding="utf-8")
+    return path
+
+
+def test_resume_loads_completed_rows(tmp_path):
+    input_file = write_input(tmp_path / "in.csv", 3)
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.start(input_file)
+    journal.record_search(0, "found", "1", {"title": "x"}, {"strategy": "keyword"})
+    journal.record_search(1, "not_found", None, None)
+    journal.record_metadata(0, {"OCLC #": "1"}, None)
+    journal.close()
+    
+    resumed = RunJournal(tmp_path / "journal.jsonl")
+    assert resumed.load(input_file)
+    assert resumed.searched == {0: ("found", "1", {"title": "x"}, {"strategy": "keyword"}),
+                                1: ("not_found", None, None, None)}
+    assert resumed.records == {0: ({"OCLC #": "1"}, None)}
+    resumed.close()
+
+
+def test_torn_last_line_is_skipped_and_journal_continues(tmp_path):
+    input_file = write_input(tmp_path / "in.csv", 3)
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.start(input_file)
+    journal.record_search(0, "found", "1", None)
+    journal.close()
+    with open(tmp_path / "journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"row": 1, "status": "fou')  # crash mid-write
+    
+    resumed = RunJournal(tmp_path / "journal.jsonl")
+    assert resumed.load(input_file)
+    assert list(resumed.searched) == [0]
+    resumed.record_search(1, "found", "2", None)
+    resumed.close()
+    
+    again = RunJournal(tmp_path / "journal.jsonl")
+    assert again.load(input_file)
+    assert sorted(again.searched) == [0, 1]
+    again.close()
+
+
+def test_journal_of_other_input_is_not_resumed(tmp_path):
+    input_file = write_input(tmp_path / "in.csv", 3)
+    baseline = tmp_path / "baseline.csv"
+    baseline.write_text("old", encoding="utf-8")
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.start(input_file, baseline)
+    journal.record_search(0, "found", "1", None)
+    journal.close()
+    
+    assert not RunJournal(tmp_path / "journal.jsonl").load(input_file)
+    baseline.write_text("new", encoding="utf-8")
+    assert not RunJournal(tmp_path / "journal.jsonl").load(input_file, baseline)
+    write_input(input_file, 4)
+    assert not RunJournal(tmp_path / "journal.jsonl").load(input_file)
+    assert not RunJournal(tmp_path / "missing.jsonl").load(input_file)
@@ -0,0 +1,70 @@
+"""Adaptive strategy order over the client's real search strategies"""
+from avocado_core import OCLCClient
+from avocado_match import StrategyStats
+from avocado_workflow import Workflow
+from conftest import write_books
+
+NAMES = OCLCClient.SEARCH_STRATEGIES
+FALLBACK = NAMES[-1]
+
+
+def strategies():
+    return OCLCClient().build_search_strategies("Doña Bárbara", "Rómulo Gallegos")
+
+
+def make_stats(rates, attempts=100):
+    stats = StrategyStats(explore_every=1000)
+    for name, rate in rates.items():
+        for number in range(attempts):
+            stats.record(name, number < rate * attempts)
+    return stats
+
+
+def test_client_builds_one_query_per_strategy():
+    assert [name for name, _ in strategies()] == list(NAMES)
+
+
+def test_orders_by_hit_rate():
+    rates = dict(zip(NAMES, (0.1, 0.6, 0.3, 0.2)))
+    stats = make_stats(rates)
+    assert [name for name, _ in stats.order(strategies())] == sorted(NAMES, key=lambda name: -rates[name])
+    assert not stats.skipped
+
+
+def test_skips_rare_strategies_and_counts_them():
+    rarest = NAMES[0]
+    stats = make_stats({rarest: 0.0, NAMES[1]: 0.5})
+    assert [name for name, _ in stats.order(strategies())] == list(NAMES[1:])
+    assert stats.order(strategies())
+    assert stats.skipped[rarest] == 2
+    assert (rarest, 100, 0, 2) in stats.summary()
+
+
+def test_last_strategy_is_never_skipped():
+    stats = make_stats(dict.fromkeys(NAMES, 0.0))
+    assert stats.order(strategies()) == strategies()[-1:]
+    assert strategies()[-1][0] == FALLBACK
+    assert stats.skipped == dict.fromkeys(NAMES[:-1], 1)
+
+
+def test_explore_runs_default_order():
+    stats = make_stats({NAMES[0]: 0.0})
+    stats.explore_every = 2
+    assert NAMES[0] not in [name for name, _ in stats.order(strategies())]
+    assert stats.order(strategies()) == strategies()
+
+
+def test_run_reports_skipped_strategies_by_name(make_client, standin, tmp_path):
+    books = [(f"Relato {n}", "Ida Gramcko", "") for n in range(3)]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    client = make_client(input_file=str(write_books(tmp_path / "relatos.csv", books)),
+                         strategy_order="adaptive")
+    # Earlier runs found that every strategy but the fallback never hits
+    for name in NAMES:
+        client.strategy_stats.prior_attempts[name] = 100
+    
+    messages = []
+    Workflow(client, progress_update=messages.append).run()
+    assert [message for message in messages if message.startswith("Strategies skipped")] == [
+        "Strategies skipped as rarely hitting: " + " | ".join(f"{name} 3 rows" for name in NAMES[:-1])]
+    assert [name for name, attempts, _, _ in client.strategy_stats.summary() if attempts] == [FALLBACK]
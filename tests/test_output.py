@@ -0,0 +1,49 @@
+"""Output writers: round trips, and files created even without records"""
+import sqlite3
+
+import pytest
+
+from avocado_output import OUTPUT_WRITERS, read_records
+
+FORMATS = sorted(OUTPUT_WRITERS)
+RECORDS = [{"OCLC #": "1", "Title": "Uno", "ISBN": "111; 222"},
+           {"OCLC #": "2", "Title": "Dos", "ISBN": ""}]
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_round_trip(tmp_path, output_format):
+    writer_class = OUTPUT_WRITERS[output_format]
+    path = tmp_path / f"out{writer_class.extension}"
+    with writer_class(path) as writer:
+        assert writer.write_all(RECORDS) == 2
+    assert list(read_records(path)) == RECORDS
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+@pytest.mark.parametrize("fieldnames", [None, ["OCLC #", "Title"]])
+def test_empty_output_is_created(tmp_path, output_format, fieldnames):
+    writer_class = OUTPUT_WRITERS[output_format]
+    path = tmp_path / f"empty{writer_class.extension}"
+    with writer_class(path, fieldnames, empty_fieldnames=["OCLC #", "Author", "Title"]):
+        pass
+    assert path.exists()
+    assert list(read_records(path)) == []
+
+
+def test_empty_outputs_keep_their_columns(tmp_path):
+    import pyarrow.parquet
+    
+    columns = ["OCLC #", "Author", "Title"]
+    with OUTPUT_WRITERS["parquet"](tmp_path / "empty.parquet", empty_fieldnames=columns):
+        pass
+    assert pyarrow.parquet.ParquetFile(str(tmp_path / "empty.parquet")).schema_arrow.names == columns
+    
+    with OUTPUT_WRITERS["sqlite"](tmp_path / "empty.sqlite"):
+        pass
+    conn = sqlite3.connect(str(tmp_path / "empty.sqlite"))
+    assert [row[1] for row in conn.execute("PRAGMA table_info(records)")] == ["OCLC #"]
+    conn.close()
+    
+    with OUTPUT_WRITERS["csv"](tmp_path / "empty.csv", empty_fieldnames=columns):
+        pass
+    assert (tmp_path / "empty.csv").read_text(encoding="utf-8-sig").strip() == "OCLC #,Author,Title"
@@ -0,0 +1,77 @@
+"""Ordered thread pool and pipeline runners and in-run deduplication"""
+import random
+import threading
+import time
+
+import pytest
+
+from avocado_engine import fan_out, run_ordered, run_pipeline, unique_by_key
+
+
+def slow_square(number):
+    time.sleep(random.uniform(0, 0.005))
+    return number * number
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_run_ordered_keeps_input_order(workers):
+    results = list(run_ordered(slow_square, range(50), workers))
+    assert results == [(n, n * n) for n in range(50)]
+
+
+def test_run_ordered_stops_early():
+    seen = []
+    
+    def record(number):
+        seen.append(number)
+        return number
+    
+    results = list(run_ordered(record, range(1000), 4, should_stop=lambda: len(seen) >= 10))
+    assert len(results) < 1000
+    assert [item for item, _ in results] == list(range(len(results)))
+
+
+def test_run_pipeline_keeps_input_order_and_shuts_down():
+    threads = threading.active_count()
+    stages = [slow_square, lambda value: value + 1]
+    results = list(run_pipeline(range(200), stages, workers=4, queue_size=8))
+    assert results == [(n, n * n + 1) for n in range(200)]
+    
+    # Every worker got _DONE and exited
+    deadline = time.monotonic() + 2
+    while threading.active_count() > threads and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == threads
+
+
+def test_run_pipeline_raises_stage_errors_in_order():
+    def fail_on_five(number):
+        if number == 5:
+            raise ValueError("five")
+        return number
+    
+    results = []
+    with pytest.raises(ValueError, match="five"):
+        for item, value in run_pipeline(range(20), [fail_on_five], workers=3):
+            results.append(value)
+    assert results == [0, 1, 2, 3, 4]
+
+
+def test_run_pipeline_stops_when_asked():
+    stop = threading.Event()
+    results = []
+    for item, value in run_pipeline(iter(range(10 ** 6)), [slow_square], workers=2, queue_size=4,
+                                    should_stop=stop.is_set):
+        results.append(item)
+        if len(results) == 20:
+            stop.set()
+    assert results[:20] == list(range(20))
+    assert len(results) < 100
+
+
+def test_unique_lookups_fan_out_to_every_row():
+    keys = ["a", "b", "a", "c", "b", "a"]
+    unique = unique_by_key(keys, range(len(keys)))
+    assert unique == [("a", 0), ("b", 1), ("c", 3)]
+    results = ((key, key.upper()) for key, _ in unique)
+    assert list(fan_out(keys, results)) == list(enumerate(["A", "B", "A", "C", "B", "A"]))
@@ -0,0 +1,31 @@
+"""Search modes against the stand-in"""
+import threading
+
+import pytest
+
+
+@pytest.mark.parametrize("search_mode", ["strategies", "ranked", "race"])
+def test_search_modes_find_the_book(make_client, standin, search_mode):
+    standin.add_catalogue([("Casa de campo", "Teresa de la Parra")])
+    client = make_client(search_mode=search_mode)
+    record, match = client.search_oclc_match("Casa de campo", "Teresa de la Parra")
+    assert client.record_oclc_number(record) == standin.oclc_number("Casa de campo", "Teresa de la Parra")
+    assert match
+
+
+def test_race_reuses_one_executor(make_client, standin):
+    books = [(f"Memoria {n}", "Lucía Nazoa") for n in range(12)]
+    standin.add_catalogue(books)
+    client = make_client(search_mode="race", max_workers=2)
+    client.search_oclc_match(*books[0])
+    pool = client.race_pool
+    assert pool is not None
+    
+    threads = threading.active_count()
+    for title, author in books[1:]:
+        assert client.search_oclc_match(title, author)[0]
+    assert client.race_pool is pool
+    assert threading.active_count() <= threads + client.thread_pool_size()
+    
+    client.close_session()
+    assert client.race_pool is None
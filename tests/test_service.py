@@ -0,0 +1,137 @@
+"""Job service: running, cancelling and resuming jobs on the stand-in"""
+import time
+
+import pytest
+
+from avocado_service import CANCELLED, DONE, QUEUED, RUNNING, JobService
+from oclc_standin import StandIn, StandInConfig
+
+
+def wait_for(service, job_id, statuses, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {service.status(job_id)['status']}")
+
+
+def make_books(standin, count, prefix="Libro"):
+    books = [{"OCLC #": "", "Author": "Elena Palacios", "Title": f"{prefix} {n}"} for n in range(count)]
+    standin.add_catalogue((book["Title"], book["Author"]) for book in books)
+    return books
+
+
+@pytest.fixture
+def service(make_client, tmp_path):
+    services = []
+    
+    def make(**settings):
+        services.append(JobService(make_client(**settings), tmp_path / "service"))
+        return services[-1]
+    
+    yield make
+    for job_service in services:
+        if any(runner.is_alive() for runner in job_service.runners):
+            job_service.stop()
+
+
+def test_job_runs_to_done(service, standin):
+    jobs = service()
+    job = jobs.submit(make_books(standin, 5), name="five books")
+    assert job["status"] == QUEUED and job["name"] == "five_books"
+    jobs.start()
+    
+    done = wait_for(jobs, job["id"], (DONE,))
+    assert (done["total"], done["oclc_found"]) == (5, 5)
+    assert done["result"] == f"/jobs/{job['id']}/result"
+    assert jobs.result_path(job["id"]).exists()
+    assert not jobs.cancel(job["id"])
+
+
+def test_queued_job_cancelled_before_it_starts(service, standin):
+    jobs = service()
+    job = jobs.submit(make_books(standin, 3))
+    assert jobs.cancel(job["id"])
+    standin.reset_stats()
+    jobs.start()
+    
+    later = jobs.submit(make_books(standin, 2, "Otro"))
+    wait_for(jobs, later["id"], (DONE,))
+    assert jobs.status(job["id"])["status"] == CANCELLED
+    assert jobs.result_path(job["id"]) is None
+
+
+def test_job_cancelled_while_being_claimed_never_runs(service, standin):
+    jobs = service()
+    job = jobs.submit(make_books(standin, 3))
+    
+    # Cancel after the runner claimed the job but before its workflow starts
+    job_client = jobs.app.job_client
+    
+    def cancel_then_build():
+        assert jobs.store.get(job["id"])["status"] == RUNNING
+        assert jobs.cancel(job["id"])
+        return job_client()
+    
+    jobs.app.job_client = cancel_then_build
+    standin.reset_stats()
+    jobs.start()
+    
+    cancelled = wait_for(jobs, job["id"], (CANCELLED, DONE))
+    assert cancelled["status"] == CANCELLED
+    assert standin.api_requests() == 0
+
+
+def test_running_job_is_cancelled(make_client, tmp_path):
+    with StandIn(StandInConfig(latency=0.02, jitter=0, token_latency=0, hit_rate=1.0)) as slow:
+        client = make_client(max_workers=1)
+        slow.configure_client(client)
+        jobs = JobService(client, tmp_path / "service")
+        try:
+            job = jobs.submit(make_books(slow, 200))
+            jobs.start()
+            wait_for(jobs, job["id"], (RUNNING,))
+            while slow.api_requests() < 5:
+                time.sleep(0.01)
+            assert jobs.cancel(job["id"])
+            
+            cancelled = wait_for(jobs, job["id"], (CANCELLED, DONE))
+            assert cancelled["status"] == CANCELLED
+            assert slow.api_requests() < 200
+        finally:
+            jobs.stop()
+
+
+def test_small_job_is_not_held_up_by_a_large_one(make_client, tmp_path):
+    with StandIn(StandInConfig(latency=0.02, jitter=0, token_latency=0, hit_rate=1.0)) as slow:
+        client = make_client(max_workers=1)
+        slow.configure_client(client)
+        jobs = JobService(client, tmp_path / "service", workers=2)
+        try:
+            large = jobs.submit(make_books(slow, 200), name="large")
+            small = jobs.submit(make_books(slow, 2, "Breve"), name="small")
+            jobs.start()
+            
+            done = wait_for(jobs, small["id"], (DONE,))
+            assert done["oclc_found"] == 2
+            assert jobs.status(large["id"])["status"] == RUNNING
+            assert jobs.result_path(small["id"]).parent == jobs.store.job_dir(small["id"])
+            # Both jobs ran on the service client's token
+            assert slow.stats["token"] == 1
+            assert jobs.cancel(large["id"])
+        finally:
+            jobs.stop()
+
+
+def test_interrupted_job_resumes_on_restart(service, standin):
+    jobs = service()
+    job = jobs.submit(make_books(standin, 4, "Reanudado"))
+    jobs.store.update(job["id"], status=RUNNING)
+    jobs.store.close()
+    
+    restarted = service()
+    restarted.start()
+    done = wait_for(restarted, job["id"], (DONE,))
+    assert done["oclc_found"] == 4
@@ -0,0 +1,33 @@
+"""Settings saved to and loaded from .env"""
+from avocado_core import ENV_SETTINGS, OCLCClient
+
+CHANGED = {
+    "wskey": "key", "wssecret": "secret", "output_dir": "/tmp/out", "output_format": "jsonl",
+    "max_workers": 6, "requests_per_second": 4.5, "max_requests_per_second": 12.0, "adaptive_rate": False,
+    "http_engine": "async", "async_concurrency": 32, "cache_mode": "refresh", "cache_path": "/tmp/c.sqlite",
+    "cache_ttl_days": 7, "cache_max_entries": 500, "archive_responses": True, "archive_dir": "/tmp/archive",
+    "parse_processes": 2, "reuse_search_records": False, "workflow_mode": "pipeline", "json_backend": "json",
+    "project_responses": True, "search_mode": "ranked", "rank_candidate_limit": 20, "rank_threshold": 0.6,
+    "strategy_order": "adaptive", "strategy_stats_path": "/tmp/stats.json", "token_cache_path": "",
+}
+
+
+def test_every_setting_round_trips(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert sorted(CHANGED) == sorted(name for name, _ in ENV_SETTINGS.values())
+    client = OCLCClient()
+    for name, value in CHANGED.items():
+        setattr(client, name, value)
+    assert client.save_credentials()
+    
+    loaded = OCLCClient()
+    assert {name: getattr(loaded, name) for name in CHANGED} == CHANGED
+
+
+def test_values_are_converted_and_clamped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".env").write_text("# comment\nMAX_WORKERS=0\nRANK_CANDIDATES=500\nADAPTIVE_RATE=yes\n"
+                                   "OCLC_WSKEY = 'quoted'\nUNKNOWN_KEY=1\n", encoding="utf-8")
+    client = OCLCClient()
+    assert (client.max_workers, client.rank_candidate_limit, client.adaptive_rate, client.wskey) == (
+        1, 50, True, "quoted")
@@ -0,0 +1,41 @@
+"""Single-file runs in phased and pipeline mode against the stand-in"""
+from avocado_core import COMPLETE_FIELDNAMES
+from avocado_output import read_records
+from avocado_workflow import Workflow
+from conftest import write_books
+
+
+class RecordingWorkflow(Workflow):
+    """Workflow that keeps the lookups its pipeline shared"""
+    
+    def pipeline_stages(self, lookups):
+        self.lookups = lookups
+        return super().pipeline_stages(lookups)
+
+
+def run_workflow(client):
+    result = {}
+    workflow = RecordingWorkflow(client, workflow_complete=lambda output, *counts: result.update(output=output),
+                                 workflow_error=lambda message: result.update(error=message))
+    workflow.run()
+    assert "error" not in result, result
+    return workflow, list(read_records(result["output"]))
+
+
+def test_pipeline_matches_phased_and_keeps_only_outcomes(make_client, standin, tmp_path):
+    books = [(f"Poema {n % 8}", "Luis Otero", "") for n in range(24)] + [("Sin autor", "", "")]
+    standin.add_catalogue((title, author) for title, author, _ in books)
+    input_file = str(write_books(tmp_path / "poemas.csv", books))
+    
+    _, phased = run_workflow(make_client(input_file=input_file, workflow_mode="phased"))
+    workflow, pipelined = run_workflow(make_client(input_file=input_file, workflow_mode="pipeline"))
+    assert pipelined == phased
+    assert len(pipelined) == 24
+    
+    # Shared searches hold no search record and shared downloads only parsed records
+    lookups = workflow.lookups
+    assert lookups.searches.computed == 8
+    assert all(future.result()[2] is None for future in lookups.searches.results.values())
+    for future in lookups.downloads.results.values():
+        record, error = future.result()
+        assert error is None and list(record) == COMPLETE_FIELDNAMES